@@ -0,0 +1,138 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+import redis.asyncio as redis
+from src.backend.redis import redis_chat_store
+from src.backend.redis.message_codec import MessageCodec, JsonSerializer, OrjsonSerializer, orjson
+from src.backend.redis.redis_client import REDIS_URL
+
+# Compares how chat histories are stored in Redis: memory used by a 1k-turn chat and time to read and
+# decode its whole history (GET /chats/{id}/messages) or the window a turn uses (start_turn)
+# - "json": json.dumps strings read with json.loads, how messages were stored before the codec
+# - "orjson": MessageCodec without compression
+# - "orjson+zstd": MessageCodec compressing messages of CHAT_COMPRESS_THRESHOLD bytes or more
+#
+# Answers are generated from a fixed vocabulary so runs are repeatable, real answers compress similarly
+# since they repeat the retrieved context's names and figures.
+#
+# Run with: python -m evaluation.chat_store_benchmark (uses REDIS_URL, writes and deletes chat:benchmark-*)
+
+TURNS = 1000
+REPEATS = 20
+WINDOW = 6
+VOCABULARY = (
+    "revenue guidance quarter margin growth segment customers pipeline orders demand pricing costs "
+    "analytical instruments life sciences diagnostics services year over year operating cash flow "
+    "the a of in to and for with was were is are by on our we expect reported increased decreased"
+).split()
+
+
+def make_chat(turns: int = TURNS, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+
+    def text(words: int) -> str:
+        return " ".join(rng.choice(VOCABULARY) for _ in range(words)).capitalize() + "."
+
+    messages = []
+    for _ in range(turns):
+        messages.append({"role": "user", "content": text(rng.randint(10, 40))})
+        # answers with retrieved context run to a few hundred words
+        messages.append({"role": "assistant", "content": " ".join(text(20) for _ in range(rng.randint(5, 25)))})
+    return messages
+
+
+async def memory_usage(rdb, key: str) -> tuple[int, str]:
+    """Bytes Redis uses for key, or the stored payload size if MEMORY USAGE isn't supported"""
+    try:
+        return await rdb.memory_usage(key, samples=0), "MEMORY USAGE"
+    except redis.ResponseError:
+        raw_messages = await rdb.execute_command("LRANGE", key, 0, -1, NEVER_DECODE=True)
+        return sum(len(raw) for raw in raw_messages), "payload bytes"
+
+
+def timed(repeats: int, fn) -> float:
+    """Median seconds of awaiting fn() repeats times"""
+    async def run():
+        durations = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            await fn()
+            durations.append(time.perf_counter() - started)
+        return statistics.median(durations)
+    return run()
+
+
+async def benchmark_variant(rdb, name: str, messages: list[dict], codec: MessageCodec | None) -> dict:
+    chat_id = f"benchmark-{name}"
+    key = f"chat:{chat_id}:messages"
+    await rdb.delete(key)
+    if codec is None:
+        await rdb.rpush(key, *(json.dumps(message) for message in messages))
+
+        async def read_all():
+            return [json.loads(raw) for raw in await rdb.lrange(key, 0, -1)]
+
+        async def read_window():
+            return [json.loads(raw) for raw in await rdb.lrange(key, -WINDOW, -1)]
+    else:
+        await rdb.rpush(key, *(codec.encode(message) for message in messages))
+        redis_chat_store.MESSAGE_CODEC = codec
+
+        async def read_all():
+            return await redis_chat_store.get_messages(rdb, chat_id)
+
+        async def read_window():
+            return await redis_chat_store.get_recent_messages(rdb, chat_id, WINDOW)
+
+    assert await read_all() == messages
+    memory, measure = await memory_usage(rdb, key)
+    result = {
+        "memory": memory,
+        "measure": measure,
+        "read_all": await timed(REPEATS, read_all),
+        "read_window": await timed(REPEATS, read_window),
+    }
+    await rdb.delete(key)
+    return result
+
+
+async def run_benchmark(rdb) -> dict:
+    messages = make_chat()
+    variants = {"json": None}
+    if orjson is not None:
+        variants["orjson"] = MessageCodec(serializer=OrjsonSerializer(), compress_threshold=0)
+        variants["orjson+zstd"] = MessageCodec(serializer=OrjsonSerializer())
+    else:
+        variants["json+zstd"] = MessageCodec(serializer=JsonSerializer())
+
+    default_codec = redis_chat_store.MESSAGE_CODEC
+    try:
+        return {name: await benchmark_variant(rdb, name, messages, codec) for name, codec in variants.items()}
+    finally:
+        redis_chat_store.MESSAGE_CODEC = default_codec
+
+
+def print_report(report: dict):
+    baseline = report["json"]
+    print(f"\n{TURNS}-turn chat ({2 * TURNS} messages), median of {REPEATS} reads")
+    for name, result in report.items():
+        print(
+            f"{name:>12}  {result['memory'] / 1024:8.0f} KiB ({result['measure']}, "
+            f"{result['memory'] / baseline['memory']:.2f}x)  "
+            f"full history {result['read_all'] * 1000:7.1f}ms ({baseline['read_all'] / result['read_all']:.1f}x faster)  "
+            f"last {WINDOW} {result['read_window'] * 1000:5.2f}ms"
+        )
+
+
+async def main():
+    rdb = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        print_report(await run_benchmark(rdb))
+    finally:
+        await rdb.aclose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,8 @@
+# langsmith dataset ids, one dataset per earnings call
+dataset_ids = {
+    "2024Q4_Agilent":"27823689-62e1-4151-9598-fe077db022ee",
+    "2024Q2_Agilent":"b41232fc-afbd-41e7-9f3d-f103232c12e4",
+    "2024Q1_Amazon":"f904b7e2-675b-4973-ad8e-deeadb532d03",
+    "2024Q3_Apple":"c877c351-470f-4b6a-a211-672d006d77df",
+    "2024Q3_Blackstone":"17ad2d7c-beb0-44fb-ba28-4645f6fb967c"
+}
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+from langsmith import Client
+from src.backend.rag.embedding_utils import generate_embeddings
+from src.backend.rag.fusion import fuse_results, FUSION_METHODS
+from src.backend.rag.retrieval_utils import route_query, retrieve_filter_metadata, collect_index_results
+from evaluation.evaluators.retrieval_eval import recall_at_k, mrr, map_at_k
+from evaluation.datasets import dataset_ids
+
+# Compares the fusion methods in src/backend/rag/fusion.py using the same
+# retrieval metrics as evaluation.py. Each question is only searched once
+# (CANDIDATE_K results per index), every method/k pair then re-ranks those
+# same candidates so the comparison isn't affected by search variance.
+
+CANDIDATE_K = 20
+KS = (2, 4, 6)
+METRICS = (recall_at_k, mrr, map_at_k)
+
+
+def collect_candidates(examples: list, candidate_k: int = CANDIDATE_K) -> list[tuple[dict, object]]:
+    """
+    Runs routing, metadata extraction and per-index search once for each example.
+
+    :param examples: langsmith examples with the question in inputs["question"]
+    :param candidate_k: number of results requested from each index
+    :return: list of (results_by_index, example) pairs
+    """
+    candidates = []
+    for example in examples:
+        question = example.inputs["question"]
+        query_embedding = generate_embeddings([question])[0]
+        route = route_query(question)
+        filter_metadata = retrieve_filter_metadata(question)
+        results_by_index = collect_index_results(question, query_embedding, route, filter_metadata, candidate_k)
+        candidates.append((results_by_index, example))
+    return candidates
+
+
+def score_fusion_methods(candidates: list[tuple[dict, object]], methods=FUSION_METHODS, ks=KS) -> dict:
+    """
+    Scores every fusion method at every k with the retrieval evaluators.
+
+    :param candidates: output of collect_candidates
+    :param methods: fusion methods to compare
+    :param ks: cut-offs to evaluate at
+    :return: {(method, k): {metric_key: mean score, "context_chars": mean characters sent to the LLM}}
+    """
+    report = {}
+    for method in methods:
+        for k in ks:
+            totals = {}
+            counts = {}
+            context_chars = 0
+            for results_by_index, example in candidates:
+                fused = fuse_results(results_by_index, method=method, k=k)
+                run = SimpleNamespace(outputs={"retrieved": fused})
+                context_chars += sum(len(d.get("content", "")) for d in fused)
+
+                for metric in METRICS:
+                    result = metric(run, example, k=k)
+                    if result["score"] is None:
+                        continue
+                    totals[result["key"]] = totals.get(result["key"], 0.0) + result["score"]
+                    counts[result["key"]] = counts.get(result["key"], 0) + 1
+
+            scores = {key: totals[key] / counts[key] for key in totals}
+            scores["context_chars"] = context_chars / max(len(candidates), 1)
+            report[(method, k)] = scores
+    return report
+
+
+def print_report(report: dict):
+    for (method, k), scores in report.items():
+        metrics = ", ".join(f"{key}={value:.3f}" for key, value in sorted(scores.items()))
+        print(f"{method:>7} k={k}: {metrics}")
+
+
+def run_benchmark(key: str):
+    ls_client = Client()
+    examples = list(ls_client.list_examples(dataset_id=dataset_ids[key]))
+    report = score_fusion_methods(collect_candidates(examples))
+    print(f"\n{key}")
+    print_report(report)
+
+
+if __name__ == '__main__':
+    for key in dataset_ids:
+        run_benchmark(key)
@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import json
+import os
+import statistics
+import threading
+import time
+import numpy as np
+from aiohttp import web
+
+# Measures request throughput of the chat request path against local stub servers that stand in for
+# Azure OpenAI (chat completions, responses, embeddings) and Azure AI Search. Every stub call waits
+# STUB_LATENCY seconds, so throughput is bounded by how many calls the app keeps in flight:
+# - "blocking": the sync clients called from a coroutine (the request path before the async clients),
+#   every request holds the event loop for its whole duration, throughput stays at ~1 / request latency
+# - "async": handle_chat on the shared AsyncOpenAI / aio SearchClient pools, throughput grows with the
+#   number of concurrent requests until the connection pools are the limit
+#
+# Run with: python -m evaluation.load_benchmark
+
+STUB_HOST = "127.0.0.1"
+STUB_PORT = int(os.getenv("LOAD_BENCHMARK_PORT", 8765))
+STUB_LATENCY = float(os.getenv("LOAD_BENCHMARK_LATENCY", 0.1))
+STUB_EMBEDDING_DIMENSIONS = 256
+CONCURRENCY_LEVELS = (1, 8, 32, 64)
+REQUESTS_PER_WORKER = 4
+# langextract metadata extraction has no async client, the benchmark replaces it with a blocking call
+# of the same latency so it still goes through the retrieval thread pool
+METADATA_LATENCY = STUB_LATENCY
+
+STUB_URL = f"http://{STUB_HOST}:{STUB_PORT}"
+# the app reads its endpoints at import time, point them at the stubs before importing it
+os.environ.update({
+    "AZURE_OPENAI_BASE_URL": f"{STUB_URL}/openai/v1/",
+    "AZURE_OPENAI_EMBEDDING_BASE_URL": f"{STUB_URL}/openai/v1/",
+    "AZURE_OPENAI_API_KEY": "stub",
+    "AZURE_OPENAI_API_EMBEDDING_KEY": "stub",
+    "LANGCHAIN_API_KEY": "stub",
+    # env.py builds the blob container clients at import, they are never used on the request path
+    "TRANSCRIPT_SAS_URL": f"{STUB_URL}/transcripts",
+    "MEETING_NOTE_SAS_URL": f"{STUB_URL}/meeting-notes",
+    "AZURE_SEARCH_ENDPOINT": STUB_URL,
+    "AZURE_SEARCH_KEY": "stub",
+    "RETRIEVAL_CACHE_BACKEND": "memory",
+    "EMBEDDING_CACHE_DIR": "",
+    "EMBEDDING_CACHE_REDIS_URL": "",
+})
+
+from src.backend.rag import RAG_bot, retrieval_utils  # noqa: E402
+from src.backend.rag.async_clients import ASYNC_CLIENTS  # noqa: E402
+
+# structured output returned for each text_format, routes every auto query to the route being benchmarked
+STRUCTURED_OUTPUTS = {
+    "QueryRoute": lambda route: {"source": route},
+    "RetrievalRoute": lambda route: {"source": "both"},
+    "MCPRoute": lambda route: {"source": "mcp"},
+}
+
+
+# ============== STUB SERVERS ==============
+
+def make_stub_app(route: str) -> web.Application:
+    """
+    aiohttp app answering the OpenAI and Azure Search endpoints used on the request path.
+
+    Args:
+        route (str): route returned for QueryRoute structured outputs (general or rag)
+    Returns:
+        web.Application: the stub app
+    """
+    async def chat_completions(request):
+        body = await request.json()
+        await asyncio.sleep(STUB_LATENCY)
+        return web.json_response({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "stub answer"},
+                "finish_reason": "stop",
+            }],
+        })
+
+    async def responses(request):
+        body = await request.json()
+        await asyncio.sleep(STUB_LATENCY)
+        text_format = body.get("text", {}).get("format", {})
+        if text_format.get("type") == "json_schema":
+            text = json.dumps(STRUCTURED_OUTPUTS[text_format["name"]](route))
+        else:
+            text = "stub instruction"
+        return web.json_response({
+            "id": "resp-stub",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body["model"],
+            "status": "completed",
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "output": [{
+                "type": "message",
+                "id": "msg-stub",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }],
+        })
+
+    async def embeddings(request):
+        body = await request.json()
+        await asyncio.sleep(STUB_LATENCY)
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        return web.json_response({
+            "object": "list",
+            "model": body["model"],
+            "data": [
+                {"object": "embedding", "index": i, "embedding": stub_embedding(text)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        })
+
+    async def search(request):
+        index_name = request.match_info["index"]
+        await asyncio.sleep(STUB_LATENCY)
+        return web.json_response({
+            "value": [
+                {"@search.score": 1.0 / (i + 1), "id": f"{index_name}-{i}", "content": f"{index_name} chunk {i}"}
+                for i in range(6)
+            ],
+        })
+
+    app = web.Application()
+    app.router.add_post("/openai/v1/chat/completions", chat_completions)
+    app.router.add_post("/openai/v1/responses", responses)
+    app.router.add_post("/openai/v1/embeddings", embeddings)
+    app.router.add_post("/indexes('{index}')/docs/search.post.search", search)
+    return app
+
+
+def stub_embedding(text: str) -> list[float]:
+    """Deterministic unit vector per text so different queries don't look similar to the retrieval cache"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    vector = np.random.default_rng(seed).standard_normal(STUB_EMBEDDING_DIMENSIONS)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def start_stub_servers(route: str) -> tuple[threading.Thread, asyncio.AbstractEventLoop, web.AppRunner]:
+    """
+    Runs the stub app on its own event loop in a background thread, so blocking calls made by the
+    benchmarked code can't stall the stubs.
+    """
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(make_stub_app(route))
+    ready = threading.Event()
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, STUB_HOST, STUB_PORT).start())
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    ready.wait()
+    return thread, loop, runner
+
+
+def stop_stub_servers(thread: threading.Thread, loop: asyncio.AbstractEventLoop, runner: web.AppRunner):
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+# ============== REQUEST PATHS ==============
+
+def stub_filter_metadata(query: str) -> dict:
+    time.sleep(METADATA_LATENCY)
+    return {}
+
+
+async def blocking_request(query: str, mode: str) -> str:
+    """The general route as it ran before the async clients: sync client calls inside a coroutine"""
+    RAG_bot.decide_route(query, "auto")
+    return RAG_bot.GeneralLLM.generate_answer(user_query=query, history=[])
+
+
+async def async_request(query: str, mode: str) -> str:
+    result = await RAG_bot.handle_chat(query, [], mode)
+    return result["answer"]
+
+
+# ============== BENCHMARK ==============
+
+async def run_level(request, concurrency: int, mode: str, label: str) -> dict:
+    """
+    Sends concurrency * REQUESTS_PER_WORKER requests with at most `concurrency` in flight.
+
+    Returns:
+        dict: {"throughput": requests per second, "p50": seconds, "p95": seconds}
+    """
+    total = concurrency * REQUESTS_PER_WORKER
+    queries = iter(f"{label} question {i}" for i in range(total))
+    latencies = []
+
+    async def worker():
+        for query in queries:
+            start = time.perf_counter()
+            await request(query, mode)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": total / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+async def run_benchmark(route: str, levels=CONCURRENCY_LEVELS) -> dict:
+    """
+    Benchmarks the blocking and async request paths for a route against fresh stub servers.
+
+    Args:
+        route (str): "general" or "rag"
+        levels: numbers of concurrent requests to measure
+    Returns:
+        dict: {(path, concurrency): result of run_level}
+    """
+    stubs = start_stub_servers(route)
+    retrieval_utils.retrieve_filter_metadata = stub_filter_metadata
+    ASYNC_CLIENTS.open()
+    paths = {"async": async_request}
+    if route == "general":
+        paths = {"blocking": blocking_request, **paths}
+
+    report = {}
+    try:
+        for name, request in paths.items():
+            for concurrency in levels:
+                label = f"{route}-{name}-{concurrency}"
+                report[(name, concurrency)] = await run_level(request, concurrency, mode="auto", label=label)
+    finally:
+        await ASYNC_CLIENTS.close()
+        stop_stub_servers(*stubs)
+    return report
+
+
+def print_report(route: str, report: dict):
+    print(f"\n{route} route, {STUB_LATENCY * 1000:.0f}ms per upstream call")
+    for (name, concurrency), result in report.items():
+        print(
+            f"{name:>8} concurrency={concurrency:<3} "
+            f"{result['throughput']:7.1f} req/s  "
+            f"p50={result['p50'] * 1000:6.0f}ms  p95={result['p95'] * 1000:6.0f}ms"
+        )
+
+
+if __name__ == '__main__':
+    for route in ("general", "rag"):
+        print_report(route, asyncio.run(run_benchmark(route)))
@@ -62,4 +62,73 @@ export async function sendChatMessage(chatId, message, mode) {
   const data = await res.json();
   if (!res.ok) throw new Error(data.detail || 'Request failed');
   return data;
-}
\ No newline at end of file
+}
+
+/**
+ * Streaming version of sendChatMessage. The backend responds with Server-Sent Events
+ * ("data: {json}" messages), each event is passed to the matching handler as it arrives:
+ *   onRoute(mode), onSources(retrieved), onToken(text)
+ * Resolves with the final "done" event, which has the same shape as sendChatMessage's result.
+ */
+export async function streamChatMessage(chatId, message, mode, { onRoute, onSources, onToken } = {}) {
+  const res = await fetch(`${BASE_URL}/chats/${chatId}/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify({
+      message,
+      mode
+    }),
+  });
+
+  if (!res.ok) {
+    let data = null;
+    try {
+      data = await res.json();
+    } catch {}
+    throw new Error(data?.detail || 'Request failed');
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+
+    // events are separated by a blank line, the last part may be incomplete
+    const parts = buffer.split('\n\n');
+    buffer = parts.pop();
+
+    for (const part of parts) {
+      const data = part
+        .split('\n')
+        .filter(line => line.startsWith('data:'))
+        .map(line => line.slice(5).trimStart())
+        .join('\n');
+      if (!data) continue;
+
+      const event = JSON.parse(data);
+      switch (event.type) {
+        case 'route':
+          onRoute?.(event.mode);
+          break;
+        case 'sources':
+          onSources?.(event.retrieved);
+          break;
+        case 'token':
+          onToken?.(event.content);
+          break;
+        case 'done':
+          return event;
+        case 'error':
+          throw new Error(event.detail || 'Request failed');
+      }
+    }
+  }
+
+  throw new Error('Stream ended before the response was complete');
+}
@@ -196,15 +196,23 @@ function Chatbot() {
     setNewMessage('');
 
     try {
-      // calls chat_loop in backend with history from redis 
-      // then stores user + assistant messages in Redis
-      // then backend returns assistant answer here
-      const data = await api.sendChatMessage(activeChatId, trimmedMessage, selectedMode);
-      
+      // streams the response of chat_loop in backend with history from redis,
+      // backend stores user + assistant messages in Redis before the stream ends
       /**
        * Takes last message which was assistant placeholder message
-       * and updates it with the real response
+       * and appends each piece of the answer to it as it arrives
        */
+      const data = await api.streamChatMessage(activeChatId, trimmedMessage, selectedMode, {
+        onToken: token => {
+          setMessages(draft => {
+            const lastMessage = draft[draft.length - 1];
+            // stays loading until the stream ends so another message can't be sent meanwhile,
+            // the spinner is replaced by the text as soon as there is content
+            lastMessage.content += token;
+          });
+        },
+      });
+
       setMessages(draft => {
         const lastMessage = draft[draft.length - 1];
         lastMessage.content = data.answer; // use data.answer as data is a dictionary with answer, mode and retrieved
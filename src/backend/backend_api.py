@@ -1,20 +1,26 @@
+import json
 from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from src.backend.rag.RAG_bot import chat_loop
+from src.backend.rag.RAG_bot import chat_loop, stream_chat, HISTORY_LEN
+from src.backend.rag.chat_summary import CHAT_SUMMARISER
+from src.backend.rag.routing_cache import ROUTING_CACHE
 from uuid import uuid4
 from redis.exceptions import ConnectionError as RedisConnectionError
 from src.backend.redis.redis_chat_store import (
     create_chat,
     chat_exists,
     get_messages,
-    append_message,
+    get_messages_page,
+    start_turn,
+    finish_turn,
     list_chats,
-    update_chat_title,
     delete_chat,
+    DEFAULT_PAGE_SIZE,
 )
-from src.backend.redis.redis_client import get_redis
+from src.backend.redis.redis_client import get_redis, REDIS_POOL
 
 router = APIRouter()
 
@@ -36,38 +42,57 @@ async def create_new_chat(rdb = Depends(get_redis)):
     return {"id": chat_id, "title": "New Chat"}
 
 @router.get("/chats")
-async def get_chats(rdb = Depends(get_redis)):
+async def get_chats(
+    limit: int | None = Query(None, ge=1, le=200),
+    before: str | None = None,
+    rdb = Depends(get_redis),
+):
     """
-    Endpoint to list all chats (not messages) for the sidebar
+    Endpoint to list chats (not messages) for the sidebar, newest first.
+    Without ``limit`` or ``before`` every chat is returned. Otherwise at most ``limit`` chats are returned,
+    pass the ``cursor`` of the last chat as ``before`` to get the next page.
     """
+    if limit is None and before is not None:
+        limit = DEFAULT_PAGE_SIZE
     try:
-        return await list_chats(rdb)
+        return await list_chats(rdb, limit=limit, before=before)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except RedisConnectionError:
         raise HTTPException(status_code=503, detail="Redis is not running")
 
 @router.get("/chats/{chat_id}/messages")
-async def get_chat_messages(chat_id: str, rdb = Depends(get_redis)):
+async def get_chat_messages(
+    chat_id: str,
+    before: int | None = Query(None, ge=0),
+    limit: int | None = Query(None, ge=1, le=500),
+    rdb = Depends(get_redis),
+):
     """
-    List messages for a particular chatId
+    List messages for a particular chatId.
+    Without ``limit`` the whole history is returned. With ``limit`` the latest ``limit`` messages are
+    returned, each with its ``index``, pass the first message's index as ``before`` to get older ones.
     """
-    if not await chat_exists(rdb, chat_id):
+    if limit is None and before is None:
+        if not await chat_exists(rdb, chat_id):
+            raise HTTPException(status_code=404, detail="Chat not found")
+        return await get_messages(rdb, chat_id)
+
+    messages = await get_messages_page(rdb, chat_id, before=before, limit=limit or DEFAULT_PAGE_SIZE)
+    if messages is None:
         raise HTTPException(status_code=404, detail="Chat not found")
-    return await get_messages(rdb, chat_id)
+    return messages
 
 @router.post("/chats/{chat_id}")
 async def chat(chat_id: str, chat_in: ChatIn, rdb = Depends(get_redis)):
     """
     Endpoint for sending a message to this particular chat and receiving a response
     """
-    if not await chat_exists(rdb, chat_id):
+    # load chat history from redis and store the new user message
+    history = await start_turn(rdb, chat_id, chat_in.message, window=HISTORY_LEN)
+    if history is None:
         raise HTTPException(status_code=404, detail=f"Chat {chat_id} does not exist")
 
-    # load chat history from redis
-    history = await get_messages(rdb, chat_id)
-
-    # store new user message in redis
-    await append_message(rdb, chat_id, "user", chat_in.message)
-
     result = await chat_loop(user_query=chat_in.message,
                             history=history,
                             mode=chat_in.mode
@@ -75,17 +100,69 @@ async def chat(chat_id: str, chat_in: ChatIn, rdb = Depends(get_redis)):
 
     answer = result["answer"] if isinstance(result, dict) else str(result)
 
-    # stores assistant message in redis
-    await append_message(rdb, chat_id, "assistant", answer)
-
-    if len(history) == 0:
-        title = chat_in.message[:40].strip()
-        if title:
-            await update_chat_title(rdb, chat_id, title)
+    await save_assistant_message(rdb, chat_id, answer, chat_in.message, first_turn=len(history) == 0)
     # Result is a dictionary containing answer, mode and potentially retrieved as keys,
     # frontend uses data.answer to display the assistant message#
     return result
 
+@router.post("/chats/{chat_id}/stream")
+async def chat_stream(chat_id: str, chat_in: ChatIn, rdb = Depends(get_redis)):
+    """
+    Streaming version of POST /chats/{chat_id}. Responds with Server-Sent Events, one JSON event per
+    ``data:`` line, in the order:
+    - {"type": "route", "mode": ...}
+    - {"type": "sources", "retrieved": [...]} (rag routes only)
+    - {"type": "token", "content": ...} for each piece of the answer
+    - {"type": "done", "answer": ..., "mode": ..., ...} same body as the non-streaming endpoint
+
+    The assistant message is stored in redis before the done event is sent.
+    If generation fails an {"type": "error", "detail": ...} event is sent instead of done.
+    """
+    # load chat history from redis and store the new user message
+    history = await start_turn(rdb, chat_id, chat_in.message, window=HISTORY_LEN)
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"Chat {chat_id} does not exist")
+
+    async def events():
+        try:
+            async for event in stream_chat(user_query=chat_in.message, history=history, mode=chat_in.mode):
+                if event["type"] == "done":
+                    await save_assistant_message(rdb, chat_id, event["answer"], chat_in.message, first_turn=len(history) == 0)
+                yield format_sse(event)
+        except Exception as e:
+            print(f"Streaming chat {chat_id} failed: {e!r}")
+            yield format_sse({"type": "error", "detail": "Failed to generate a response"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # stop proxies (e.g. nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def save_assistant_message(rdb, chat_id: str, answer: str, user_message: str, first_turn: bool):
+    """
+    Stores the assistant message in redis, and names the chat after the user's message if it was the first turn.
+    Then updates the chat's summary in the background, for when these messages leave the recent window
+    """
+    title = user_message[:40].strip() if first_turn else None
+    if await finish_turn(rdb, chat_id, answer, title=title):
+        CHAT_SUMMARISER.schedule(rdb, chat_id)
+
+def format_sse(event: dict) -> str:
+    """Formats an event as a Server-Sent Events message"""
+    return f"data: {json.dumps(event, default=str)}\n\n"
+
+@router.get("/metrics/redis")
+async def redis_pool_metrics():
+    """Saturation of this worker's Redis connection pool"""
+    return REDIS_POOL.stats()
+
+@router.get("/metrics/routing")
+async def routing_cache_metrics():
+    """Hit rates of this worker's routing cache, per routing step"""
+    return ROUTING_CACHE.stats()
+
 @router.delete("/chats/{chat_id}")
 async def delete_chat_endpoint(chat_id: str, rdb = Depends(get_redis)):
     """Delete a chat and its message history."""
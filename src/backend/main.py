@@ -1,8 +1,29 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.backend.backend_api import router
+from src.backend.rag.async_clients import ASYNC_CLIENTS
+from src.backend.rag.chat_summary import CHAT_SUMMARISER
+from src.backend.mcp.servers.clients.session_pool import MCP_SESSION_POOL
+from src.backend.redis.redis_client import REDIS_POOL
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one set of pooled OpenAI/Azure Search/Redis connections and MCP sessions per worker, shared by every request
+    ASYNC_CLIENTS.open()
+    REDIS_POOL.open()
+    await MCP_SESSION_POOL.start()
+    try:
+        yield
+    finally:
+        await MCP_SESSION_POOL.close()
+        # cancel summary updates still running before the clients they use are closed
+        await CHAT_SUMMARISER.close()
+        await REDIS_POOL.close()
+        await ASYNC_CLIENTS.close()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,4 +33,4 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
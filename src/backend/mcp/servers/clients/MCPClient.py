@@ -3,14 +3,22 @@ import json
 from typing import Optional
 from contextlib import AsyncExitStack
 from mcp import ClientSession, StdioServerParameters
-from src.backend.rag.env import deployment_name, client
+from src.backend.rag.env import deployment_name
+from src.backend.rag.async_clients import ASYNC_CLIENTS
+from src.backend.mcp.servers.clients.tool_registry import ToolRegistry
 from mcp.client.stdio import stdio_client
 import os
+import sys
 from dotenv import load_dotenv
 
 DEPLOYMENT_NAME = deployment_name
 load_dotenv()
 
+# tool calls from one model turn run at the same time, at most this many per client (shared by requests on a pooled session)
+MCP_TOOL_CONCURRENCY = int(os.getenv("MCP_TOOL_CONCURRENCY", 8))
+# seconds a single tool call may take before the model is told it timed out
+MCP_TOOL_TIMEOUT = float(os.getenv("MCP_TOOL_TIMEOUT", 60.0))
+
 class MCPClient:
     """
     Client for interacting with an MCP server (e.g. jira_server.py).
@@ -29,11 +37,15 @@ class MCPClient:
         Attributes:
             session (Optional[ClientSession]): Active MCP session used to communicate with the server
             exit_stack (AsyncExitStack): Manages async context cleanup (stdio + session)
-            client: OpenAI/Azure client used for LLM responses
+            registry (ToolRegistry): tools of every connected server, listed once and kept in OpenAI format
+            client: shared async OpenAI/Azure client used for LLM responses
+            tool_slots (asyncio.Semaphore): limits the tool calls in flight to MCP_TOOL_CONCURRENCY
         """
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
-        self.client = client
+        self.registry = ToolRegistry()
+        self.client = ASYNC_CLIENTS.llm
+        self.tool_slots = asyncio.Semaphore(MCP_TOOL_CONCURRENCY)
 
     async def connect_to_server(self, server_module: str):
         """
@@ -43,14 +55,17 @@ class MCPClient:
         - Launches the Mcp server as a subprocess using `python -m <server_module>`
         - establishes a stdio transport channel
         - creates a clientSesion for communication
-        - initialises the session and retrieves available tools
+        - initialises the session and registers its tools
+
+        It can be called once per server, the tools of every server are offered to the model together.
+        self.session is the most recently connected session.
 
         Args:
             server_module (str): Python module path to the MCP server
-                                 (e.g. "rag_chatbot.mcp.servers.jira_server")
+                                 (e.g. "src.backend.mcp.servers.jira_server")
         """
         server_params = StdioServerParameters(
-            command="python",
+            command=sys.executable,
             args=["-m", server_module],
             env={**os.environ, "PYTHONPATH": "src"},
         )
@@ -58,26 +73,28 @@ class MCPClient:
         stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
         self.stdio, self.write = stdio_transport
 
-        # create mcp sesion over stdio
-        self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+        # create mcp sesion over stdio, tools/list_changed notifications mark the server's tools stale
+        server_name = server_module.rsplit(".", 1)[-1]
+        self.session = await self.exit_stack.enter_async_context(
+            ClientSession(self.stdio, self.write, message_handler=self.registry.message_handler(server_name))
+        )
 
         await self.session.initialize()
 
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
-        print("\nConnected to server with tools:", [tool.name for tool in tools])
+        # List available tools once, queries reuse them until the server says they changed
+        await self.registry.add_server(server_name, self.session)
+        print("\nConnected to server with tools:", [tool.name for tool in self.registry.servers[server_name].tools])
 
     async def process_query(self, query: str) -> str:
         """
         Process a user query using an LLM with MCP tool-calling support.
 
         Workflow:
-        1. Retrieve available MCP tools
+        1. Retrieve available MCP tools from the registry (no round trip unless they changed)
         2. Send query + tool definitions to the LLM
         3. If LLM requests tool calls:
-            - Execute tool via MCP server
-            - Send results back to LLM
+            - Execute the tools via MCP server, the calls of one turn run concurrently
+            - Send results back to LLM, in the order the calls were made
         4. Repeat until no more tool calls are made
         5. Return final aggregated text response
 
@@ -87,23 +104,16 @@ class MCPClient:
         Returns:
             str: Final response generated by the LLM after any tool usage
         """
-        # asking MCP server what tools it has:
-        tool_response = await self.session.list_tools()
-        # convert to OpenAI format
-        available_tools = [
-            {
-                "type": "function",
-                "name": tool.name,
-                "description": tool.description or "",
-                "parameters": tool.inputSchema,
-            }
-            for tool in tool_response.tools
-        ]
+        # a session set without connect_to_server (e.g. by a caller managing its own transport)
+        if not self.registry.servers and self.session is not None:
+            await self.registry.add_server("default", self.session)
+        # already in OpenAI format
+        available_tools = await self.registry.openai_tools()
 
         final_text = []
 
         # model receives user message + List of available tools 
-        response = self.client.responses.create(
+        response = await self.client.responses.create(
             model=DEPLOYMENT_NAME,
             input=query, # query + history with query coming first
             tools=available_tools,
@@ -115,8 +125,7 @@ class MCPClient:
 
         # loop allows the model to call mutliple tools
         while True:
-            had_tool_call = False
-            next_inputs = []
+            tool_calls = []
 
             for item in response.output:
                 # message is just text the model responded with
@@ -128,9 +137,6 @@ class MCPClient:
 
                 # function called a tool
                 elif item.type == "function_call":
-                    had_tool_call = True
-                    tool_name = item.name
-                    tool_args = json.loads(item.arguments)
                     # format of item:
                     # {
                     # "name": "create_jira_issue",
@@ -138,30 +144,28 @@ class MCPClient:
                     #     "summary": "...",
                     #     "description": "..."
                     # }
+                    tool_calls.append(item)
 
-                    # call MCP tool: create_jira_issue(summary, description)
-                    result = await self.session.call_tool(tool_name, tool_args)
-
-                    if hasattr(result, "content"):
-                        #output from MCP tool called
-                        tool_output = str(result.content) 
-                    else:
-                        tool_output = str(result)
-
-                    next_inputs.append({
-                        "type": "function_call_output",
-                        "call_id": item.call_id,
-                        "output": tool_output,
-                    })
-
-            # If a tool was called the loop starts again and sets has_tool_call to false again
+            # If a tool was called the loop starts again
             # so loop breaks when no more tools are left to call or no tools where ever called
-            if not had_tool_call:
+            if not tool_calls:
                 break
+
+            # the calls of one turn don't depend on each other (e.g. one create_jira_issue per ticket)
+            # so they are sent together, gather keeps the outputs in the order of the calls
+            tool_outputs = await asyncio.gather(*(self.call_tool(item.name, item.arguments) for item in tool_calls))
+            next_inputs = [
+                {
+                    "type": "function_call_output",
+                    "call_id": item.call_id,
+                    "output": tool_output,
+                }
+                for item, tool_output in zip(tool_calls, tool_outputs)
+            ]
             
             # the previous response ID allows the model to remember the user question,
             # tool call and tool result
-            response = self.client.responses.create(
+            response = await self.client.responses.create(
                 model=DEPLOYMENT_NAME,
                 previous_response_id=response.id,
                 input=next_inputs,
@@ -171,6 +175,41 @@ class MCPClient:
 
         return "\n".join(final_text).strip()
 
+    async def call_tool(self, tool_name: str, arguments: str, timeout: float | None = None) -> str:
+        """
+        Call one MCP tool requested by the model and return its output as text.
+
+        Errors and timeouts are returned as the output rather than raised, so one failed call doesn't
+        cancel the other calls of the turn and the model can tell the user what went wrong.
+
+        Args:
+            tool_name (str): tool name used by the model
+            arguments (str): JSON arguments from the function_call item
+            timeout (float | None): seconds to wait for the tool, MCP_TOOL_TIMEOUT if None
+
+        Returns:
+            str: tool output for the function_call_output item
+        """
+        timeout = MCP_TOOL_TIMEOUT if timeout is None else timeout
+        try:
+            session, server_tool_name = self.registry.resolve(tool_name)
+        except KeyError as e:
+            return str(e)
+
+        async with self.tool_slots:
+            try:
+                # call MCP tool: create_jira_issue(summary, description)
+                result = await asyncio.wait_for(session.call_tool(server_tool_name, json.loads(arguments)), timeout=timeout)
+            except asyncio.TimeoutError:
+                return f"Tool {tool_name} timed out after {timeout}s"
+            except Exception as e:
+                return f"Tool {tool_name} failed: {e!r}"
+
+        if hasattr(result, "content"):
+            #output from MCP tool called
+            return str(result.content)
+        return str(result)
+
 
     async def chat_loop(self):
         """Run an interactive chat loop"""
@@ -195,7 +234,7 @@ class MCPClient:
         await self.exit_stack.aclose()
 
 async def main():    
-    server_module = "rag_chatbot.mcp.servers.jira_server"
+    server_module = "src.backend.mcp.servers.jira_server"
     client = MCPClient()
     try:
         await client.connect_to_server(server_module)
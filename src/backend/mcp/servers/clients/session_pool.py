@@ -0,0 +1,248 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+from dotenv import load_dotenv
+from src.backend.mcp.servers.clients.MCPClient import MCPClient
+
+load_dotenv()
+
+MCP_SERVER_MODULE = "src.backend.mcp.servers.jira_server"
+# every pooled session connects to each of these servers, their tools are offered to the model together
+MCP_SERVER_MODULES = [m.strip() for m in os.getenv("MCP_SERVER_MODULES", MCP_SERVER_MODULE).split(",") if m.strip()]
+# number of jira_server processes kept connected per API worker
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", 2))
+# requests allowed on one session at a time, MCP multiplexes requests over a session by id
+MCP_SESSION_CONCURRENCY = int(os.getenv("MCP_SESSION_CONCURRENCY", 8))
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", 30.0))
+MCP_PING_TIMEOUT = float(os.getenv("MCP_PING_TIMEOUT", 5.0))
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", 30.0))
+
+
+class PooledSession:
+    """
+    One MCPClient connected to every server module, kept open by a background task.
+
+    The stdio transport and ClientSession are anyio task groups which must be exited by the task that
+    entered them, so a dedicated task connects, waits until the session is stopped and then cleans up.
+    This lets any task (a request, the health checker) retire a session.
+
+    Attributes:
+        client (MCPClient): connected client, its tools are cached in client.registry
+        in_flight (int): number of requests currently using the session
+        healthy (bool): False once a ping failed or the session was stopped
+    """
+
+    def __init__(self, server_modules: list[str], max_concurrency: int, client_factory: Callable[[], MCPClient] = MCPClient):
+        self.server_modules = server_modules
+        self.client = client_factory()
+        self.in_flight = 0
+        self.healthy = False
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._stop = asyncio.Event()
+        self._ready: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self, timeout: float = MCP_CONNECT_TIMEOUT):
+        """Spawn the servers and connect, raises if the connections can't be made within timeout"""
+        self._ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ready), timeout=timeout)
+        except BaseException:
+            await self.stop()
+            raise
+        self.healthy = True
+
+    async def _run(self):
+        try:
+            for server_module in self.server_modules:
+                await self.client.connect_to_server(server_module)
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            await self.client.cleanup()
+            return
+        self._ready.set_result(None)
+        try:
+            await self._stop.wait()
+        finally:
+            await self.client.cleanup()
+
+    async def stop(self):
+        """Close the sessions and their server processes"""
+        self.healthy = False
+        self._stop.set()
+        if self._ready is not None and not self._ready.done():
+            # still connecting (start timed out), stop waiting for the handshake
+            self._ready.cancel()
+            self._task.cancel()
+        if self._task is not None:
+            try:
+                await self._task
+            except BaseException as e:
+                print(f"MCP session cleanup failed: {e!r}")
+            self._task = None
+
+    async def ping(self, timeout: float = MCP_PING_TIMEOUT) -> bool:
+        """Returns True if every server answered a ping within timeout"""
+        if not self.healthy or self._task is None or self._task.done():
+            return False
+        sessions = [server.session for server in self.client.registry.servers.values()]
+        try:
+            await asyncio.wait_for(asyncio.gather(*(session.send_ping() for session in sessions)), timeout=timeout)
+            return True
+        except Exception as e:
+            print(f"MCP session ping failed: {e!r}")
+            return False
+
+    @property
+    def is_full(self) -> bool:
+        return self._slots.locked()
+
+    @asynccontextmanager
+    async def use(self) -> AsyncIterator[MCPClient]:
+        """Hold one of the session's concurrency slots while the client is in use"""
+        self.in_flight += 1
+        try:
+            async with self._slots:
+                yield self.client
+        finally:
+            self.in_flight -= 1
+
+
+class MCPSessionPool:
+    """
+    Long lived, connected MCP sessions shared by every tool-using request.
+
+    Spawning jira_server, the MCP handshake and list_tools cost hundreds of milliseconds, the pool pays
+    that once per session instead of once per request. The API's lifespan starts the pool and closes it
+    on shutdown, a script that never calls start() gets its sessions on first use.
+
+    - acquire() hands out the healthy session with the fewest requests in flight, waiting for a free
+      slot when every session is at MCP_SESSION_CONCURRENCY
+    - a background task pings every session each MCP_HEALTH_CHECK_INTERVAL seconds and respawns the
+      ones that don't answer, a request that fails also gets its session checked straight away
+    - tools returns the tools listed when a session connected, merged across server_modules
+    """
+
+    def __init__(
+        self,
+        server_modules: list[str] | None = None,
+        size: int = MCP_POOL_SIZE,
+        max_concurrency: int = MCP_SESSION_CONCURRENCY,
+        health_check_interval: float = MCP_HEALTH_CHECK_INTERVAL,
+        client_factory: Callable[[], MCPClient] = MCPClient,
+    ):
+        self.server_modules = server_modules or MCP_SERVER_MODULES
+        self.size = size
+        self.max_concurrency = max_concurrency
+        self.health_check_interval = health_check_interval
+        self.client_factory = client_factory
+        self.sessions: list[PooledSession] = []
+        self._lock: asyncio.Lock | None = None
+        self._health_task: asyncio.Task | None = None
+        self._checks: set[asyncio.Task] = set()
+
+    async def start(self):
+        """Connect every session and start the health checks, sessions that fail are retried by the health checks"""
+        self._lock = self._lock or asyncio.Lock()
+        async with self._lock:
+            await self._fill()
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_check_loop())
+
+    async def close(self):
+        """Stop the health checks and close every session"""
+        for task in [self._health_task, *self._checks]:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*[t for t in [self._health_task, *self._checks] if t is not None], return_exceptions=True)
+        self._health_task = None
+        self._checks.clear()
+        sessions, self.sessions = self.sessions, []
+        await asyncio.gather(*(session.stop() for session in sessions))
+
+    async def _spawn(self) -> PooledSession | None:
+        session = PooledSession(self.server_modules, self.max_concurrency, self.client_factory)
+        try:
+            await session.start()
+        except Exception as e:
+            print(f"Failed to start MCP session for {self.server_modules}: {e!r}")
+            return None
+        return session
+
+    async def _fill(self):
+        """Spawn sessions until the pool is back to its size, must hold the lock"""
+        missing = self.size - len(self.sessions)
+        if missing <= 0:
+            return
+        spawned = await asyncio.gather(*(self._spawn() for _ in range(missing)))
+        self.sessions.extend(session for session in spawned if session is not None)
+
+    async def _replace(self, session: PooledSession):
+        """Retire a session that failed its health check and spawn a new one in its place"""
+        async with self._lock:
+            if session in self.sessions:
+                self.sessions.remove(session)
+            await session.stop()
+            await self._fill()
+
+    async def check(self, session: PooledSession):
+        """Ping one session and respawn it if it doesn't answer"""
+        if not await session.ping():
+            print("MCP session is unhealthy, respawning")
+            await self._replace(session)
+
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await asyncio.gather(*(self.check(session) for session in list(self.sessions)))
+                async with self._lock:
+                    await self._fill()
+            except Exception as e:
+                print(f"MCP health check failed: {e!r}")
+
+    async def _pick(self) -> PooledSession:
+        if self._lock is None or not self.sessions:
+            await self.start()
+        healthy = [session for session in self.sessions if session.healthy]
+        if not healthy:
+            async with self._lock:
+                await self._fill()
+            healthy = [session for session in self.sessions if session.healthy]
+        if not healthy:
+            raise ConnectionError(f"No MCP session available for {self.server_modules}")
+        available = [session for session in healthy if not session.is_full] or healthy
+        return min(available, key=lambda session: session.in_flight)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[MCPClient]:
+        """
+        Borrow a connected MCPClient for the duration of the block.
+
+        Returns:
+            AsyncIterator[MCPClient]: connected client shared with other requests, don't clean it up
+        """
+        session = await self._pick()
+        try:
+            async with session.use() as client:
+                yield client
+        except Exception:
+            # the error may be the tool or the model, only respawn if the server stopped answering
+            task = asyncio.create_task(self.check(session))
+            self._checks.add(task)
+            task.add_done_callback(self._checks.discard)
+            raise
+
+    @property
+    def tools(self) -> list:
+        """Tools listed by the servers of the first healthy session"""
+        for session in self.sessions:
+            if session.healthy:
+                return session.client.registry.tools
+        return []
+
+
+MCP_SESSION_POOL = MCPSessionPool()
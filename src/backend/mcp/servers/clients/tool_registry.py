@@ -0,0 +1,138 @@
+import asyncio
+import os
+import time
+from dotenv import load_dotenv
+from mcp import ClientSession, types
+
+load_dotenv()
+
+# tool lists are re-fetched after this many seconds even without a tools/list_changed notification
+MCP_TOOLS_TTL = float(os.getenv("MCP_TOOLS_TTL", 300.0))
+# separator between server and tool name when two servers expose a tool with the same name
+NAMESPACE_SEPARATOR = "__"
+
+
+def to_openai_tool(tool: types.Tool, name: str | None = None) -> dict:
+    """
+    Convert an MCP tool to the Responses API function tool format.
+
+    Args:
+        tool (types.Tool): tool listed by an MCP server
+        name (str | None): name exposed to the model, defaults to the tool's own name
+    Returns:
+        dict: {"type": "function", "name", "description", "parameters"}
+    """
+    return {
+        "type": "function",
+        "name": name or tool.name,
+        "description": tool.description or "",
+        "parameters": tool.inputSchema,
+    }
+
+
+class ServerTools:
+    """Tools listed by one MCP server and when they were listed"""
+
+    def __init__(self, session: ClientSession):
+        self.session = session
+        self.tools: list = []
+        self.fetched_at = 0.0
+        self.stale = True
+
+
+class ToolRegistry:
+    """
+    Tool schemas of every MCP server a client is connected to, merged into one namespace.
+
+    Each server's tools are listed once when it is added and converted to the OpenAI format once. They
+    are only listed again after the server sends tools/list_changed or after MCP_TOOLS_TTL seconds, so a
+    query costs no list_tools round trips however many servers there are.
+
+    Tool names are kept as they are unless two servers expose the same name, those tools are exposed as
+    "<server>__<tool>". resolve() maps the name the model used back to the server session and tool.
+    """
+
+    def __init__(self, ttl: float = MCP_TOOLS_TTL):
+        self.ttl = ttl
+        self.servers: dict[str, ServerTools] = {}
+        self._openai_tools: list[dict] | None = None
+        self._routes: dict[str, tuple[ClientSession, str]] = {}
+        # requests sharing a session shouldn't each re-list the same stale server
+        self._refresh_lock = asyncio.Lock()
+
+    async def add_server(self, server_name: str, session: ClientSession):
+        """Register a connected session and list its tools"""
+        self.servers[server_name] = ServerTools(session=session)
+        await self.refresh(server_name)
+
+    def mark_stale(self, server_name: str):
+        """Have the server's tools listed again before the next query"""
+        if server_name in self.servers:
+            self.servers[server_name].stale = True
+
+    def message_handler(self, server_name: str):
+        """
+        ClientSession message_handler that marks the server's tools stale on tools/list_changed.
+
+        Args:
+            server_name (str): name the server was (or will be) added under
+        """
+        async def handle(message):
+            if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+                self.mark_stale(server_name)
+        return handle
+
+    async def refresh(self, server_name: str):
+        """List one server's tools and rebuild the merged tool list"""
+        server = self.servers[server_name]
+        response = await server.session.list_tools()
+        server.tools = response.tools
+        server.fetched_at = time.monotonic()
+        server.stale = False
+        self._openai_tools = None
+
+    async def openai_tools(self) -> list[dict]:
+        """
+        Returns:
+            list[dict]: tools of every server in the OpenAI function format, refreshing stale or expired servers first
+        """
+        async with self._refresh_lock:
+            now = time.monotonic()
+            for server_name, server in self.servers.items():
+                if server.stale or now - server.fetched_at > self.ttl:
+                    await self.refresh(server_name)
+        if self._openai_tools is None:
+            self._build()
+        return self._openai_tools
+
+    def _build(self):
+        counts = {}
+        for server in self.servers.values():
+            for tool in server.tools:
+                counts[tool.name] = counts.get(tool.name, 0) + 1
+
+        openai_tools = []
+        routes = {}
+        for server_name, server in self.servers.items():
+            for tool in server.tools:
+                name = tool.name if counts[tool.name] == 1 else f"{server_name}{NAMESPACE_SEPARATOR}{tool.name}"
+                openai_tools.append(to_openai_tool(tool, name))
+                routes[name] = (server.session, tool.name)
+        self._openai_tools = openai_tools
+        self._routes = routes
+
+    def resolve(self, name: str) -> tuple[ClientSession, str]:
+        """
+        Args:
+            name (str): tool name used by the model
+        Returns:
+            tuple[ClientSession, str]: session of the server that owns the tool and the tool's name on that server
+        """
+        if name not in self._routes:
+            raise KeyError(f"Unknown tool: {name}")
+        return self._routes[name]
+
+    @property
+    def tools(self) -> list:
+        """Every server's MCP tools as listed, without namespacing"""
+        return [tool for server in self.servers.values() for tool in server.tools]
@@ -1,19 +1,152 @@
+import asyncio
+import importlib.util
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 import httpx
 from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel, Field
 import os
 from dotenv import load_dotenv
-from requests.auth import HTTPBasicAuth
 
 load_dotenv()
 
 
-# Initialize FastMCP server
-mcp = FastMCP("jira_server")
 JIRA_DOMAIN = os.getenv("JIRA_DOMAIN")
 JIRA_API_KEY = os.getenv("JIRA_API_TOKEN")
 JIRA_API_EMAIL = os.getenv("JIRA_EMAIL")
 JIRA_API_BASE = f"https://{JIRA_DOMAIN}/rest/api/3" 
 
+# one pooled client for the lifetime of the server, HTTP/2 when the optional h2 package is installed
+JIRA_HTTP2 = importlib.util.find_spec("h2") is not None
+JIRA_MAX_CONNECTIONS = int(os.getenv("JIRA_MAX_CONNECTIONS", 10))
+JIRA_TIMEOUT = float(os.getenv("JIRA_TIMEOUT", 30.0))
+# 429 and 503 responses (and connection errors) are retried, waiting for Retry-After when Jira sends it
+JIRA_MAX_RETRIES = int(os.getenv("JIRA_MAX_RETRIES", 4))
+JIRA_RETRY_BASE_DELAY = 1.0
+JIRA_MAX_RETRY_DELAY = 60.0
+RETRYABLE_STATUS = {429, 503}
+# a request that fails after it was sent (e.g. a read timeout) may still have been carried out by Jira, so it is
+# only retried if repeating it is harmless. Other methods (POST creating issues) only retry errors raised before
+# the request could be sent, so a slow response can't create the same issue twice
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+UNSENT_REQUEST_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+# Jira creates at most 50 issues per /issue/bulk request
+JIRA_BULK_LIMIT = 50
+# list_jira_projects answers from memory, the project list is re-fetched in the background once it is older than this
+JIRA_PROJECTS_TTL = float(os.getenv("JIRA_PROJECTS_TTL", 300.0))
+JIRA_PROJECTS_PAGE_SIZE = 50
+
+_jira_client: httpx.AsyncClient | None = None
+
+
+def get_jira_client() -> httpx.AsyncClient:
+    """
+    Returns the server's shared Jira client, creating it on first use.
+
+    Keeping one client means requests reuse warm keep-alive connections (and share one HTTP/2
+    connection when h2 is available) instead of a TCP + TLS handshake per tool call.
+    """
+    global _jira_client
+    if _jira_client is None:
+        _jira_client = httpx.AsyncClient(
+            base_url=JIRA_API_BASE,
+            auth=httpx.BasicAuth(JIRA_API_EMAIL or "", JIRA_API_KEY or ""),
+            headers={"Accept": "application/json"}, # content type client receives
+            http2=JIRA_HTTP2,
+            limits=httpx.Limits(max_connections=JIRA_MAX_CONNECTIONS, max_keepalive_connections=JIRA_MAX_CONNECTIONS),
+            timeout=JIRA_TIMEOUT,
+        )
+    return _jira_client
+
+
+async def close_jira_client():
+    global _jira_client
+    if _jira_client is not None:
+        await _jira_client.aclose()
+        _jira_client = None
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    try:
+        yield
+    finally:
+        await PROJECT_CACHE.close()
+        await close_jira_client()
+
+
+# Initialize FastMCP server
+mcp = FastMCP("jira_server", lifespan=lifespan)
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """
+    Seconds to wait according to the Retry-After header, which is either a number of seconds or an HTTP date.
+
+    Returns:
+        float | None: seconds to wait, None if the header is missing or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+async def jira_request(method: str, path: str, max_retries: int | None = None, **kwargs) -> httpx.Response:
+    """
+    Send a request to the Jira REST API on the shared client, retrying rate limited and unavailable responses.
+    Transport errors are retried for idempotent methods, other methods only retry connection failures
+    (see IDEMPOTENT_METHODS).
+
+    Args:
+        method (str): HTTP method
+        path (str): path under JIRA_API_BASE, e.g. "/issue"
+        max_retries (int | None): retries after the first attempt, defaults to JIRA_MAX_RETRIES
+        **kwargs: passed to httpx.AsyncClient.request (json, params, ...)
+
+    Returns:
+        httpx.Response: successful response
+
+    Raises:
+        httpx.HTTPStatusError: for error responses that aren't retried, or once retries run out
+        httpx.TransportError: if the connection keeps failing
+    """
+    client = get_jira_client()
+    max_retries = JIRA_MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            if attempt == max_retries:
+                raise
+            if method.upper() not in IDEMPOTENT_METHODS and not isinstance(e, UNSENT_REQUEST_ERRORS):
+                raise
+            delay = None
+        else:
+            if response.status_code not in RETRYABLE_STATUS or attempt == max_retries:
+                response.raise_for_status()
+                return response
+            delay = retry_after_seconds(response)
+
+        if delay is None:
+            delay = JIRA_RETRY_BASE_DELAY * 2 ** attempt * (0.5 + random.random() / 2)
+        delay = min(delay, JIRA_MAX_RETRY_DELAY)
+        # stdout is the MCP stdio transport's JSON-RPC channel, so logs go to stderr
+        print(f"Jira {method} {path} attempt {attempt + 1} failed, retrying in {delay:.1f}s", file=sys.stderr)
+        await asyncio.sleep(delay)
+
 async def make_jira_issue_request(proj_key: str="KAN", summary: str="", description: str="") -> dict | str:
     """
     Send a HTTP request to Jira to create a new issue.
@@ -34,36 +167,75 @@ async def make_jira_issue_request(proj_key: str="KAN", summary: str="", descript
             - dict: Successful JSON response from Jira API
             - str: Error message if request fails
     """
-    url = f"{JIRA_API_BASE}/issue" # /issue is for creating issues
-    headers = {
-    "Accept": "application/json", # content type client receives
-    "Content-Type": "application/json" # content type of request client sends
-    }
-    auth = HTTPBasicAuth(JIRA_API_EMAIL, JIRA_API_KEY)
-    payload = {
-        "fields": {
-            "project": {
-                "key": proj_key
-            },
-            "summary": summary,
-            "description": jira_description(description),
-            "issuetype": {
-                "name": "Task"
-            }
+    payload = {"fields": issue_fields(proj_key=proj_key, summary=summary, description=description)}
+    try:
+        # /issue is for creating issues
+        response = await jira_request("POST", "/issue", json=payload)
+        return response.json() # JSON response should contain id, key and url to issue
+    except Exception as e:
+        return str(e)
+
+
+def issue_fields(proj_key: str, summary: str, description: str) -> dict:
+    """
+    Fields of a new Task issue, as sent to /issue and in each entry of /issue/bulk
+
+    Args:
+        proj_key (str): Jira project key (e.g. "KAN")
+        summary (str): Title of the issue
+        description (str): Description text for the issue
+    Returns:
+        dict: the "fields" object of the request
+    """
+    return {
+        "project": {
+            "key": proj_key
+        },
+        "summary": summary,
+        "description": jira_description(description),
+        "issuetype": {
+            "name": "Task"
         }
     }
-    async with httpx.AsyncClient() as client:
+
+
+async def make_jira_bulk_issue_request(issues: list[dict]) -> list[dict]:
+    """
+    Create issues with /issue/bulk, JIRA_BULK_LIMIT issues per request with the requests sent concurrently.
+
+    Args:
+        issues (list[dict]): {"proj_key", "summary", "description"} for each issue
+
+    Returns:
+        list[dict]: one entry per issue in input order, {"key": ...} when created or {"error": ...} when not
+    """
+    async def send(batch_start: int, batch: list[dict]) -> list[tuple[int, dict]]:
+        payload = {"issueUpdates": [{"fields": issue_fields(**issue)} for issue in batch]}
         try:
-            response = await client.post(
-                url=url,
-                headers=headers,
-                auth=auth,
-                json=payload,
-                timeout=30.0)
-            response.raise_for_status()
-            return response.json() # JSON response should contain id, key and url to issue
+            response = await jira_request("POST", "/issue/bulk", json=payload)
         except Exception as e:
-            return str(e)
+            return [(batch_start + i, {"error": str(e)}) for i in range(len(batch))]
+
+        body = response.json()
+        results = []
+        failed = {}
+        for error in body.get("errors", []):
+            element_errors = error.get("elementErrors", {})
+            messages = list(element_errors.get("errors", {}).values()) + element_errors.get("errorMessages", [])
+            failed[error.get("failedElementNumber")] = "; ".join(messages) or f"status {error.get('status')}"
+        # Jira returns the created issues in request order, skipping the ones that failed
+        created = iter(body.get("issues", []))
+        for i in range(len(batch)):
+            if i in failed:
+                results.append((batch_start + i, {"error": failed[i]}))
+            else:
+                issue = next(created, None)
+                results.append((batch_start + i, {"key": issue["key"]} if issue else {"error": "not created"}))
+        return results
+
+    batches = [issues[i:i + JIRA_BULK_LIMIT] for i in range(0, len(issues), JIRA_BULK_LIMIT)]
+    sent = await asyncio.gather(*(send(i * JIRA_BULK_LIMIT, batch) for i, batch in enumerate(batches)))
+    return [result for _, result in sorted(pair for batch in sent for pair in batch)]
     
 def jira_description(text: str) -> dict:
     """
@@ -92,34 +264,126 @@ async def test():
     response = await list_jira_projects()
     print(response)
 
+async def fetch_projects(etag: str | None = None) -> tuple[list[dict] | None, str | None]:
+    """
+    Fetch every page of Jira's project search endpoint.
+
+    Pages are followed through nextPage until isLast, so sites with more projects than one page
+    are listed in full.
+
+    Args:
+        etag (str | None): ETag of the previously fetched list, sent as If-None-Match
+
+    Returns:
+        tuple[list[dict] | None, str | None]: project objects (None if unchanged since etag) and the list's ETag
+
+    Raises:
+        httpx.HTTPError: if a page can't be fetched
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    params = {"startAt": 0, "maxResults": JIRA_PROJECTS_PAGE_SIZE}
+    try:
+        response = await jira_request("GET", "/project/search", params=params, headers=headers)
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 304:
+            return None, etag
+        raise
+
+    etag = response.headers.get("ETag")
+    page = response.json()
+    projects = list(page["values"])
+    while page.get("isLast") is False and page["values"]:
+        if page.get("nextPage"):
+            response = await jira_request("GET", page["nextPage"])
+        else:
+            params["startAt"] = page.get("startAt", params["startAt"]) + len(page["values"])
+            response = await jira_request("GET", "/project/search", params=params)
+        page = response.json()
+        projects.extend(page["values"])
+    return projects, etag
+
+
 async def get_all_projects() -> dict | str:   
     """
     Fetch all Jira projects accessible to the authenticated user.
 
-    Sends a GET request to Jira's project search endpoint.
+    Sends GET requests to Jira's project search endpoint, one per page.
 
     Returns:
         dict | str:
-            - dict: JSON response containing project metadata
+            - dict: {"values": [...]} with the metadata of every project
             - str: Error message if request fails
     """
-    url = f"{JIRA_API_BASE}/project/search"
-    headers = {
-    "Accept": "application/json", # content type client receives
-    #"Content-Type": "application/json" # content type of request client sends
-    }
-    auth = HTTPBasicAuth(JIRA_API_EMAIL, JIRA_API_KEY)
-    async with httpx.AsyncClient() as client:
+    try:
+        projects, _ = await fetch_projects()
+        return {"values": projects}
+    except Exception as e:
+        return str(e)
+
+
+class ProjectCache:
+    """
+    In-memory copy of the site's project list for list_jira_projects.
+
+    The first call fetches every page, later calls return the same list without any request. Once the
+    list is older than ttl it is still returned straight away while one background refresh fetches it
+    again, sending the ETag Jira gave so an unchanged list costs a single 304. If a refresh fails the old
+    list keeps being served.
+    """
+
+    def __init__(self, ttl: float = JIRA_PROJECTS_TTL):
+        self.ttl = ttl
+        self.projects: list[dict] | None = None
+        self.etag: str | None = None
+        self.fetched_at = 0.0
+        self._lock: asyncio.Lock | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+    async def get(self) -> list[dict]:
+        """
+        Returns:
+            list[dict]: {"key", "name", "id"} of every project
+
+        Raises:
+            httpx.HTTPError: if nothing is cached yet and Jira can't be reached
+        """
+        if self.projects is None:
+            self._lock = self._lock or asyncio.Lock()
+            async with self._lock:
+                # requests that waited on the lock find the list the first one fetched
+                if self.projects is None:
+                    await self.refresh()
+        elif time.monotonic() - self.fetched_at > self.ttl and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+        return self.projects
+
+    async def refresh(self):
+        """Fetch the project list again, keeping the cached one if Jira says it is unchanged"""
+        projects, etag = await fetch_projects(etag=self.etag if self.projects is not None else None)
+        if projects is not None:
+            self.projects = [{"key": p["key"], "name": p["name"], "id": p["id"]} for p in projects]
+            self.etag = etag
+        self.fetched_at = time.monotonic()
+
+    async def _background_refresh(self):
         try:
-            response = await client.get(
-                url=url,
-                headers=headers,
-                auth=auth,
-                timeout=30.0)
-            response.raise_for_status()
-            return response.json() # JSON response should contain id, key and url to issue
+            await self.refresh()
         except Exception as e:
-            return str(e)
+            print(f"Jira project refresh failed, serving cached projects: {e!r}", file=sys.stderr)
+
+    def invalidate(self):
+        """Fetch the project list on the next call"""
+        self.projects = None
+        self.etag = None
+
+    async def close(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+        self._refresh_task = None
+
+
+PROJECT_CACHE = ProjectCache()
 
 @mcp.tool()
 async def list_jira_projects() -> dict | str:
@@ -127,7 +391,7 @@ async def list_jira_projects() -> dict | str:
     MCP tool: List all Jira projects available to the user.
 
     This function:
-    - Calls Jira API to retrieve projects
+    - Returns the projects cached in PROJECT_CACHE, fetching them from Jira on first use
     - Extracts key metadata (key, name, id)
     - Returns a simplified list for LLM/tool consumption
 
@@ -136,20 +400,11 @@ async def list_jira_projects() -> dict | str:
             - list of projects with keys: key, name, id
             - error string if request fails
     """
-    response = await get_all_projects()
-    if not response:
+    try:
+        return await PROJECT_CACHE.get()
+    except Exception as e:
+        print(f"Unable to list Jira projects: {e!r}", file=sys.stderr)
         return "Unable to make Jira Request"
-    
-    projects = [
-        {
-            "key": p["key"],
-            "name": p["name"],
-            "id": p["id"]
-        }
-        for p in response["values"]
-    ]
-
-    return projects
 
 @mcp.tool()
 async def create_jira_issue(summary: str, description: str, proj_key: str) -> str:
@@ -191,6 +446,44 @@ async def create_jira_issue(summary: str, description: str, proj_key: str) -> st
             "message": Jira issue **{response['key']}** created successfully"
         """
 
+class JiraIssue(BaseModel):
+    summary: str = Field(description="Title of the issue")
+    description: str = Field(description="Detailed description")
+    proj_key: str = Field(description='Jira project key (e.g. "KAN")')
+
+
+@mcp.tool()
+async def create_jira_issues_bulk(issues: list[JiraIssue]) -> str:
+    """
+    MCP tool: Create several Jira issues at once. Prefer this over calling create_jira_issue
+    repeatedly when more than one issue is needed.
+
+    Args:
+        issues (list[JiraIssue]): the issues to create, each with summary, description and proj_key
+
+    Returns:
+        str:
+            One line per issue, in the order given, with either
+            - the issue key and direct URL
+            - OR the reason it wasn't created
+    """
+    if not issues:
+        return "No issues to create"
+
+    jira_site = f"https://{JIRA_DOMAIN}.atlassian.net/"
+    results = await make_jira_bulk_issue_request([issue.model_dump() for issue in issues])
+
+    lines = []
+    for issue, result in zip(issues, results):
+        if "key" in result:
+            lines.append(f'"{issue.summary}": created **{result["key"]}** {jira_site}/browse/{result["key"]}')
+        else:
+            lines.append(f'"{issue.summary}": failed, {result["error"]}')
+    created = sum("key" in result for result in results)
+    lines.append(f"{created} of {len(results)} Jira issues created")
+    return "\n".join(lines)
+
+
 def main():
     mcp.run(transport="stdio")
 
@@ -1,5 +1,23 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, Field
+from src.backend.rag.context_cache import CONTEXT_CACHE, context_key
 from src.backend.rag.env import client, deployment_name
 
+# number of chunks the LLM writes contexts for in one request
+CHUNKS_PER_REQUEST = 16
+# number of a document's batches sent at the same time (after the first one)
+BATCH_CONCURRENCY = 4
+
+
+class ChunkContext(BaseModel):
+    index: int = Field(description="The index attribute of the <chunk> this context is for")
+    context: str = Field(description="1-2 sentences of retrieval-oriented context for the chunk")
+
+
+class ChunkContexts(BaseModel):
+    contexts: list[ChunkContext] = Field(description="One context for every chunk given")
+
 
 class LLMChunker:
     """
@@ -13,6 +31,11 @@ class LLMChunker:
     - Identify what the chunk is about
     - Place it within the structure of the full document
     - Improve semantic search and ranking
+
+    return_responses is the batched version used for ingestion. Every request starts with the same
+    instructions and document, and only the chunks at the end of the prompt change, so the provider's
+    prompt cache serves the document after the first request. Generated contexts are stored in the
+    context cache so re-chunking an unchanged document makes no LLM calls.
     """
 
 
@@ -37,7 +60,25 @@ class LLMChunker:
     Do not invent missing hierarchy.
     Return only the context. 
     """
-    
+
+    # the instructions and document come first and never change between a document's requests,
+    # keep anything that varies (the chunks) after them so the prompt prefix can be cached
+    batch_instructions = """
+    You will be given a document and then a list of chunks taken from it, each in a <chunk index="..."> tag.
+
+    For every chunk, write 1–2 sentences of retrieval-oriented context.
+
+    The context should identify:
+    1. the main topic of the chunk,
+    2. where it sits in the document hierarchy,
+    3. any parent epic or story if explicitly present in the document,
+    4. the type of content (e.g. story description, acceptance criteria, implementation note, meeting discussion, action item).
+
+    Prefer explicit document structure over vague summary.
+    Do not invent missing hierarchy.
+    Return one context per chunk, with the index of the chunk it belongs to.
+    """
+
     def __init__(self):
         """initialises chunker with pre-configured client"""
         self.client = client
@@ -60,4 +101,71 @@ class LLMChunker:
             model=deployment_name,
             input=msg,
         )
-        return response.output_text
\ No newline at end of file
+        return response.output_text
+
+    def return_responses(self, document: str, chunks: list[str]) -> list[str]:
+        """
+        returns a brief description for every chunk passed in, generated CHUNKS_PER_REQUEST chunks at a time
+
+        Contexts already in the context cache are reused. The first batch is sent on its own so the document
+        is in the prompt cache before the remaining batches are sent concurrently. A chunk the model didn't
+        return a context for falls back to return_response.
+
+        Args:
+            document (str): Entire text document
+            chunks (list[str]): chunks that belong in the document
+        Returns:
+            list[str]: context for each chunk, in the same order as chunks
+        """
+        keys = [context_key(deployment_name, document, chunk) for chunk in chunks]
+        cached = CONTEXT_CACHE.get_many(keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        batches = [missing[i:i + CHUNKS_PER_REQUEST] for i in range(0, len(missing), CHUNKS_PER_REQUEST)]
+
+        generated: dict[int, str] = {}
+        if batches:
+            generated.update(self._batch_contexts(document, chunks, batches[0]))
+        if len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY) as executor:
+                for contexts in executor.map(lambda batch: self._batch_contexts(document, chunks, batch), batches[1:]):
+                    generated.update(contexts)
+
+        for i in missing:
+            if i not in generated:
+                generated[i] = self.return_response(document=document, chunk=chunks[i])
+
+        CONTEXT_CACHE.put_many({keys[i]: generated[i] for i in missing})
+        return [cached[key] if key in cached else generated[i] for i, key in enumerate(keys)]
+
+    def _batch_contexts(self, document: str, chunks: list[str], indexes: list[int]) -> dict[int, str]:
+        """
+        Generates contexts for chunks[i] for every i in indexes in a single structured output request.
+
+        Returns:
+            dict[int, str]: chunk index -> context, chunks the model skipped are left out
+        """
+        chunk_list = "\n".join(f'<chunk index="{i}">\n{chunks[i]}\n</chunk>' for i in indexes)
+
+        try:
+            response = self.client.responses.parse(
+                model=deployment_name,
+                input=[
+                    {"role": "developer", "content": self.batch_instructions},
+                    {"role": "user", "content": f"<document>\n{document}\n</document>"},
+                    {"role": "user", "content": f"<chunks>\n{chunk_list}\n</chunks>"},
+                ],
+                text_format=ChunkContexts,
+                # requests for the same document are routed to the same prompt cache
+                prompt_cache_key=hashlib.sha256(document.encode("utf-8")).hexdigest()[:32],
+            )
+        except Exception as e:
+            print(f"Batched chunk context request failed, falling back to one request per chunk: {e!r}")
+            return {}
+
+        wanted = set(indexes)
+        return {
+            c.index: c.context.strip()
+            for c in response.output_parsed.contexts
+            if c.index in wanted and c.context.strip()
+        }
@@ -1,12 +1,59 @@
 
 import json
-from typing import Literal
+import os
+from typing import AsyncIterator, Literal
 from pydantic import BaseModel, Field
-from src.backend.rag.retrieval_utils import retrieve_context
+from src.backend.rag.retrieval_utils import aretrieve_context
+from src.backend.rag.async_clients import ASYNC_CLIENTS
+from src.backend.rag.context_packer import pack_context, CONTEXT_SEPARATOR
+from src.backend.rag.embedding_utils import estimate_tokens
+from src.backend.rag.routing_cache import ROUTING_CACHE
 from src.backend.rag.env import deployment_name, client
-from src.backend.mcp.servers.clients.MCPClient import MCPClient
+from src.backend.mcp.servers.clients.session_pool import MCPSessionPool, MCP_SESSION_POOL
+from src.backend.redis.redis_chat_store import SUMMARY_ROLE
 
 HISTORY_LEN = 6
+# the recent messages sent with a query are cut to this many (estimated) tokens, older messages are
+# only seen through the chat's summary, so prompts stay the same size however long a chat gets
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", 3000))
+# a message that doesn't fit whole is cut to the budget left, unless less than this is left
+HISTORY_MIN_PARTIAL_TOKENS = 100
+
+
+def history_messages(history: list[dict]) -> list[dict]:
+    """
+    The part of a chat's history sent to the model with a query: the summary of the chat's older
+    messages as a system message if there is one, then the most recent messages (at most HISTORY_LEN)
+    that fit in HISTORY_TOKEN_BUDGET. The oldest message that doesn't fit whole is cut to its end.
+
+    Args:
+        history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"},
+            optionally starting with a {"role": SUMMARY_ROLE, ...} entry (see redis_chat_store.start_turn)
+
+    Returns:
+        list[dict]: {"role", "content"} messages, oldest first
+    """
+    summary = None
+    if history and history[0]["role"] == SUMMARY_ROLE:
+        summary, history = history[0]["content"], history[1:]
+
+    recent = []
+    budget = HISTORY_TOKEN_BUDGET
+    for msg in reversed(history[-HISTORY_LEN:]):
+        tokens = estimate_tokens(msg["content"])
+        if tokens <= budget:
+            recent.append({"role": msg["role"], "content": msg["content"]})
+            budget -= tokens
+            continue
+        if budget >= HISTORY_MIN_PARTIAL_TOKENS:
+            # keep the end of the message, the part closest to the current question
+            recent.append({"role": msg["role"], "content": "..." + msg["content"][-(budget - 2) * 4:]})
+        break
+    recent.reverse()
+
+    if summary:
+        recent.insert(0, {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"})
+    return recent
 
 class QueryRoute(BaseModel):
     source: Literal["general", "rag", "mcp", "rag_then_mcp"] = Field(
@@ -36,6 +83,62 @@ class GeneralLLM:
         Returns:
             str: The client's response in string, text format
         """
+        messages = GeneralLLM.build_messages(user_query=user_query, history=history)
+
+        # The client expects the last message to be the latest user_query so it should be last in the list
+        response = client.chat.completions.create(
+            model=deployment_name,
+            messages=messages
+        )
+        
+        # choices is a list of possible responses, choices[0] is the first one.
+        return response.choices[0].message.content
+
+    @staticmethod
+    async def agenerate_answer(user_query: str, history: list[dict]) -> str:
+        """
+        Async version of generate_answer using the shared async client, used on the API's request path
+
+        Args:
+            user_query (str): The user's query
+            history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"}
+
+        Returns:
+            str: The client's response in string, text format
+        """
+        messages = GeneralLLM.build_messages(user_query=user_query, history=history)
+        response = await ASYNC_CLIENTS.llm.chat.completions.create(
+            model=deployment_name,
+            messages=messages
+        )
+        return response.choices[0].message.content
+
+    @staticmethod
+    async def stream_answer(user_query: str, history: list[dict]) -> AsyncIterator[str]:
+        """
+        Same as agenerate_answer but yields the answer in pieces as the model generates it
+
+        Args:
+            user_query (str): The user's query
+            history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"}
+
+        Returns:
+            AsyncIterator[str]: pieces of the answer text, in order
+        """
+        messages = GeneralLLM.build_messages(user_query=user_query, history=history)
+        stream = await ASYNC_CLIENTS.llm.chat.completions.create(
+            model=deployment_name,
+            messages=messages,
+            stream=True
+        )
+        async for content in aiter_stream_text(stream):
+            yield content
+
+    @staticmethod
+    def build_messages(user_query: str, history: list[dict]) -> list[dict]:
+        """
+        Builds the messages sent to the model: system prompt, recent history (see history_messages) and the user query
+        """
         messages = [
             {
                 "role": "system",
@@ -59,59 +162,29 @@ class GeneralLLM:
             }
         ]
         
-        # appends last (HISTORY_LEN (6)) messages to messages array, messages sent to model
-        for msg in history[-HISTORY_LEN:]:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        # appends the summary and last (at most HISTORY_LEN (6)) messages to messages array, messages sent to model
+        messages.extend(history_messages(history))
 
         # append the user query as the last message
         messages.append({"role": "user", "content": user_query})
-
-        # The client expects the last message to be the latest user_query so it should be last in the list
-        response = client.chat.completions.create(
-            model=deployment_name,
-            messages=messages
-        )
-        
-        # choices is a list of possible responses, choices[0] is the first one.
-        return response.choices[0].message.content
+        return messages
     
 
 class MCPLLM:
     """Client for interacting with an MCP server using an LLM.
 
     This class manages:
-    - Connection to an MCP server
+    - Borrowing a connected MCP session from the shared session pool
     - Formatting of user query + conversation history
     - Sending requests via MCPClient
 
     Attributes:
-        server_module (str): Path to the MCP server module.
-        client (MCPClient): Underlying MCP client instance.
-        connected (bool): Tracks whether the client is connected.
+        pool (MCPSessionPool): pool of connected jira_server sessions, shared by every request
     """
 
-    server_module = "rag_chatbot.mcp.servers.jira_server"
+    def __init__(self, pool: MCPSessionPool | None = None):
+        self.pool = pool or MCP_SESSION_POOL
 
-    def __init__(self):
-        self.client = MCPClient()
-        self.connected = False
-    
-    async def connect_to_MCPserver(self) -> None:
-        """
-        client attempts to connect to mcp server if it has not already connected
-        """
-        if self.connected:
-            return
-        try:
-            await self.client.connect_to_server(self.server_module)
-            self.connected = True
-        except Exception as e:
-            print(f"Exception occured {e}")
-            raise
-    
     async def generate_answer(self, user_query: str, history: list[dict]) -> str:
         """
         returns response of mcp client which has access to tools provided by mcp server (jira_server.py)
@@ -123,29 +196,15 @@ class MCPLLM:
         Returns:
             str: response from mcp client
         """
-        messages = []
-
-        for msg in history[-HISTORY_LEN:]:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
-        
+        messages = history_messages(history)
         messages.append({"role": "user", "content": user_query})
 
-        await self.connect_to_MCPserver()
-        
-        # message passed in includes history
-        response = await self.client.process_query(query=messages)
+        # the session stays open for the next request, it is closed with the pool
+        async with self.pool.acquire() as client:
+            # message passed in includes history
+            response = await client.process_query(query=messages)
         
         return response
-    async def cleanup(self) -> None:
-        """
-        calls the cleanup function (only if the client is currently connected) from the MCP client and sets connected back to false
-        """
-        if self.connected:
-            await self.client.cleanup()
-            self.connected = False
 
 class RAGLLM:
     """
@@ -162,10 +221,64 @@ class RAGLLM:
             context (list[dict]): list of texts representing retrieved chunks of context
             history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"}
         """
-        
-        context_texts = [doc["content"] for doc in context]
+        messages = RAGLLM.build_messages(user_query=user_query, context=context, history=history)
+
+        response = client.chat.completions.create(
+            model=deployment_name,
+            messages=messages
+        )
+
+        return response.choices[0].message.content
 
-        context_block = "\n\n---\n\n".join(context_texts) # join to form one big string for ingestion into message to LLM
+    @staticmethod
+    async def agenerate_answer(user_query: str, context: list[dict], history: list[dict]) -> str:
+        """
+        Async version of generate_answer using the shared async client, used on the API's request path
+
+        Args:
+            user_query (str): The user's query
+            context (list[dict]): list of texts representing retrieved chunks of context
+            history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"}
+        """
+        messages = RAGLLM.build_messages(user_query=user_query, context=context, history=history)
+        response = await ASYNC_CLIENTS.llm.chat.completions.create(
+            model=deployment_name,
+            messages=messages
+        )
+        return response.choices[0].message.content
+
+    @staticmethod
+    async def stream_answer(user_query: str, context: list[dict], history: list[dict]) -> AsyncIterator[str]:
+        """
+        Same as agenerate_answer but yields the answer in pieces as the model generates it
+
+        Args:
+            user_query (str): The user's query
+            context (list[dict]): list of texts representing retrieved chunks of context
+            history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"}
+
+        Returns:
+            AsyncIterator[str]: pieces of the answer text, in order
+        """
+        messages = RAGLLM.build_messages(user_query=user_query, context=context, history=history)
+        stream = await ASYNC_CLIENTS.llm.chat.completions.create(
+            model=deployment_name,
+            messages=messages,
+            stream=True
+        )
+        async for content in aiter_stream_text(stream):
+            yield content
+
+    @staticmethod
+    def build_messages(user_query: str, context: list[dict], history: list[dict]) -> list[dict]:
+        """
+        Builds the messages sent to the model: system prompt, recent history (see history_messages),
+        then the retrieved context together with the user query. The context is deduplicated and cut to
+        CONTEXT_TOKEN_BUDGET tokens, best ranked chunks first (see context_packer.pack_context)
+        """
+        context_texts = [doc["content"] for doc in pack_context(context)]
+
+        context_block = CONTEXT_SEPARATOR.join(context_texts) # join to form one big string for ingestion into message to LLM
         messages = [
             {
                 "role": "system",
@@ -178,11 +291,7 @@ class RAGLLM:
             }
         ]
 
-        for msg in history[-HISTORY_LEN:]:
-            messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+        messages.extend(history_messages(history))
 
         messages.append({
             "role": "user",
@@ -196,16 +305,46 @@ class RAGLLM:
                     Answer:
                     """
         })
+        return messages
 
-        response = client.chat.completions.create(
+
+async def aiter_stream_text(stream) -> AsyncIterator[str]:
+    """
+    Yields the text of each chunk of a streamed chat completion, skipping chunks without content
+    (e.g. the role-only first chunk or Azure's content filter chunks)
+    """
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        content = chunk.choices[0].delta.content
+        if content:
+            yield content
+
+
+def decide_mcp_subroute(user_query: str) -> str:
+    prompt = get_mcp_subroute_prompt(user_query)
+
+    response = client.responses.parse(
+        model=deployment_name,
+        input=prompt,
+        text_format=MCPRoute,
+    )
+
+    return response.output_parsed.source
+
+async def adecide_mcp_subroute(user_query: str) -> str:
+    """async version of decide_mcp_subroute using the shared async client, decisions are cached (see routing_cache)"""
+    async def classify() -> str:
+        response = await ASYNC_CLIENTS.llm.responses.parse(
             model=deployment_name,
-            messages=messages
+            input=get_mcp_subroute_prompt(user_query),
+            text_format=MCPRoute,
         )
+        return response.output_parsed.source
 
-        return response.choices[0].message.content
-       
+    return await ROUTING_CACHE.route("mcp_subroute", user_query, get_mcp_subroute_prompt, classify)
 
-def decide_mcp_subroute(user_query: str) -> str:
+def get_mcp_subroute_prompt(user_query: str) -> str:
     prompt = f"""
     Classify this user request into one of:
     - mcp
@@ -221,14 +360,7 @@ def decide_mcp_subroute(user_query: str) -> str:
     - mcp
     - rag_then_mcp
     """
-
-    response = client.responses.parse(
-        model=deployment_name,
-        input=prompt,
-        text_format=MCPRoute,
-    )
-
-    return response.output_parsed.source
+    return prompt
 
 def get_routing_prompt(user_query: str) -> str:
     prompt = f"""
@@ -292,7 +424,52 @@ def decide_route(user_query: str, mode: str = "auto") -> str:
 
     return response.output_parsed.source
 
+async def adecide_route(user_query: str, mode: str = "auto") -> str:
+    """
+    async version of decide_route using the shared async client, used on the API's request path.
+    The LLM's decisions are cached, a repeated query skips the call (see routing_cache)
+
+    Args:
+        user_query (str): The user's input query
+        mode (str): one of [auto (let the LLM decide), llm (general), rag, mcp,]
+
+    Returns:
+        str: one of [general, rag, mcp, rag_then_mcp]
+    """
+    match mode:
+        case "llm":
+            return "general"
+        case "rag":
+            return "rag"
+        case "mcp":
+            return await adecide_mcp_subroute(user_query)
+
+    async def classify() -> str:
+        response = await ASYNC_CLIENTS.llm.responses.parse(
+            model=deployment_name,
+            input=get_routing_prompt(user_query),
+            text_format=QueryRoute,
+        )
+        return response.output_parsed.source
+
+    return await ROUTING_CACHE.route("route", user_query, get_routing_prompt, classify)
+
 def build_grounded_task(user_query: str, context: list[dict]):
+    response = client.responses.parse(
+        model=deployment_name, # gpt-5.2-chat
+        input=get_grounded_task_prompt(user_query, context),
+    )
+    return response.output_text
+
+async def abuild_grounded_task(user_query: str, context: list[dict]) -> str:
+    """async version of build_grounded_task using the shared async client"""
+    response = await ASYNC_CLIENTS.llm.responses.parse(
+        model=deployment_name,
+        input=get_grounded_task_prompt(user_query, context),
+    )
+    return response.output_text
+
+def get_grounded_task_prompt(user_query: str, context: list[dict]) -> str:
     context_texts = [doc["content"] for doc in context]
     context_block = "\n\n---\n\n".join(context_texts)
 
@@ -316,11 +493,7 @@ def build_grounded_task(user_query: str, context: list[dict]):
 
     Tool-ready instruction:
     """
-    response = client.responses.parse(
-        model=deployment_name, # gpt-5.2-chat
-        input=prompt,
-    )
-    return response.output_text
+    return prompt
 
 async def handle_chat(user_query: str, history: list[dict], mode: str = "auto") -> dict:
     """
@@ -333,16 +506,29 @@ async def handle_chat(user_query: str, history: list[dict], mode: str = "auto")
     Returns:
         dict: Containing fields: "answer", "mode", "retrieved" (optional), "grounded task" (optional)
     """
-    route = decide_route(user_query, mode)
+    route = await adecide_route(user_query, mode)
+    return await answer_route(route, user_query, history)
+
 
+async def answer_route(route: str, user_query: str, history: list[dict]) -> dict:
+    """
+    generates the answer for a query that has already been routed
+
+    Args:
+        route (str): one of [general, rag, mcp, rag_then_mcp] as returned by adecide_route
+        user_query (str): The User's input query
+        history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"}
+    Returns:
+        dict: Containing fields: "answer", "mode", "retrieved" (optional), "grounded task" (optional)
+    """
     if route == "general":
         return {
-            "answer": GeneralLLM.generate_answer(user_query=user_query, history=history),
+            "answer": await GeneralLLM.agenerate_answer(user_query=user_query, history=history),
             "mode": "general",
         }
      
     elif route == "rag":
-        context = retrieve_context(user_query)
+        context = await aretrieve_context(user_query)
         # fallback in case there is no context for some reason
         if not context:
             return {
@@ -352,49 +538,97 @@ async def handle_chat(user_query: str, history: list[dict], mode: str = "auto")
             }
         
         return {
-            "answer": RAGLLM.generate_answer(user_query=user_query, context=context, history=history),
+            "answer": await RAGLLM.agenerate_answer(user_query=user_query, context=context, history=history),
             "mode": "rag",
             "retrieved": context
         }
 
     elif route == "mcp":
         mcp_llm = MCPLLM()
-        try:
-                
-            return {
-                "answer": await mcp_llm.generate_answer(user_query=user_query, history=history),
-                "mode": "mcp",
-            }
-        finally:
-            await mcp_llm.cleanup()
+        return {
+            "answer": await mcp_llm.generate_answer(user_query=user_query, history=history),
+            "mode": "mcp",
+        }
 
     elif route == "rag_then_mcp":
         mcp_llm = MCPLLM()
-        try:
-            context = retrieve_context(user_query)
-            grounded_task = build_grounded_task(user_query, context)
+        context = await aretrieve_context(user_query)
+        grounded_task = await abuild_grounded_task(user_query, context)
 
-            # the mcp client needs the query to be in a string format 
-            # This maintains a json format while keeping the output a string
-            if not isinstance(grounded_task, str):
-                grounded_task = json.dumps(grounded_task)
+        # the mcp client needs the query to be in a string format 
+        # This maintains a json format while keeping the output a string
+        if not isinstance(grounded_task, str):
+            grounded_task = json.dumps(grounded_task)
 
-            mcp_result = await mcp_llm.generate_answer(user_query=grounded_task, history=history)
-            return {
-                "answer": mcp_result,
-                "mode": "rag_then_mcp",
-                "retrieved": context,
-                "grounded_task": grounded_task
-            }
-        finally:
-            await mcp_llm.cleanup()
+        mcp_result = await mcp_llm.generate_answer(user_query=grounded_task, history=history)
+        return {
+            "answer": mcp_result,
+            "mode": "rag_then_mcp",
+            "retrieved": context,
+            "grounded_task": grounded_task
+        }
     else:
         return {
-            "answer": GeneralLLM.generate_answer(user_query=user_query, history=history),
+            "answer": await GeneralLLM.agenerate_answer(user_query=user_query, history=history),
             "mode": "general",
         }
 
 
+async def stream_chat(user_query: str, history: list[dict], mode: str = "auto") -> AsyncIterator[dict]:
+    """
+    streaming version of handle_chat, yields events as soon as they are available:
+    - {"type": "route", "mode": ...} once the route has been decided
+    - {"type": "sources", "retrieved": [...]} once context has been retrieved (rag routes only)
+    - {"type": "token", "content": ...} pieces of the answer as they are generated
+    - {"type": "done", ...} the same dict handle_chat returns, with the full answer
+
+    general and rag answers are streamed token by token, MCP answers are sent as a single
+    token once the tool calls have finished.
+
+    Args:
+        user_query (str): The User's input query
+        history (list[dict]): chat history as a list of {"role":"user or system", "content":"message"}
+        mode: (str): one of [auto (let the LLM decide), llm (general), rag, mcp]
+    Returns:
+        AsyncIterator[dict]: events described above
+    """
+    route = await adecide_route(user_query, mode)
+    if route not in ("general", "rag", "mcp", "rag_then_mcp"):
+        route = "general"
+    yield {"type": "route", "mode": route}
+
+    if route == "general":
+        answer = ""
+        async for token in GeneralLLM.stream_answer(user_query=user_query, history=history):
+            answer += token
+            yield {"type": "token", "content": token}
+        yield {"type": "done", "answer": answer, "mode": "general"}
+
+    elif route == "rag":
+        context = await aretrieve_context(user_query)
+        yield {"type": "sources", "retrieved": context}
+
+        if not context:
+            answer = "I couldn't find relevant information in the documents for that request."
+            yield {"type": "token", "content": answer}
+            yield {"type": "done", "answer": answer, "mode": "rag", "retrieved": []}
+            return
+
+        answer = ""
+        async for token in RAGLLM.stream_answer(user_query=user_query, context=context, history=history):
+            answer += token
+            yield {"type": "token", "content": token}
+        yield {"type": "done", "answer": answer, "mode": "rag", "retrieved": context}
+
+    else:
+        # the MCP client only returns once every tool call is done so there is nothing to stream
+        result = await answer_route(route, user_query, history)
+        if "retrieved" in result:
+            yield {"type": "sources", "retrieved": result["retrieved"]}
+        yield {"type": "token", "content": result["answer"]}
+        yield {"type": "done", **result}
+
+
 async def chat_loop(user_query: str, history: list[dict] | None = None, mode: str = "auto"):
     history = history or []
     return await handle_chat(user_query, history, mode)
\ No newline at end of file
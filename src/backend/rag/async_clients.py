@@ -0,0 +1,122 @@
+import os
+import aiohttp
+import httpx
+from azure.core.pipeline.transport import AioHttpTransport
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+from src.backend.rag.env import (
+    AZURE_OPENAI_API_KEY,
+    AZURE_OPENAI_EMBEDDING_KEY,
+    LLM_BASE_URL,
+    EMBEDDING_BASE_URL,
+)
+from src.backend.rag.index_utils import make_async_search_client, TRANSCRIPT_INDEX, MEETING_NOTES_INDEX
+
+load_dotenv()
+
+# connection pool sizes shared by every request on a worker
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+SEARCH_MAX_CONNECTIONS = int(os.getenv("SEARCH_MAX_CONNECTIONS", 100))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 120.0))
+
+
+def make_llm_http_client() -> httpx.AsyncClient:
+    """
+    httpx client with its own pool of LLM_MAX_CONNECTIONS keep-alive connections, passed as the
+    http_client of an AsyncOpenAI client so concurrent requests reuse warm connections
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+        timeout=LLM_TIMEOUT,
+    )
+
+
+class AsyncClients:
+    """
+    Async OpenAI and Azure Search clients shared by every request.
+
+    The API's lifespan opens them on startup and closes them on shutdown so each worker keeps one
+    pool of warm connections per service instead of a client (and TLS handshake) per request.
+    Accessing a client before open() (e.g. from a script or test) opens them on first use.
+
+    - llm: AsyncOpenAI client for chat/responses calls
+    - embeddings: AsyncOpenAI client for the embedding deployment
+    - search: {"transcripts": AsyncSearchClient, "meeting_notes": AsyncSearchClient}, both
+      sending requests through one aiohttp session
+    """
+
+    def __init__(self):
+        self._llm: AsyncOpenAI | None = None
+        self._embeddings: AsyncOpenAI | None = None
+        self._search: dict | None = None
+        self._search_session: aiohttp.ClientSession | None = None
+
+    def open(self):
+        """Create the clients and their connection pools, must be called with an event loop running"""
+        self._open_llm()
+        self._open_search()
+
+    def _open_llm(self):
+        if self._llm is not None:
+            return
+        self._llm = AsyncOpenAI(
+            base_url=LLM_BASE_URL,
+            api_key=AZURE_OPENAI_API_KEY,
+            http_client=make_llm_http_client(),
+        )
+        # aembed_batch retries failed batches itself, see env.EMBEDDING_CLIENT
+        self._embeddings = AsyncOpenAI(
+            base_url=EMBEDDING_BASE_URL,
+            api_key=AZURE_OPENAI_EMBEDDING_KEY,
+            http_client=make_llm_http_client(),
+            max_retries=0,
+        )
+
+    def _open_search(self):
+        if self._search is not None:
+            return
+        # aiohttp sessions can only be created while an event loop is running
+        self._search_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=SEARCH_MAX_CONNECTIONS))
+        # session_owner=False so closing one search client doesn't close the session under the other
+        self._search = {
+            index_kind: make_async_search_client(
+                index_name,
+                transport=AioHttpTransport(session=self._search_session, session_owner=False),
+            )
+            for index_kind, index_name in (("transcripts", TRANSCRIPT_INDEX), ("meeting_notes", MEETING_NOTES_INDEX))
+        }
+
+    async def close(self):
+        """Close every client and its connection pool"""
+        if self._search is not None:
+            for search_client in self._search.values():
+                await search_client.close()
+            await self._search_session.close()
+            self._search = self._search_session = None
+        if self._llm is not None:
+            await self._llm.close()
+            await self._embeddings.close()
+            self._llm = self._embeddings = None
+
+    @property
+    def llm(self) -> AsyncOpenAI:
+        self._open_llm()
+        return self._llm
+
+    @property
+    def embeddings(self) -> AsyncOpenAI:
+        self._open_llm()
+        return self._embeddings
+
+    def search(self, index_kind: str):
+        """
+        Args:
+            index_kind (str): "transcripts" or "meeting_notes"
+        Returns:
+            AsyncSearchClient: client for that index
+        """
+        self._open_search()
+        return self._search[index_kind]
+
+
+ASYNC_CLIENTS = AsyncClients()
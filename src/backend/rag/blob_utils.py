@@ -1,9 +1,18 @@
-from typing import List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from src.backend.rag.LLMChunker import LLMChunker
 import re
 
+# number of blobs downloaded at the same time by chunk_from_blob
+DOWNLOAD_CONCURRENCY = 8
+# blobs bigger than this are fetched as parallel ranged requests, RANGE_CONCURRENCY at a time
+LARGE_BLOB_BYTES = 8 * 1024 * 1024
+RANGE_CONCURRENCY = 4
+# number of documents contextualised at the same time by chunk_from_blob
+CONTEXT_CONCURRENCY = 4
 
 
 def contextual_chunking(text: str, chunks: list[str]) -> list[str]:
@@ -12,7 +21,8 @@ def contextual_chunking(text: str, chunks: list[str]) -> list[str]:
 
     For each chunk, this function:
     1. Uses the full document as global context
-    2. Generates a short description of the chunk via LLM
+    2. Generates a short description of the chunk via LLM (many chunks per request,
+       see LLMChunker.return_responses, previously generated contexts are reused)
     3. Prepends the generated context to the chunk content
 
     This improves retrieval quality by making each chunk more
@@ -32,13 +42,9 @@ def contextual_chunking(text: str, chunks: list[str]) -> list[str]:
     """
 
     llm_chunker = LLMChunker()
-    contextual_chunks = []
-    
-    for c in chunks:
-        context = llm_chunker.return_response(document=text, chunk=c)
-        contextual_chunks.append(context + " " + c)
-    
-    return contextual_chunks
+    contexts = llm_chunker.return_responses(document=text, chunks=chunks)
+
+    return [context + " " + c for context, c in zip(contexts, chunks)]
 
 def chunk_epics(meeting_notes: str) -> list[str]:
     """
@@ -96,13 +102,14 @@ def chunk_from_blob(
         chunk_size: int=756,
         context_chunking: bool=False,
         overlap: bool=False,
-        epic_chunking: bool=False) -> list[dict]: 
+        epic_chunking: bool=False,
+        download_concurrency: int=DOWNLOAD_CONCURRENCY) -> list[dict]: 
     """
     Extract and chunk text documents from an Azure Blob container.
 
     This function:
     1. Iterates over all blobs in the container
-    2. Downloads and decodes text files
+    2. Downloads (download_concurrency at a time) and decodes text files
     3. Splits text into chunks using a recursive splitter
     4. Optionally augments chunks with:
         - LLM-generated context (context_chunking)
@@ -128,6 +135,9 @@ def chunk_from_blob(
         epic_chunking (bool, optional):
             If True, additionally extract structured "Epic"-based chunks
 
+        download_concurrency (int, optional):
+            Number of blobs downloaded in parallel, results are still processed in name order
+
     Returns:
         list[dict]:
             List of chunk dictionaries, each containing:
@@ -144,46 +154,153 @@ def chunk_from_blob(
     if doc_type != "meeting_note":
         epic_chunking = False
 
-    overlap = int(chunk_size * 0.1) if overlap else 0 # overlap should be 10-20% of chunks size
-
     # retrieve and sort blobs by name for deterministic processing
     # A container is a folder and a blob is a file, so here we are listing all the .txt files in a specific folder (container)
     blobs = sorted(container_client.list_blobs(), key=lambda b:b.name)
 
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=overlap)
+    text_splitter = make_text_splitter(chunk_size, overlap)
 
     transcript_chunks = []
 
-    for blob in blobs:
-        # If the file is not a text file we can't handle it
-        if not blob.name.lower().endswith(".txt"):
-            continue
-
-        blob_client = container_client.get_blob_client(blob)
+    # If the file is not a text file we can't handle it
+    text_blobs = [blob for blob in blobs if blob.name.lower().endswith(".txt")]
 
-        download_stream = blob_client.download_blob()
-       
-        transcript_text = download_stream.readall().decode("utf-8") # get text in file 
-     
+    def chunk_document(document: tuple[object, str]) -> tuple[object, list[str]]:
+        blob, transcript_text = document
         chunks = text_splitter.split_text(transcript_text) # Applies recursive text splitting to text
-
         if context_chunking:
             # replace chunks with contextual chunks (append context)
             chunks = contextual_chunking(text=transcript_text, chunks=chunks)
-
         if epic_chunking:
-            epic_chunks = chunk_epics(transcript_text)
             # epic_chunks are chunks only containing the epics, so just extend them onto the normal chunks obtained
-            chunks.extend(epic_chunks)
+            chunks.extend(chunk_epics(transcript_text))
+        return blob, chunks
+
+    # each document is chunked as soon as it is downloaded and its text dropped afterwards, only its chunks are kept
+    documents = download_blobs(container_client, text_blobs, download_concurrency)
+    if context_chunking:
+        # CONTEXT_CONCURRENCY documents are contextualised at a time
+        chunked = map_in_order(chunk_document, documents, CONTEXT_CONCURRENCY)
+    else:
+        chunked = map(chunk_document, documents)
 
-        for j, chunk in enumerate(chunks):
-            transcript_chunks.append({
-                "source": blob.name,
-                "chunk_id": j,
-                "content": chunk,
-                "docType": doc_type
-            })
+    for blob, chunks in chunked:
+        transcript_chunks.extend(make_chunk_dicts(blob.name, chunks, doc_type))
 
     return transcript_chunks
+
+
+def make_text_splitter(chunk_size: int, overlap: bool) -> RecursiveCharacterTextSplitter:
+    """
+    Build the recursive splitter used for every document.
+
+    Args:
+        chunk_size (int): Maximum size of each chunk (in characters)
+        overlap (bool): If True, apply ~10% overlap between chunks
+    Returns:
+        RecursiveCharacterTextSplitter: configured text splitter
+    """
+    overlap = int(chunk_size * 0.1) if overlap else 0 # overlap should be 10-20% of chunks size
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap)
+
+
+def download_blob_text(container_client, blob) -> str:
+    """
+    Download a blob and decode it as utf-8 text.
+
+    Blobs larger than LARGE_BLOB_BYTES are fetched as parallel ranged requests (RANGE_CONCURRENCY at a time)
+    instead of one long sequential read. The range size is the client's max_chunk_get_size, see env.py.
+
+    Args:
+        container_client: Azure Blob container client the blob belongs to
+        blob: blob properties (or name) returned by list_blobs
+    Returns:
+        str: text in the file
+    """
+    blob_client = container_client.get_blob_client(blob)
+
+    if (getattr(blob, "size", None) or 0) > LARGE_BLOB_BYTES:
+        download_stream = blob_client.download_blob(max_concurrency=RANGE_CONCURRENCY)
+    else:
+        download_stream = blob_client.download_blob()
+
+    return download_stream.readall().decode("utf-8")
+
+
+def download_blobs(container_client, blobs: list, concurrency: int = DOWNLOAD_CONCURRENCY) -> Iterator[tuple[object, str]]:
+    """
+    Download blobs in parallel while yielding them in the order they were given.
+
+    At most 2 * concurrency downloads are in flight or waiting to be consumed, so a large
+    container is never held in memory all at once.
+
+    Args:
+        container_client: Azure Blob container client the blobs belong to
+        blobs (list): blobs to download, in the order they should be returned
+        concurrency (int): number of blobs downloaded at the same time
+    Returns:
+        Iterator[tuple[object, str]]: (blob, text) pairs in the same order as blobs
+    """
+    return map_in_order(lambda blob: (blob, download_blob_text(container_client, blob)), blobs, concurrency,
+                        thread_name_prefix="blob-download")
+
+
+def map_in_order(func, items, concurrency: int, thread_name_prefix: str = "") -> Iterator:
+    """
+    Apply func to items in parallel while yielding the results in the order of items.
+
+    Unlike ThreadPoolExecutor.map, items are taken lazily: at most 2 * concurrency are in flight or
+    waiting to be consumed, so neither items nor results pile up in memory.
+
+    Args:
+        func: function applied to each item
+        items: iterable of items, consumed as results are yielded
+        concurrency (int): number of items processed at the same time, 1 or less runs func inline
+        thread_name_prefix (str): name prefix of the worker threads
+    Returns:
+        Iterator: func(item) for each item, in order
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=thread_name_prefix) as executor:
+        pending = deque()
+        item_iter = iter(items)
+        for item in item_iter:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * concurrency:
+                break
+        sentinel = object()
+        while pending:
+            future = pending.popleft()
+            next_item = next(item_iter, sentinel)
+            if next_item is not sentinel:
+                pending.append(executor.submit(func, next_item))
+            yield future.result()
+
+
+def make_chunk_dicts(source: str, chunks: list[str], doc_type: str) -> list[dict]:
+    """
+    Wrap a document's chunks in the chunk dictionaries expected by process_and_store_chunks.
+
+    Args:
+        source (str): blob filename the chunks came from
+        chunks (list[str]): chunk texts in document order
+        doc_type (str): document type
+    Returns:
+        list[dict]: [{"source": ..., "chunk_id": ..., "content": ..., "docType": ...}, ...]
+    """
+    return [
+        {
+            "source": source,
+            "chunk_id": j,
+            "content": chunk,
+            "docType": doc_type
+        }
+        for j, chunk in enumerate(chunks)
+    ]
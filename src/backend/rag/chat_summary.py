@@ -0,0 +1,132 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from src.backend.rag.async_clients import ASYNC_CLIENTS
+from src.backend.rag.env import deployment_name
+from src.backend.rag.RAG_bot import HISTORY_LEN
+from src.backend.redis.redis_chat_store import get_summary, save_summary, read_messages, decode_messages
+
+load_dotenv()
+
+# length of the summary the model is asked for, and the hard cap on its answer
+SUMMARY_MAX_WORDS = int(os.getenv("SUMMARY_MAX_WORDS", 250))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", 600))
+# most messages folded into the summary per LLM call, a chat with a long unsummarised history is caught up in batches
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", 20))
+# each message is cut to this many characters in the summariser's prompt
+SUMMARY_MESSAGE_CHARS = int(os.getenv("SUMMARY_MESSAGE_CHARS", 4000))
+
+
+async def summarise_messages(summary: str | None, messages: list[dict]) -> str:
+    """
+    Folds messages into a conversation summary with one LLM call, the summary so far stands in for the
+    messages it covers so each call only reads the new ones
+
+    Args:
+        summary (str | None): the current summary, None for a chat's first
+        messages (list[dict]): {"role", "content"} messages that follow what the summary covers
+
+    Returns:
+        str: the updated summary
+    """
+    transcript = "\n\n".join(f"{msg['role']}: {msg['content'][:SUMMARY_MESSAGE_CHARS]}" for msg in messages)
+    response = await ASYNC_CLIENTS.llm.chat.completions.create(
+        model=deployment_name,
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "You maintain a running summary of a conversation between an employee and an internal company assistant. "
+                    "Update the summary with the new messages. Keep facts, names, figures, decisions, Jira issue keys "
+                    "and open questions the conversation may come back to, drop greetings and repetition. "
+                    f"Reply with the updated summary only, in at most {SUMMARY_MAX_WORDS} words."
+                )
+            },
+            {
+                "role": "user",
+                "content": f"Summary so far:\n{summary or '(none yet)'}\n\nNew messages:\n{transcript}"
+            }
+        ],
+        max_completion_tokens=SUMMARY_MAX_TOKENS,
+    )
+    return response.choices[0].message.content.strip()
+
+
+class ChatSummariser:
+    """
+    Keeps a rolling summary of each chat's older messages in ``chat:{chat_id}:summary``.
+
+    The generators are sent the last keep_recent (HISTORY_LEN) messages of a chat and the summary of
+    everything before them. After each turn schedule() starts a background task that folds the messages
+    which have left that window into the summary, so the turn's answer isn't held up and each update only
+    reads the messages added since the last one.
+
+    One update runs per chat at a time, a turn finishing while it runs makes it go round once more. Updates
+    are saved with a compare-and-set on the number of messages covered, so workers summarising the same
+    chat don't fold messages in twice. A failed update is logged and picked up after the chat's next turn.
+    """
+
+    def __init__(self, keep_recent: int = HISTORY_LEN, batch_size: int = SUMMARY_BATCH_SIZE):
+        self.keep_recent = keep_recent
+        self.batch_size = batch_size
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._rerun: set[str] = set()
+
+    def schedule(self, rdb, chat_id: str):
+        """Update the chat's summary in the background"""
+        task = self._tasks.get(chat_id)
+        if task is not None and not task.done():
+            self._rerun.add(chat_id)
+            return
+        self._tasks[chat_id] = asyncio.create_task(self._run(rdb, chat_id))
+
+    async def _run(self, rdb, chat_id: str):
+        try:
+            while True:
+                self._rerun.discard(chat_id)
+                try:
+                    await self.update(rdb, chat_id)
+                except Exception as e:
+                    print(f"Summarising chat {chat_id} failed: {e!r}")
+                    return
+                if chat_id not in self._rerun:
+                    return
+        finally:
+            self._tasks.pop(chat_id, None)
+
+    async def update(self, rdb, chat_id: str) -> int:
+        """
+        Folds every message older than the last keep_recent into the chat's summary
+
+        Args:
+            rdb: Async Redis client
+            chat_id (str): chat to summarise
+
+        Returns:
+            int: number of messages added to the summary
+        """
+        summary, covered, length = await get_summary(rdb, chat_id)
+        end = length - self.keep_recent
+        added = 0
+        while covered < end:
+            batch_end = min(end, covered + self.batch_size)
+            messages = decode_messages(await read_messages(rdb, chat_id, covered, batch_end - 1))
+            summary = await summarise_messages(summary, messages)
+            if not await save_summary(rdb, chat_id, summary, covered, batch_end):
+                # the chat was deleted, or another worker got there first and carries on from here
+                break
+            added += batch_end - covered
+            covered = batch_end
+        return added
+
+    async def close(self):
+        """Cancel the updates still running, used on shutdown"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._rerun.clear()
+
+
+CHAT_SUMMARISER = ChatSummariser()
@@ -0,0 +1,89 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# generated chunk contexts are persisted here when set, re-chunking an unchanged document then makes no LLM calls
+CONTEXT_CACHE_PATH = os.getenv("CONTEXT_CACHE_PATH")
+
+
+def context_key(model: str, document: str, chunk: str) -> str:
+    """
+    Key of a generated chunk context. The context describes the chunk within its document,
+    so the key covers the model, the document and the chunk text.
+
+    Args:
+        model (str): model the context was generated with
+        document (str): full document text
+        chunk (str): chunk text
+    Returns:
+        str: sha256 hex digest
+    """
+    document_hash = hashlib.sha256(document.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{model}\0{document_hash}\0{chunk}".encode("utf-8")).hexdigest()
+
+
+class ContextCache:
+    """
+    Append-only JSON lines file of {"key": ..., "context": ...}, loaded into memory on start.
+
+    A cache without a path keeps contexts in memory only. Appends take an exclusive lock on
+    the file and pick up lines written by other processes first.
+    """
+
+    def __init__(self, path: str | None = CONTEXT_CACHE_PATH):
+        self.path = path
+        self.contexts: dict[str, str] = {}
+        self.offset = 0
+        self._lock = threading.Lock()
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._load_new_lines()
+
+    def _load_new_lines(self):
+        """Read lines appended since the last read, ignoring a partially written last line"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(self.offset)
+            for line in iter(f.readline, ""):
+                if not line.endswith("\n"):
+                    break
+                entry = json.loads(line)
+                self.contexts[entry["key"]] = entry["context"]
+                self.offset = f.tell()
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        with self._lock:
+            return {k: self.contexts[k] for k in keys if k in self.contexts}
+
+    def put_many(self, items: dict[str, str]):
+        if not items:
+            return
+        with self._lock:
+            self.contexts.update(items)
+            if not self.path:
+                return
+            try:
+                with open(self.path, "a+", encoding="utf-8") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                    try:
+                        self._load_new_lines()
+                        # drop any partially written line so the new entries start on their own line
+                        f.truncate(self.offset)
+                        f.write("".join(json.dumps({"key": k, "context": v}) + "\n" for k, v in items.items()))
+                        f.flush()
+                        self.offset = f.tell()
+                    finally:
+                        fcntl.flock(f, fcntl.LOCK_UN)
+            except OSError as e:
+                print(f"Context cache store failed: {e!r}")
+
+
+CONTEXT_CACHE = ContextCache()
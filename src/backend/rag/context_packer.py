@@ -0,0 +1,162 @@
+import os
+from functools import lru_cache
+from dotenv import load_dotenv
+from src.backend.rag.embedding_utils import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+load_dotenv()
+
+# retrieved context sent to the model with a rag query is cut to this many tokens, best ranked chunks first
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 3000))
+# tiktoken encoding of the deployed model (o200k_base for the gpt-4o and gpt-5 families)
+CONTEXT_TOKENIZER_ENCODING = os.getenv("CONTEXT_TOKENIZER_ENCODING", "o200k_base")
+# text shared by two chunks is only removed from the lower ranked one when it is at least this long
+MIN_OVERLAP_CHARS = 50
+# a chunk that has less than this fraction of its text left once the text it shares with better chunks is removed is dropped
+MIN_REMAINING_FRACTION = 0.25
+# the chunk that doesn't fit the budget whole is cut to the budget left, unless less than this is left
+MIN_PARTIAL_TOKENS = 100
+CONTEXT_SEPARATOR = "\n\n---\n\n"
+GAP_MARKER = " ... "
+
+
+class Tokenizer:
+    """
+    Counts tokens with tiktoken (a project dependency). If it isn't installed, or the encoding can't be
+    loaded (its file is downloaded on first use), tokens are estimated instead (~4 characters per token,
+    see embedding_utils.estimate_tokens), which errs on the high side so budgets are still kept.
+    """
+
+    def __init__(self, encoding_name: str = CONTEXT_TOKENIZER_ENCODING):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                # the encoding's file is downloaded on first use, which fails without network access
+                print(f"tiktoken encoding {encoding_name} unavailable, estimating tokens instead: {e!r}")
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return estimate_tokens(text)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The start of text, at most max_tokens long"""
+        if self.encoding is None:
+            return text[:max(max_tokens - 1, 0) * 4]
+        return self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> Tokenizer:
+    """The shared Tokenizer, created on first use"""
+    return Tokenizer()
+
+
+def longest_affix_in(text: str, other: str, suffix: bool) -> int:
+    """
+    Length of the longest suffix (or prefix) of text that appears anywhere in other. If one of them
+    appears, so does every shorter one, so the length is found with a binary search of substring checks.
+    """
+    low, high = 0, min(len(text), len(other))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if (text[-mid:] if suffix else text[:mid]) in other:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def cut(text: str, span: str) -> str:
+    """Remove the first occurrence of span from text, marking the gap if text continues on both sides"""
+    start = text.find(span)
+    before, after = text[:start].rstrip(), text[start + len(span):].lstrip()
+    if before and after:
+        return before + GAP_MARKER + after
+    return before or after
+
+
+def remove_shared_text(text: str, kept: str, min_overlap: int = MIN_OVERLAP_CHARS) -> str:
+    """
+    Removes from text what it shares with kept: kept's start or end appearing in text (a neighbouring
+    chunk's overlap, or a chunk inside an epic chunk) and text's start or end appearing in kept
+    """
+    for affix_of_kept, suffix in ((True, True), (True, False), (False, True), (False, False)):
+        source, target = (kept, text) if affix_of_kept else (text, kept)
+        length = longest_affix_in(source, target, suffix)
+        if length >= min_overlap:
+            span = source[-length:] if suffix else source[:length]
+            text = cut(text, span)
+    return text
+
+
+def dedupe_chunks(chunks: list[dict], min_overlap: int = MIN_OVERLAP_CHARS) -> list[dict]:
+    """
+    Removes text repeated across retrieved chunks, keeping it in the best ranked chunk it appears in.
+
+    Neighbouring chunks of a document share ~10% of their text (chunk_from_blob's overlap), and epic
+    chunks of a meeting note repeat the body chunks their epic was split into, so the same passage is
+    often retrieved more than once. Duplicates and chunks found inside a better chunk are dropped, shared
+    spans are cut out of the lower ranked chunk.
+
+    Args:
+        chunks (list[dict]): retrieved chunks ordered best first, each with a "content"
+        min_overlap (int): shared spans shorter than this many characters are kept
+
+    Returns:
+        list[dict]: copies of the chunks that still have text of their own, in the same order
+    """
+    kept = []
+    for chunk in chunks:
+        original = chunk["content"].strip()
+        text = original
+        for other in kept:
+            text = remove_shared_text(text, other["content"], min_overlap)
+            if not text:
+                break
+        if len(text) < len(original) * MIN_REMAINING_FRACTION:
+            continue
+        kept.append({**chunk, "content": text})
+    return kept
+
+
+def pack_context(context: list[dict], budget: int | None = None, tokenizer: Tokenizer | None = None) -> list[dict]:
+    """
+    Fits retrieved chunks into a token budget for the prompt, so a few long chunks can't inflate the
+    input (and time to first token) of a rag answer.
+
+    Repeated text is removed first (see dedupe_chunks), then chunks are added best ranked first, counting
+    the separator they are joined with. The first chunk that doesn't fit is cut to the budget left and the
+    rest are left out.
+
+    Args:
+        context (list[dict]): retrieved chunks ordered best first, each with a "content"
+        budget (int | None): maximum tokens of the joined context, CONTEXT_TOKEN_BUDGET if None
+        tokenizer (Tokenizer | None): the shared tokenizer if None
+
+    Returns:
+        list[dict]: copies of the chunks to send, in rank order
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    tokenizer = tokenizer or get_tokenizer()
+    separator_tokens = tokenizer.count(CONTEXT_SEPARATOR)
+
+    packed = []
+    for chunk in dedupe_chunks(context):
+        if packed:
+            budget -= separator_tokens
+        tokens = tokenizer.count(chunk["content"])
+        if tokens <= budget:
+            packed.append(chunk)
+            budget -= tokens
+            continue
+        if budget >= MIN_PARTIAL_TOKENS:
+            packed.append({**chunk, "content": tokenizer.truncate(chunk["content"], budget)})
+        break
+    return packed
@@ -1,39 +1,44 @@
-
 import asyncio
-from src.backend.rag.blob_utils import chunk_from_blob
-from src.backend.rag.embedding_utils import process_and_store_chunks
+from src.backend.rag.ingestion_manifest import IngestionManifest
+from src.backend.rag.ingestion_pipeline import run_ingestion_pipeline
 from src.backend.rag.env import transcript_container_client, notes_container_client
 
 async def embed_chunks():
     """
-    method designed to be run from the command line. First chunks all the blobs from a specific container, user can chose to chunk
-    all the blob's from the transcript container or meeting container or both.
+    method designed to be run from the command line. Streams all the blobs from a specific container through the
+    ingestion pipeline, user can chose to embed all the blob's from the transcript container or meeting container or both.
+
+    Each document is chunked, embedded and stored in its corresponding azure AI search index as soon as it has been
+    downloaded, so transcript_container blobs are stored in the transcripts index for example.
 
-    Then chunks are stored in their corresponding azure AI search index. So transcript_container blobs are stored in the transcripts
-    container for example.
+    Runs are incremental, blobs that haven't changed since they were last ingested (according to the ingestion
+    manifest) are skipped and chunks of changed or deleted blobs that no longer exist are removed from the index.
     """
     choice = int(input("1: chunk transcripts only\n2: chunk meeting notes only\n3. Chunk both/all blobs\n"))
-    transcript_chunks = []
-    meeting_note_chunks = []
-    if choice == 1:
-        transcript_chunks = chunk_from_blob(
+    if choice not in (1, 2, 3):
+        print("Invalid choice!")
+        return
+
+    manifest = IngestionManifest()
+
+    if choice in (1, 3):
+        await asyncio.to_thread(
+            run_ingestion_pipeline,
             transcript_container_client,
             doc_type="transcript",
-            chunk_size=756
+            chunk_size=756,
+            manifest=manifest
         )
-    elif choice == 2:
-        meeting_note_chunks = chunk_from_blob(
+    if choice in (2, 3):
+        await asyncio.to_thread(
+            run_ingestion_pipeline,
             notes_container_client,
             doc_type="meeting_note",
             chunk_size=400, # smaller may be better for structured note
             epic_chunking=True,
-            overlap=True # test context chunking for meeting notes
+            overlap=True, # test context chunking for meeting notes
+            manifest=manifest
         )
-    else:
-        print("Invalid choice!")
-
-    all_chunks = transcript_chunks + meeting_note_chunks
-    process_and_store_chunks(all_chunks)    
 
 if __name__ == '__main__':
     asyncio.run(embed_chunks())
@@ -0,0 +1,196 @@
+import fcntl
+import hashlib
+import os
+import re
+import numpy as np
+import redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Local cache is enabled by setting EMBEDDING_CACHE_DIR, Redis cache by setting EMBEDDING_CACHE_REDIS_URL.
+# Both can be enabled, the local file is checked first.
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR")
+EMBEDDING_CACHE_REDIS_URL = os.getenv("EMBEDDING_CACHE_REDIS_URL")
+# float16 halves the storage at a small precision cost, float32 stores vectors as returned by the API
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32")
+
+
+def embedding_key(model: str, text: str) -> str:
+    """
+    Content address of an embedding, same model + same text -> same key.
+
+    Args:
+        model (str): embedding model name e.g. "text-embedding-3-large"
+        text (str): text that was embedded
+    Returns:
+        str: sha256 hex digest of model and text
+    """
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class LocalEmbeddingStore:
+    """
+    Append-only embedding store on local disk, read through a memory map.
+
+    Two files per model:
+    - ``{model}.{dtype}``: raw vectors, one fixed-size row per embedding
+    - ``{model}.keys``: one hex key per line, line i is the key of row i
+
+    Writes take an exclusive lock on the keys file and pick up rows appended by other
+    processes first, so ingestion and the API can share one directory.
+    """
+
+    def __init__(self, directory: str, model: str, dims: int, dtype: str = EMBEDDING_CACHE_DTYPE):
+        os.makedirs(directory, exist_ok=True)
+        safe_model = re.sub(r"[^a-zA-Z0-9_\-.]", "-", model)
+        self.data_path = os.path.join(directory, f"{safe_model}.{dtype}")
+        self.keys_path = os.path.join(directory, f"{safe_model}.keys")
+        self.dims = dims
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = self.dims * self.dtype.itemsize
+
+        self.rows: dict[str, int] = {}
+        self.keys_offset = 0
+        self.mmap = None
+        self._load_new_keys()
+
+    def _load_new_keys(self):
+        """Read keys appended since the last read, ignoring any key whose row was never fully written"""
+        if not os.path.exists(self.keys_path):
+            return
+        data_rows = os.path.getsize(self.data_path) // self.row_bytes if os.path.exists(self.data_path) else 0
+        with open(self.keys_path, "r", encoding="ascii") as f:
+            f.seek(self.keys_offset)
+            for line in iter(f.readline, ""):
+                if not line.endswith("\n") or len(self.rows) >= data_rows:
+                    break
+                self.rows.setdefault(line.strip(), len(self.rows))
+                self.keys_offset = f.tell()
+        self.mmap = None
+
+    def _matrix(self) -> np.ndarray:
+        if self.mmap is None or len(self.mmap) < len(self.rows):
+            self.mmap = np.memmap(self.data_path, dtype=self.dtype, mode="r", shape=(len(self.rows), self.dims))
+        return self.mmap
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found = [k for k in keys if k in self.rows]
+        if not found:
+            return {}
+        matrix = self._matrix()
+        return {k: np.asarray(matrix[self.rows[k]], dtype=np.float32) for k in found}
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        if not items:
+            return
+        with open(self.keys_path, "a+", encoding="ascii") as keys_file:
+            fcntl.flock(keys_file, fcntl.LOCK_EX)
+            try:
+                self._load_new_keys()
+                new_items = [(k, v) for k, v in items.items() if k not in self.rows]
+                if not new_items:
+                    return
+                # pad/truncate any partially written row left by a crashed writer
+                with open(self.data_path, "ab") as data_file:
+                    data_file.truncate(len(self.rows) * self.row_bytes)
+                    for _, vector in new_items:
+                        data_file.write(np.asarray(vector, dtype=self.dtype).tobytes())
+                    data_file.flush()
+                    os.fsync(data_file.fileno())
+                # drop any partially written key line so the new keys start on their own line
+                keys_file.truncate(self.keys_offset)
+                keys_file.write("".join(f"{k}\n" for k, _ in new_items))
+                keys_file.flush()
+                self._load_new_keys()
+            finally:
+                fcntl.flock(keys_file, fcntl.LOCK_UN)
+
+
+class RedisEmbeddingStore:
+    """
+    Embedding store in Redis, each vector is kept as raw bytes under ``{prefix}:{dtype}:{key}``.
+    Lookups are batched with MGET and writes with a pipeline, one round trip each.
+    """
+
+    def __init__(self, url: str, dtype: str = EMBEDDING_CACHE_DTYPE, prefix: str = "emb"):
+        # vectors are binary so responses must not be decoded
+        self.rdb = redis.from_url(url, decode_responses=False)
+        self.dtype = np.dtype(dtype)
+        self.prefix = f"{prefix}:{self.dtype.name}"
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        if not keys:
+            return {}
+        raw = self.rdb.mget([f"{self.prefix}:{k}" for k in keys])
+        return {
+            k: np.frombuffer(data, dtype=self.dtype).astype(np.float32)
+            for k, data in zip(keys, raw)
+            if data is not None
+        }
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        if not items:
+            return
+        pipe = self.rdb.pipeline(transaction=False)
+        for k, vector in items.items():
+            pipe.set(f"{self.prefix}:{k}", np.asarray(vector, dtype=self.dtype).tobytes())
+        pipe.execute()
+
+
+class EmbeddingCache:
+    """
+    Tiered content-addressed embedding cache.
+
+    Stores are checked in order, a hit in a later store is copied into the earlier ones.
+    A cache with no stores never hits, so callers don't need to special-case it being disabled.
+    Store errors are logged and treated as misses.
+    """
+
+    def __init__(self, stores: list | None = None):
+        self.stores = stores or []
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        for i, store in enumerate(self.stores):
+            missing = [k for k in dict.fromkeys(keys) if k not in found]
+            if not missing:
+                break
+            try:
+                hits = store.get_many(missing)
+            except Exception as e:
+                print(f"Embedding cache lookup failed: {e!r}")
+                continue
+            if hits and i > 0:
+                self._put(self.stores[:i], hits)
+            found.update(hits)
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        self._put(self.stores, items)
+
+    @staticmethod
+    def _put(stores: list, items: dict[str, np.ndarray]):
+        for store in stores:
+            try:
+                store.put_many(items)
+            except Exception as e:
+                print(f"Embedding cache store failed: {e!r}")
+
+
+def make_embedding_cache(model: str, dims: int) -> EmbeddingCache:
+    """
+    Create the embedding cache from the EMBEDDING_CACHE_* environment variables.
+
+    Args:
+        model (str): embedding model the cache is for
+        dims (int): number of dimensions the model returns
+    Returns:
+        EmbeddingCache: cache with the configured stores (none if caching is not configured)
+    """
+    stores = []
+    if EMBEDDING_CACHE_DIR:
+        stores.append(LocalEmbeddingStore(EMBEDDING_CACHE_DIR, model, dims))
+    if EMBEDDING_CACHE_REDIS_URL:
+        stores.append(RedisEmbeddingStore(EMBEDDING_CACHE_REDIS_URL))
+    return EmbeddingCache(stores)
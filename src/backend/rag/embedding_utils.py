@@ -1,8 +1,17 @@
 
+import asyncio
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
-from src.backend.rag.env import EMBEDDING_CLIENT
+import math
+import random
+import time
+from openai import RateLimitError, APITimeoutError, APIConnectionError, InternalServerError
+from src.backend.rag.async_clients import ASYNC_CLIENTS
+from src.backend.rag.env import EMBEDDING_CLIENT, vector_dimensions
+from src.backend.rag.embedding_cache import embedding_key, make_embedding_cache
 from src.backend.rag.index_utils import TRANSCRIPT_SEARCH_CLIENT, MEETING_NOTES_SEARCH_CLIENT, ensure_index_exists
+from src.backend.rag.retrieval_cache import invalidate_retrieval_cache
 import hashlib
 import re
 from datetime import datetime
@@ -17,25 +26,224 @@ COMPANY_MAP = {
     "bx": "BlackStone"
 }
 
+EMBEDDING_MODEL = "text-embedding-3-large"
+EMBEDDING_CACHE = make_embedding_cache(EMBEDDING_MODEL, vector_dimensions)
+
+# limits for a single embeddings.create request, kept below the API's hard limits
+# (2048 inputs and 300k tokens per request)
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_BATCH_TOKENS = 100_000
+# number of batches sent to the API at the same time
+EMBEDDING_CONCURRENCY = 4
+EMBEDDING_MAX_RETRIES = 5
+# errors that are worth retrying, anything else (e.g. a bad request) fails straight away
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
 def generate_embeddings(texts: list[str]) -> list[list[float]]: 
     """
     Generate vector embeddings for a list of input texts using the embedding model.
 
-    This function sends the input texts to the embedding API and returns a list
-    of embedding vectors, where each vector corresponds to one input string.
+    This function looks each text up in the embedding cache (keyed by model + sha of the text)
+    and only sends the texts that are missing to the embedding API. New embeddings are added
+    to the cache, so re-ingesting unchanged documents makes close to no API calls.
 
     Args:
         texts (list[str]): list of texts, each item in the list is a string of text
     Returns:
         list[list[float]]: list of embedding vectors. Each vector in the list represents a word/non-space de-limited string in vector form.
     """
+    keys = [embedding_key(EMBEDDING_MODEL, text) for text in texts]
+    cached = EMBEDDING_CACHE.get_many(keys)
+
+    # only embed each missing text once even if it appears several times
+    missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+    if missing:
+        embeddings = embed_in_batches(list(missing.values()))
+        new_embeddings = dict(zip(missing, embeddings))
+        EMBEDDING_CACHE.put_many(new_embeddings)
+        cached = {**cached, **new_embeddings}
+
+    return [list(map(float, cached[key])) for key in keys]
+
+async def agenerate_embeddings(texts: list[str]) -> list[list[float]]:
+    """
+    Async version of generate_embeddings for the request path, the missing texts are embedded with the
+    shared async embedding client (EMBEDDING_CONCURRENCY batches at a time) instead of blocking a thread.
 
-    response = EMBEDDING_CLIENT.embeddings.create( 
-        input = texts,
-        model= "text-embedding-3-large"
-    )
-    return [item.embedding for item in response.data]
+    Args:
+        texts (list[str]): list of texts, each item in the list is a string of text
+    Returns:
+        list[list[float]]: one embedding vector per text, in order
+    """
+    keys = [embedding_key(EMBEDDING_MODEL, text) for text in texts]
+    # the cache is synchronous (a memory-mapped file store and a blocking Redis client), so it is read and written off the event loop
+    cached = await asyncio.to_thread(EMBEDDING_CACHE.get_many, keys)
+
+    missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+    if missing:
+        missing_texts = list(missing.values())
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def embed(batch: list[int]) -> list[list[float]]:
+            async with semaphore:
+                return await aembed_batch([missing_texts[i] for i in batch])
+
+        batches = make_batches(missing_texts)
+        batch_embeddings = await asyncio.gather(*(embed(batch) for batch in batches))
+        embeddings = [None] * len(missing_texts)
+        for batch, vectors in zip(batches, batch_embeddings):
+            for i, vector in zip(batch, vectors):
+                embeddings[i] = vector
+
+        new_embeddings = dict(zip(missing, embeddings))
+        await asyncio.to_thread(EMBEDDING_CACHE.put_many, new_embeddings)
+        cached = {**cached, **new_embeddings}
+
+    return [list(map(float, cached[key])) for key in keys]
         
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for a text (~4 characters per token for English), only used to keep
+    embedding requests under the per-request token limit so it errs on the high side.
+
+    Args:
+        text (str): text to estimate
+    Returns:
+        int: estimated number of tokens
+    """
+    return math.ceil(len(text) / 4) + 1
+
+def make_batches(texts: list[str], max_items: int = EMBEDDING_BATCH_SIZE, max_tokens: int = EMBEDDING_BATCH_TOKENS) -> list[list[int]]:
+    """
+    Split texts into batches that respect both an item limit and an estimated token limit.
+    Order is preserved, a single text over the token limit gets a batch to itself.
+
+    Args:
+        texts (list[str]): texts to embed
+        max_items (int): maximum number of texts per batch
+        max_tokens (int): maximum estimated tokens per batch
+    Returns:
+        list[list[int]]: batches as lists of indexes into texts
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def embed_batch(texts: list[str], max_retries: int = EMBEDDING_MAX_RETRIES) -> list[list[float]]:
+    """
+    Embed one batch, retrying throttled or transient failures with exponential backoff.
+    If the API sends a Retry-After header that wait is used instead.
+
+    Args:
+        texts (list[str]): batch of texts
+        max_retries (int): number of retries before the error is raised
+    Returns:
+        list[list[float]]: one embedding per text, in order
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = EMBEDDING_CLIENT.embeddings.create(
+                input = texts,
+                model= EMBEDDING_MODEL
+            )
+            return embeddings_in_order(response)
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = retry_delay(e, attempt)
+            print(f"Embedding batch of {len(texts)} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+async def aembed_batch(texts: list[str], max_retries: int = EMBEDDING_MAX_RETRIES) -> list[list[float]]:
+    """
+    Async version of embed_batch using the shared async embedding client.
+
+    Args:
+        texts (list[str]): batch of texts
+        max_retries (int): number of retries before the error is raised
+    Returns:
+        list[list[float]]: one embedding per text, in order
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = await ASYNC_CLIENTS.embeddings.embeddings.create(
+                input=texts,
+                model=EMBEDDING_MODEL
+            )
+            return embeddings_in_order(response)
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = retry_delay(e, attempt)
+            print(f"Embedding batch of {len(texts)} failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+def embeddings_in_order(response) -> list[list[float]]:
+    """Embeddings from an embeddings.create response in input order"""
+    data = response.data
+    # the API returns an index per item, sort on it rather than trusting the order
+    if all(isinstance(getattr(item, "index", None), int) for item in data):
+        data = sorted(data, key=lambda item: item.index)
+    return [item.embedding for item in data]
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying: the Retry-After header if sent, otherwise exponential backoff with jitter"""
+    delay = retry_after_seconds(error)
+    if delay is None:
+        delay = min(2 ** attempt, 30) + random.uniform(0, 1)
+    return delay
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """
+    Reads the Retry-After header from an API error, if there is one.
+
+    Args:
+        error (Exception): error raised by the OpenAI client
+    Returns:
+        float | None: seconds to wait or None if the header is missing/unparseable
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def embed_in_batches(texts: list[str], concurrency: int = EMBEDDING_CONCURRENCY) -> list[list[float]]:
+    """
+    Embed any number of texts by splitting them into batches under the API's request limits
+    and sending up to ``concurrency`` batches at the same time. Results are put back in input order.
+
+    Args:
+        texts (list[str]): texts to embed
+        concurrency (int): maximum number of requests in flight
+    Returns:
+        list[list[float]]: one embedding per text, in order
+    """
+    batches = make_batches(texts)
+    if len(batches) == 1:
+        return embed_batch(texts)
+
+    embeddings: list = [None] * len(texts)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed") as pool:
+        results = pool.map(lambda batch: embed_batch([texts[i] for i in batch]), batches)
+        for batch, batch_embeddings in zip(batches, results):
+            for i, embedding in zip(batch, batch_embeddings):
+                embeddings[i] = embedding
+    return embeddings
+
 def process_and_store_chunks(chunks: list[dict]) -> dict[str, list[IndexingResult]]:
     """
     Processes a list of text chunks then uploads them to an azure search index by:
@@ -43,7 +251,8 @@ def process_and_store_chunks(chunks: list[dict]) -> dict[str, list[IndexingResul
     2. Generating embeddings for each chunk
     3. Preparing documents for Azure Search
     4. Uploading them to the appropriate search index
-    5. Returning indexing results for each docType
+    5. Invalidating the retrieval cache since the indexes have changed
+    6. Returning indexing results for each docType
 
     Args:
         chunks: [{"source": ..., "chunk_id": ..., "content": ..., "docType": ...}, ...]
@@ -83,41 +292,13 @@ def process_and_store_chunks(chunks: list[dict]) -> dict[str, list[IndexingResul
         # check if index exists before attempting upload
         ensure_index_exists(search_client._index_name)
 
-        # group_chunks should be a list of all the chunks that are belonging to a docType
-        texts = [ch["content"] for ch in group_chunks]
-        embeddings = generate_embeddings(texts)  # must return list[list[float]]
-
-
-        """
-        Each ch looks like:
-        {
-            "source": "...",
-            "chunk_id": "...",
-            "content": "...",
-            "docType": "earnings_call"
-        }
-        """
-        documents = []
-        for ch, embedding in zip(group_chunks, embeddings):
-            source_name = ch["source"]
-            content = ch["content"]
-
-            # Use a stable id for Azure Search. Don't use chunk_id alone.
-            doc_id = make_chunk_id(source_name, content, doc_type)
-
-            metadata = extract_metadata(source_name, doc_type)
-
-            upsert_data = {
-                "id": doc_id,
-                "content": content,
-                "embedding": embedding,
-                "docType": doc_type,            # store explicitly in the index too
-                **metadata,
-            }
-            documents.append(upsert_data)
-
+        documents = build_index_documents(group_chunks, doc_type)
         results[doc_type] = search_client.upload_documents(documents=documents)
 
+    # cached retrieval results may now be missing new chunks
+    if results:
+        invalidate_retrieval_cache()
+
     """
     Example of results:
     results = {
@@ -139,6 +320,51 @@ def process_and_store_chunks(chunks: list[dict]) -> dict[str, list[IndexingResul
     return results
 
 
+def build_index_documents(chunks: list[dict[str, Any]], doc_type: str) -> list[dict[str, Any]]:
+    """
+    Embed chunks of a single docType and turn them into Azure Search documents.
+
+    Args:
+        chunks: [{"source": ..., "chunk_id": ..., "content": ..., "docType": ...}, ...], all of doc_type
+        doc_type (str): docType of every chunk
+    Returns:
+        list[dict[str, Any]]: documents ready for upload_documents (id, content, embedding, docType and metadata)
+    """
+    # chunks should be a list of all the chunks that are belonging to a docType
+    texts = [ch["content"] for ch in chunks]
+    embeddings = generate_embeddings(texts)  # must return list[list[float]]
+
+    """
+    Each ch looks like:
+    {
+        "source": "...",
+        "chunk_id": "...",
+        "content": "...",
+        "docType": "earnings_call"
+    }
+    """
+    documents = []
+    for ch, embedding in zip(chunks, embeddings):
+        source_name = ch["source"]
+        content = ch["content"]
+
+        # Use a stable id for Azure Search. Don't use chunk_id alone.
+        doc_id = make_chunk_id(source_name, content, doc_type)
+
+        metadata = extract_metadata(source_name, doc_type)
+
+        upsert_data = {
+            "id": doc_id,
+            "content": content,
+            "embedding": embedding,
+            "docType": doc_type,            # store explicitly in the index too
+            **metadata,
+        }
+        documents.append(upsert_data)
+
+    return documents
+
+
 def get_search_client_for_doc_type(doc_type: str) -> SearchClient:
     """
     Retrieves search index for that chunks will be uploaded too, matching the search index passed into doc_type
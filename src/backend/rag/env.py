@@ -16,19 +16,35 @@ azure_client_version = os.getenv("AZURE_OPENAI_API_VERSION")
 
 AZURE_OPENAI_EMBEDDING_KEY = os.getenv("AZURE_OPENAI_API_EMBEDDING_KEY")
 
-transcript_container_client = ContainerClient.from_container_url(TRANSCRIPT_SAS_URL)
-notes_container_client = ContainerClient.from_container_url(MEETING_NOTE_SAS_URL)
+# a download's first request fetches up to max_single_get_size bytes, the rest of a larger blob
+# is fetched in max_chunk_get_size ranges (in parallel when download_blob is given max_concurrency)
+BLOB_SINGLE_GET_SIZE = 8 * 1024 * 1024
+BLOB_CHUNK_GET_SIZE = 4 * 1024 * 1024
+
+transcript_container_client = ContainerClient.from_container_url(
+    TRANSCRIPT_SAS_URL, max_single_get_size=BLOB_SINGLE_GET_SIZE, max_chunk_get_size=BLOB_CHUNK_GET_SIZE
+)
+notes_container_client = ContainerClient.from_container_url(
+    MEETING_NOTE_SAS_URL, max_single_get_size=BLOB_SINGLE_GET_SIZE, max_chunk_get_size=BLOB_CHUNK_GET_SIZE
+)
 
 # index_name = "transcript-chunks"
 deployment_name = "gpt-5.2-chat"
 vector_dimensions = 3072  # for text-embedding-3-large
 
+# overridable so the load benchmark can point the clients at local stub servers
+LLM_BASE_URL = os.getenv("AZURE_OPENAI_BASE_URL", "https://alex-mltg6myf-eastus2.openai.azure.com/openai/v1/")
+EMBEDDING_BASE_URL = os.getenv("AZURE_OPENAI_EMBEDDING_BASE_URL", "https://transcript-embeds-openai.openai.azure.com/openai/v1")
+
 client = OpenAI(
-    base_url="https://alex-mltg6myf-eastus2.openai.azure.com/openai/v1/",
+    base_url=LLM_BASE_URL,
     api_key=AZURE_OPENAI_API_KEY
 )
 
+# embedding_utils.embed_batch retries throttled and transient failures itself (EMBEDDING_MAX_RETRIES),
+# so the SDK's own retries are turned off rather than multiplying the attempts per batch
 EMBEDDING_CLIENT = OpenAI(
     api_key=AZURE_OPENAI_EMBEDDING_KEY,
-    base_url=f"https://transcript-embeds-openai.openai.azure.com/openai/v1",
+    base_url=EMBEDDING_BASE_URL,
+    max_retries=0,
 )
\ No newline at end of file
@@ -0,0 +1,123 @@
+import numpy as np
+
+# constant used by reciprocal rank fusion, 60 is the value from the original RRF paper
+RRF_K = 60
+
+FUSION_METHODS = ("rrf", "minmax", "zscore", "raw")
+
+
+def fuse_results(
+        results_by_index: dict[str, list[dict]],
+        method: str = "rrf",
+        weights: dict[str, float] | None = None,
+        k: int | None = None,
+        rrf_k: int = RRF_K) -> list[dict]:
+    """
+    Merge search results from several indexes into one ranked list.
+
+    Hybrid @search.score values from separate indexes are not on the same scale, so sorting on the
+    raw score lets one index take every slot. This function puts every index's scores on a common
+    scale before merging. All results are scored in one pass with numpy rather than per index.
+
+    Supported methods:
+    - "rrf": reciprocal rank fusion, 1 / (rrf_k + rank) where rank is the result's position within its own index
+    - "minmax": scores rescaled to [0, 1] within each index
+    - "zscore": scores standardised to mean 0, std 1 within each index
+    - "raw": the raw @search.score (the previous behaviour)
+
+    Args:
+        results_by_index (dict[str, list[dict]]):
+            key = index kind (e.g. "transcripts"), value = results from that index, each with a "_score"
+        method (str): one of FUSION_METHODS
+        weights (dict[str, float] | None):
+            optional per-index multiplier applied after normalisation, indexes not listed get 1.0
+        k (int | None): number of results to return, all results are returned if None
+        rrf_k (int): smoothing constant for "rrf"
+
+    Returns:
+        list[dict]:
+            merged results ordered best first. "_score" is replaced by the fused score,
+            the raw score is still available as "@search.score"
+
+    Raises:
+        ValueError: If an unknown method is given
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method: {method}")
+
+    docs = []
+    groups = []
+    for group, (index_kind, results) in enumerate(results_by_index.items()):
+        docs.extend(results)
+        groups.extend([group] * len(results))
+
+    if not docs:
+        return []
+
+    scores = np.array([d.get("_score", 0) or 0 for d in docs], dtype=np.float64)
+    groups = np.array(groups, dtype=np.int64)
+
+    fused = normalise_scores(scores, groups, method, rrf_k)
+
+    if weights:
+        index_weights = np.array(
+            [weights.get(index_kind, 1.0) for index_kind in results_by_index],
+            dtype=np.float64
+        )
+        fused = fused * index_weights[groups]
+
+    # stable sort so ties keep the order the indexes returned them in
+    order = np.argsort(-fused, kind="stable")
+    if k is not None:
+        order = order[:k]
+
+    merged = []
+    for i in order:
+        doc = dict(docs[i])
+        doc["_score"] = float(fused[i])
+        merged.append(doc)
+    return merged
+
+
+def normalise_scores(scores: np.ndarray, groups: np.ndarray, method: str, rrf_k: int = RRF_K) -> np.ndarray:
+    """
+    Put scores from different groups (indexes) on a common scale.
+
+    Args:
+        scores (np.ndarray): raw scores, one per result
+        groups (np.ndarray): integer group id (index) for each score, same length as scores
+        method (str): one of FUSION_METHODS
+        rrf_k (int): smoothing constant for "rrf"
+
+    Returns:
+        np.ndarray: normalised scores, same shape as scores
+    """
+    if method == "raw":
+        return scores.copy()
+
+    n_groups = int(groups.max()) + 1
+    counts = np.bincount(groups, minlength=n_groups)
+
+    if method == "rrf":
+        # sort by group then score (descending), the rank is the position minus the start of its group
+        order = np.lexsort((-scores, groups))
+        group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        ranks = np.empty(len(scores), dtype=np.int64)
+        ranks[order] = np.arange(len(scores)) - group_starts[groups[order]] + 1
+        return 1.0 / (rrf_k + ranks)
+
+    if method == "minmax":
+        mins = np.full(n_groups, np.inf)
+        maxs = np.full(n_groups, -np.inf)
+        np.minimum.at(mins, groups, scores)
+        np.maximum.at(maxs, groups, scores)
+        spread = (maxs - mins)[groups]
+        # an index with a single result (or all equal scores) gets 1.0 for every result
+        return np.where(spread > 0, (scores - mins[groups]) / np.where(spread > 0, spread, 1.0), 1.0)
+
+    # zscore
+    safe_counts = np.maximum(counts, 1)
+    means = np.bincount(groups, weights=scores, minlength=n_groups) / safe_counts
+    variances = np.bincount(groups, weights=scores ** 2, minlength=n_groups) / safe_counts - means ** 2
+    stds = np.sqrt(np.maximum(variances, 0.0))[groups]
+    return np.where(stds > 0, (scores - means[groups]) / np.where(stds > 0, stds, 1.0), 0.0)
@@ -1,6 +1,7 @@
 from src.backend.rag.env import search_endpoint, admin_key, vector_dimensions
 from azure.search.documents.indexes import SearchIndexClient
 from azure.search.documents import SearchClient
+from azure.search.documents.aio import SearchClient as AsyncSearchClient
 from azure.core.credentials import AzureKeyCredential
 from azure.core.exceptions import ResourceNotFoundError
 
@@ -37,9 +38,31 @@ def make_search_client(index_name: str) -> SearchClient:
         credential=AzureKeyCredential(admin_key),
     )
 
+def make_async_search_client(index_name: str, transport=None) -> AsyncSearchClient:
+    """
+    Create an async SearchClient for querying a specific Azure AI Search index without blocking the event loop.
+
+    Used by the async retrieval path so that several indexes can be queried at the same time.
+
+    Args:
+        index_name (str): Name of the Azure Search index to connect to
+        transport (optional): async transport to send requests through, lets several clients share one connection pool
+
+    Returns:
+        AsyncSearchClient: Configured async client for the given index
+    """
+    kwargs = {"transport": transport} if transport is not None else {}
+    return AsyncSearchClient(
+        endpoint=search_endpoint,
+        index_name=index_name,
+        credential=AzureKeyCredential(admin_key),
+        **kwargs,
+    )
+
 TRANSCRIPT_SEARCH_CLIENT = make_search_client(TRANSCRIPT_INDEX)
 MEETING_NOTES_SEARCH_CLIENT = make_search_client(MEETING_NOTES_INDEX)
 
+
 def ensure_index_exists(index_name: str) -> None:
     """
     Ensure that a given Azure Search index exists before performing operations.
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# delete this file to force embed_chunks to reprocess every blob
+INGESTION_MANIFEST_PATH = os.getenv("INGESTION_MANIFEST_PATH", ".cache/ingestion_manifest.json")
+
+
+class IngestionManifest:
+    """
+    Record of what has already been ingested, stored as a JSON file.
+
+    One entry per blob, keyed by "{doc_type}/{blob name}":
+    {
+        "etag": str,            # blob etag when it was ingested
+        "last_modified": str,   # blob last_modified (isoformat) when it was ingested
+        "options": str,         # chunking options the chunk IDs were produced with
+        "chunk_ids": [str, ...] # ids of the chunks uploaded to the index
+    }
+
+    A blob only needs processing if its etag or the chunking options have changed since its entry
+    was recorded. Entries are only recorded once all of a blob's chunks were uploaded, so a blob
+    that failed part way is retried on the next run.
+    """
+
+    def __init__(self, path: str = INGESTION_MANIFEST_PATH):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def _key(doc_type: str, blob_name: str) -> str:
+        return f"{doc_type}/{blob_name}"
+
+    def is_current(self, doc_type: str, blob, options: str) -> bool:
+        """
+        True if the blob was already ingested with these options and hasn't changed since.
+
+        Args:
+            doc_type (str): "transcript" or "meeting_note"
+            blob: blob properties returned by list_blobs (name, etag, last_modified)
+            options (str): key of the chunking options, see IngestionPipeline.options_key
+        Returns:
+            bool: whether the blob can be skipped
+        """
+        entry = self.entries.get(self._key(doc_type, blob.name))
+        etag = getattr(blob, "etag", None)
+        return (
+            entry is not None
+            and etag is not None
+            and entry["etag"] == etag
+            and entry["options"] == options
+        )
+
+    def chunk_ids(self, doc_type: str, blob_name: str) -> list[str]:
+        """Ids of the chunks recorded for a blob, empty if it has no entry"""
+        with self._lock:
+            entry = self.entries.get(self._key(doc_type, blob_name))
+        return list(entry["chunk_ids"]) if entry else []
+
+    def record(self, doc_type: str, blob, options: str, chunk_ids: list[str]):
+        """
+        Record a blob as ingested. Chunks of the previous version it no longer produces should be
+        deleted from the index first, so a failed delete leaves the old entry (and the blob is retried).
+
+        Args:
+            doc_type (str): "transcript" or "meeting_note"
+            blob: blob properties returned by list_blobs
+            options (str): key of the chunking options used
+            chunk_ids (list[str]): ids of every chunk uploaded for the blob
+        """
+        last_modified = getattr(blob, "last_modified", None)
+        entry = {
+            "etag": getattr(blob, "etag", None),
+            "last_modified": last_modified.isoformat() if hasattr(last_modified, "isoformat") else last_modified,
+            "options": options,
+            "chunk_ids": list(chunk_ids),
+        }
+        with self._lock:
+            self.entries[self._key(doc_type, blob.name)] = entry
+
+    def remove(self, doc_type: str, blob_name: str):
+        """Forget a blob, e.g. because it was deleted from the container and its chunks from the index"""
+        with self._lock:
+            self.entries.pop(self._key(doc_type, blob_name), None)
+
+    def blob_names(self, doc_type: str) -> set[str]:
+        """Names of every blob with an entry for this doc_type"""
+        prefix = f"{doc_type}/"
+        with self._lock:
+            return {key[len(prefix):] for key in self.entries if key.startswith(prefix)}
+
+    def save(self):
+        """Write the manifest, via a temporary file so a crash never leaves it half written"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = json.dumps(self.entries, indent=1, sort_keys=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,316 @@
+import json
+import queue
+import threading
+import time
+from azure.search.documents.models import IndexingResult
+from src.backend.rag.blob_utils import (
+    contextual_chunking,
+    chunk_epics,
+    download_blob_text,
+    make_chunk_dicts,
+    make_text_splitter,
+)
+from src.backend.rag.embedding_utils import build_index_documents, get_search_client_for_doc_type
+from src.backend.rag.index_utils import ensure_index_exists
+from src.backend.rag.ingestion_manifest import IngestionManifest
+from src.backend.rag.retrieval_cache import invalidate_retrieval_cache
+
+# Streaming version of chunk_from_blob + process_and_store_chunks.
+#
+#   list -> download -> split -> (context) -> embed -> upload
+#
+# Every stage has its own pool of worker threads and hands documents to the next stage through a
+# bounded queue. A full queue blocks the stage feeding it, so at most QUEUE_SIZE documents wait between
+# any two stages however big the container is, and a document is uploaded as soon as it has been embedded
+# instead of after the whole container has been chunked.
+
+# worker threads per stage, the slow stages (network/LLM bound) get the most
+STAGE_WORKERS = {
+    "download": 8,
+    "split": 2,
+    "context": 4,
+    "embed": 4,
+    "upload": 2,
+}
+# maximum number of documents waiting between two stages
+QUEUE_SIZE = 8
+# the retrieval cache is cleared at most this often while uploading (and once at the end)
+INVALIDATE_INTERVAL = 5.0
+# maximum number of documents in one delete_documents request
+DELETE_BATCH_SIZE = 1000
+
+# marks the end of a queue, passed on from one stage to the next
+_DONE = object()
+
+
+class IngestionPipeline:
+    """
+    Chunks, embeds and uploads every .txt blob of a container as a stream of documents.
+
+    Each document moves through the stages as a dict:
+    {"blob": ..., "text": ..., "chunks": [...], "epic_chunks": [...], "documents": [...]}
+
+    A document that fails in any stage is logged, recorded in ``errors`` and dropped,
+    the rest of the container is still ingested.
+
+    With a manifest the run is incremental: blobs whose etag (and the chunking options) match
+    the manifest are skipped at the list stage, chunks a changed blob no longer produces are
+    deleted from the index, and so are the chunks of blobs that were removed from the container.
+    """
+
+    def __init__(
+            self,
+            container_client,
+            doc_type: str,
+            chunk_size: int = 756,
+            context_chunking: bool = False,
+            overlap: bool = False,
+            epic_chunking: bool = False,
+            workers: dict[str, int] | None = None,
+            queue_size: int = QUEUE_SIZE,
+            manifest: IngestionManifest | None = None):
+        self.container_client = container_client
+        self.doc_type = doc_type
+        self.context_chunking = context_chunking
+        # epic_chunking should not occur for documents other than meeting notes
+        self.epic_chunking = epic_chunking and doc_type == "meeting_note"
+        self.text_splitter = make_text_splitter(chunk_size, overlap)
+        self.workers = {**STAGE_WORKERS, **(workers or {})}
+        self.queue_size = queue_size
+        self.manifest = manifest
+        # chunk ids depend on the chunking options, so changing them reprocesses every blob
+        self.options_key = json.dumps({
+            "chunk_size": chunk_size,
+            "overlap": overlap,
+            "context_chunking": context_chunking,
+            "epic_chunking": self.epic_chunking,
+        }, sort_keys=True)
+
+        self.results: list[IndexingResult] = []
+        self.errors: list[tuple[str, str, Exception]] = []
+        self.seen_blobs: set[str] = set()
+        self.skipped = 0
+        self.deleted = 0
+        self._lock = threading.Lock()
+        self._last_invalidation = 0.0
+
+    # ============== STAGES ==============
+
+    def download(self, doc: dict) -> dict:
+        doc["text"] = download_blob_text(self.container_client, doc["blob"])
+        return doc
+
+    def split(self, doc: dict) -> dict:
+        doc["chunks"] = self.text_splitter.split_text(doc["text"])
+        doc["epic_chunks"] = chunk_epics(doc["text"]) if self.epic_chunking else []
+        if not self.context_chunking:
+            # the full text is only needed as the LLM's context, don't hold on to it
+            doc["text"] = None
+        return doc
+
+    def add_context(self, doc: dict) -> dict:
+        doc["chunks"] = contextual_chunking(text=doc["text"], chunks=doc["chunks"])
+        doc["text"] = None
+        return doc
+
+    def embed(self, doc: dict) -> dict:
+        # epic chunks are added after the contextualised chunks, as in chunk_from_blob
+        chunks = make_chunk_dicts(doc["blob"].name, doc["chunks"] + doc["epic_chunks"], self.doc_type)
+        # an empty document still goes on to upload so its manifest entry (and stale chunks) are updated
+        doc["documents"] = build_index_documents(chunks, self.doc_type) if chunks else []
+        doc["chunks"] = doc["epic_chunks"] = None
+        return doc
+
+    def upload(self, doc: dict) -> None:
+        search_client = get_search_client_for_doc_type(self.doc_type)
+        results = search_client.upload_documents(documents=doc["documents"]) if doc["documents"] else []
+        failed = [r for r in results if not r.succeeded]
+        for r in failed:
+            print(f"Failed to index {r.key}: {r.error_message}")
+
+        # only a fully indexed blob is recorded, otherwise it is retried next run. Stale chunks are deleted
+        # before the entry is replaced, if that fails the old entry (with their ids) is kept for the retry
+        if self.manifest is not None and not failed:
+            chunk_ids = [d["id"] for d in doc["documents"]]
+            new_ids = set(chunk_ids)
+            previous = self.manifest.chunk_ids(self.doc_type, doc["blob"].name)
+            self.delete_chunks([i for i in previous if i not in new_ids])
+            self.manifest.record(self.doc_type, doc["blob"], self.options_key, chunk_ids)
+
+        with self._lock:
+            self.results.extend(results)
+            # cached retrieval results may now be missing new chunks
+            now = time.monotonic()
+            invalidate = now - self._last_invalidation >= INVALIDATE_INTERVAL
+            if invalidate:
+                self._last_invalidation = now
+        if invalidate:
+            invalidate_retrieval_cache()
+        print(f"Indexed {doc['blob'].name} ({len(results)} chunks)")
+
+    def delete_chunks(self, chunk_ids: list[str]):
+        """Delete chunks from this doc_type's index"""
+        if not chunk_ids:
+            return
+        search_client = get_search_client_for_doc_type(self.doc_type)
+        for i in range(0, len(chunk_ids), DELETE_BATCH_SIZE):
+            batch = chunk_ids[i:i + DELETE_BATCH_SIZE]
+            search_client.delete_documents(documents=[{"id": chunk_id} for chunk_id in batch])
+        with self._lock:
+            self.deleted += len(chunk_ids)
+
+    # ============== RUNNING ==============
+
+    def run(self) -> dict[str, list[IndexingResult]]:
+        """
+        Run every stage until the container has been fully ingested.
+
+        Returns:
+            dict[str, list[IndexingResult]]: {doc_type: indexing results}, same shape as process_and_store_chunks
+        """
+        # check if index exists before attempting upload
+        ensure_index_exists(get_search_client_for_doc_type(self.doc_type)._index_name)
+
+        stages = [("download", self.download), ("split", self.split)]
+        if self.context_chunking:
+            stages.append(("context", self.add_context))
+        stages += [("embed", self.embed), ("upload", self.upload)]
+
+        inbox = queue.Queue(maxsize=self.queue_size)
+        first_inbox = inbox
+        closers = []
+        for i, (name, func) in enumerate(stages):
+            outbox = queue.Queue(maxsize=self.queue_size) if i < len(stages) - 1 else None
+            closers.append(self._start_stage(name, func, inbox, outbox))
+            inbox = outbox
+
+        try:
+            try:
+                self._list_blobs(first_inbox)
+            finally:
+                # always shut the stages down, even if listing the container failed
+                first_inbox.put(_DONE)
+                for closer in closers:
+                    closer.join()
+
+            # only reached if the whole container was listed, so anything not seen has been deleted
+            if self.manifest is not None:
+                for blob_name in self.manifest.blob_names(self.doc_type) - self.seen_blobs:
+                    try:
+                        self.delete_chunks(self.manifest.chunk_ids(self.doc_type, blob_name))
+                    except Exception as e:
+                        # the entry is kept so the chunks are deleted on the next run
+                        print(f"Deleting chunks of removed blob {blob_name} failed: {e!r}")
+                        self.errors.append((blob_name, "delete", e))
+                        continue
+                    self.manifest.remove(self.doc_type, blob_name)
+        finally:
+            if self.manifest is not None:
+                self.manifest.save()
+
+        if self.results or self.deleted:
+            invalidate_retrieval_cache()
+        return {self.doc_type: self.results} if self.results else {}
+
+    def _list_blobs(self, outbox: queue.Queue):
+        # list_blobs pages lazily and returns blobs ordered by name, so documents
+        # start downloading before the whole container has been listed
+        for blob in self.container_client.list_blobs():
+            # If the file is not a text file we can't handle it
+            if not blob.name.lower().endswith(".txt"):
+                continue
+            self.seen_blobs.add(blob.name)
+            if self.manifest is not None and self.manifest.is_current(self.doc_type, blob, self.options_key):
+                self.skipped += 1
+                continue
+            outbox.put({"blob": blob})
+
+    def _start_stage(self, name: str, func, inbox: queue.Queue, outbox: queue.Queue | None) -> threading.Thread:
+        """
+        Start a stage's workers plus a closer thread that passes _DONE on once every worker has finished.
+        Returns the closer thread.
+        """
+        workers = [
+            threading.Thread(target=self._work, args=(name, func, inbox, outbox), name=f"ingest-{name}-{i}", daemon=True)
+            for i in range(max(1, self.workers[name]))
+        ]
+        for worker in workers:
+            worker.start()
+
+        def close():
+            for worker in workers:
+                worker.join()
+            if outbox is not None:
+                outbox.put(_DONE)
+
+        closer = threading.Thread(target=close, name=f"ingest-{name}-closer", daemon=True)
+        closer.start()
+        return closer
+
+    def _work(self, name: str, func, inbox: queue.Queue, outbox: queue.Queue | None):
+        while True:
+            doc = inbox.get()
+            if doc is _DONE:
+                # put it back for the other workers of this stage
+                inbox.put(_DONE)
+                return
+            try:
+                result = func(doc)
+            except Exception as e:
+                blob_name = doc["blob"].name
+                print(f"Ingestion of {blob_name} failed in {name} stage: {e!r}")
+                with self._lock:
+                    self.errors.append((blob_name, name, e))
+                continue
+            if result is not None and outbox is not None:
+                outbox.put(result)
+
+
+def run_ingestion_pipeline(
+        container_client,
+        doc_type: str,
+        chunk_size: int = 756,
+        context_chunking: bool = False,
+        overlap: bool = False,
+        epic_chunking: bool = False,
+        workers: dict[str, int] | None = None,
+        queue_size: int = QUEUE_SIZE,
+        manifest: IngestionManifest | None = None) -> dict[str, list[IndexingResult]]:
+    """
+    Stream every .txt blob in a container into its search index.
+
+    Takes the same chunking options as chunk_from_blob, but documents are uploaded as they are
+    processed so memory stays flat and the first documents are searchable straight away.
+
+    Args:
+        container_client: Azure Blob container client used to list and retrieve blobs
+        doc_type (str): "transcript" or "meeting_note"
+        chunk_size (int, optional): Maximum size of each chunk (in characters)
+        context_chunking (bool, optional): If True, prepend LLM-generated context to each chunk
+        overlap (bool, optional): If True, apply ~10% overlap between chunks
+        epic_chunking (bool, optional): If True, additionally extract "Epic"-based chunks (meeting notes only)
+        workers (dict[str, int] | None, optional): worker threads per stage, overrides STAGE_WORKERS
+        queue_size (int, optional): maximum number of documents waiting between two stages
+        manifest (IngestionManifest | None, optional):
+            if given, only new/changed blobs are processed and stale chunks are deleted from the index
+
+    Returns:
+        dict[str, list[IndexingResult]]: {doc_type: indexing results}, same shape as process_and_store_chunks
+    """
+    pipeline = IngestionPipeline(
+        container_client,
+        doc_type,
+        chunk_size=chunk_size,
+        context_chunking=context_chunking,
+        overlap=overlap,
+        epic_chunking=epic_chunking,
+        workers=workers,
+        queue_size=queue_size,
+        manifest=manifest,
+    )
+    results = pipeline.run()
+    if manifest is not None:
+        print(f"Skipped {pipeline.skipped} unchanged blob(s), deleted {pipeline.deleted} stale chunk(s)")
+    if pipeline.errors:
+        print(f"{len(pipeline.errors)} document(s) could not be ingested")
+    return results
@@ -0,0 +1,327 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+import numpy as np
+import redis
+from dotenv import load_dotenv
+from src.backend.redis.redis_client import REDIS_URL, get_redis
+
+load_dotenv()
+
+# "memory" keeps the cache in this process, "redis" shares it between workers (and lets ingestion invalidate it).
+# Ingestion runs in its own process, so a memory cache only drops re-ingested documents' stale results once they
+# expire (RETRIEVAL_CACHE_TTL); redis is the default whenever REDIS_URL is set
+RETRIEVAL_CACHE_BACKEND = os.getenv("RETRIEVAL_CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "memory")
+RETRIEVAL_CACHE_TTL = int(os.getenv("RETRIEVAL_CACHE_TTL", 60 * 60))
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", 1000))
+# minimum cosine similarity between two query embeddings for the cached results to be reused
+SIMILARITY_THRESHOLD = float(os.getenv("RETRIEVAL_CACHE_SIMILARITY", 0.95))
+
+
+def normalise_query(query: str) -> str:
+    """
+    Normalise a query so trivially different phrasings share an exact cache key.
+
+    Lower-cases, collapses whitespace and strips surrounding punctuation, e.g.
+    "  Agilent Q2 2024 guidance? " -> "agilent q2 2024 guidance"
+
+    Args:
+        query (str): User's query
+    Returns:
+        str: normalised query
+    """
+    query = re.sub(r"\s+", " ", query.lower())
+    return query.strip(" ?!.,;:'\"")
+
+
+def make_filter_key(route_source: str, filter_metadata: dict) -> str:
+    """
+    Build a stable key from the route and the metadata filter values. Two queries are only
+    compared by embedding similarity if they share this key, so "Agilent Q2 2024" never
+    reuses results cached for "Agilent Q3 2024" however similar the embeddings are.
+
+    Args:
+        route_source (str): "transcripts", "meeting_notes" or "both"
+        filter_metadata (dict): metadata returned by retrieve_filter_metadata
+    Returns:
+        str: sha1 of the canonicalised route + filter
+    """
+    canonical = {
+        field: sorted(str(v) for v in values)
+        for field, values in (filter_metadata or {}).items()
+        if values
+    }
+    payload = json.dumps({"route": route_source, "filter": canonical}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def encode_embedding(embedding: list[float]) -> str:
+    """Pack an embedding into a compact base64 float32 string for storage"""
+    return base64.b64encode(np.asarray(embedding, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def decode_embedding(data: str) -> np.ndarray:
+    """Inverse of encode_embedding"""
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+class InMemoryCacheBackend:
+    """
+    In-process cache store with LRU eviction and a TTL per entry.
+
+    Entries can also be indexed by group (the filter key) so the similarity tier only
+    has to look at entries that were retrieved with the same filter.
+    """
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES, ttl: int = RETRIEVAL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (expires_at, group, value), ordered least -> most recently used
+        self.entries: OrderedDict[str, tuple[float, str, dict]] = OrderedDict()
+        self.groups: dict[str, set[str]] = {}
+
+    async def get(self, key: str) -> dict | None:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, group: str | None = None):
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (time.monotonic() + self.ttl, group, value)
+        if group is not None:
+            self.groups.setdefault(group, set()).add(key)
+
+        while len(self.entries) > self.max_entries:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+
+    async def group_values(self, group: str) -> list[dict]:
+        now = time.monotonic()
+        values = []
+        for key in list(self.groups.get(group, ())):
+            expires_at, _, value = self.entries[key]
+            if expires_at < now:
+                self._remove(key)
+            else:
+                values.append(value)
+        return values
+
+    def clear(self):
+        self.entries.clear()
+        self.groups.clear()
+
+    def _remove(self, key: str):
+        _, group, _ = self.entries.pop(key)
+        members = self.groups.get(group)
+        if members is not None:
+            members.discard(key)
+            if not members:
+                del self.groups[group]
+
+
+class RedisCacheBackend:
+    """
+    Redis cache store shared by every backend worker.
+
+    Layout:
+    - ``{prefix}:entry:{key}``: JSON entry, expires after the TTL
+    - ``{prefix}:lru``: sorted set of entry keys scored by last use, expired keys are pruned and the
+      rest trimmed to max_entries
+    - ``{prefix}:group:{group}``: set of entry keys that share a filter key
+
+    Lookups and stores go through the worker's shared Redis client (REDIS_POOL, opened and closed by the
+    API's lifespan). clear() is also called from the synchronous ingestion code, which has no event loop,
+    so it uses a sync client to the same Redis, created the first time it is needed.
+    """
+
+    def __init__(
+            self,
+            max_entries: int = RETRIEVAL_CACHE_MAX_ENTRIES,
+            ttl: int = RETRIEVAL_CACHE_TTL,
+            prefix: str = "retrieval_cache"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.prefix = prefix
+        self._sync_rdb: redis.Redis | None = None
+
+    @property
+    def rdb(self):
+        return get_redis()
+
+    @property
+    def sync_rdb(self) -> redis.Redis:
+        if self._sync_rdb is None:
+            self._sync_rdb = redis.from_url(REDIS_URL, decode_responses=True)
+        return self._sync_rdb
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def _group_key(self, group: str) -> str:
+        return f"{self.prefix}:group:{group}"
+
+    async def get(self, key: str) -> dict | None:
+        data = await self.rdb.get(self._entry_key(key))
+        if data is None:
+            return None
+        await self.rdb.zadd(f"{self.prefix}:lru", {key: time.time()})
+        return json.loads(data)
+
+    async def set(self, key: str, value: dict, group: str | None = None):
+        lru_key = f"{self.prefix}:lru"
+        now = time.time()
+        async with self.rdb.pipeline(transaction=False) as pipe:
+            pipe.set(self._entry_key(key), json.dumps({**value, "group": group}), ex=self.ttl)
+            if group is not None:
+                pipe.sadd(self._group_key(group), key)
+                pipe.expire(self._group_key(group), self.ttl)
+            # a key unused for longer than the TTL has expired, so it mustn't count towards max_entries
+            pipe.zremrangebyscore(lru_key, "-inf", now - self.ttl)
+            pipe.zadd(lru_key, {key: now})
+            pipe.zcard(lru_key)
+            *_, size = await pipe.execute()
+
+        if size > self.max_entries:
+            evicted = await self.rdb.zpopmin(lru_key, size - self.max_entries)
+            if evicted:
+                await self.rdb.delete(*(self._entry_key(k) for k, _ in evicted))
+
+    async def group_values(self, group: str) -> list[dict]:
+        keys = list(await self.rdb.smembers(self._group_key(group)))
+        if not keys:
+            return []
+        raw = await self.rdb.mget([self._entry_key(k) for k in keys])
+        values = []
+        expired = []
+        for key, data in zip(keys, raw):
+            if data is None:
+                expired.append(key)
+            else:
+                values.append(json.loads(data))
+        if expired:
+            await self.rdb.srem(self._group_key(group), *expired)
+        return values
+
+    def clear(self):
+        keys = list(self.sync_rdb.scan_iter(match=f"{self.prefix}:*", count=500))
+        if keys:
+            self.sync_rdb.delete(*keys)
+
+
+class RetrievalCache:
+    """
+    Two-tier cache of retrieve_context results.
+
+    - exact tier: keyed on the normalised query and k, checked before any embedding/LLM call
+    - similarity tier: checked once the query embedding, route and metadata filter are known.
+      Reuses results cached for a different wording of the same question when the route and
+      filter match and the cosine similarity of the embeddings passes the threshold,
+      saving the index searches
+
+    Cache failures (e.g. Redis being down) are logged and treated as a miss so they never break retrieval.
+    """
+
+    def __init__(self, backend, threshold: float = SIMILARITY_THRESHOLD):
+        self.backend = backend
+        self.threshold = threshold
+
+    @staticmethod
+    def exact_key(query: str, k: int) -> str:
+        return hashlib.sha1(f"{k}\n{normalise_query(query)}".encode("utf-8")).hexdigest()
+
+    async def get_exact(self, query: str, k: int) -> list[dict] | None:
+        """
+        Returns the cached results for this exact (normalised) query, or None on a miss.
+        """
+        try:
+            entry = await self.backend.get(self.exact_key(query, k))
+        except Exception as e:
+            print(f"Retrieval cache lookup failed: {e!r}")
+            return None
+        if entry is None:
+            return None
+        return entry["results"]
+
+    async def get_similar(self, query_embedding: list[float], route_source: str, filter_metadata: dict, k: int) -> list[dict] | None:
+        """
+        Returns cached results for the most similar query cached with the same route, filter and k,
+        or None if no cached query passes the similarity threshold.
+        """
+        try:
+            candidates = await self.backend.group_values(make_filter_key(route_source, filter_metadata))
+        except Exception as e:
+            print(f"Retrieval cache lookup failed: {e!r}")
+            return None
+
+        candidates = [c for c in candidates if c.get("k") == k]
+        if not candidates:
+            return None
+
+        matrix = np.stack([decode_embedding(c["embedding"]) for c in candidates])
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarities = (matrix @ query) / np.where(norms > 0, norms, 1.0)
+
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        return candidates[best]["results"]
+
+    async def set(self, query: str, k: int, query_embedding: list[float], route_source: str, filter_metadata: dict, results: list[dict]):
+        """
+        Stores results for a query under its exact key and in its filter group for the similarity tier.
+        """
+        entry = {
+            "query": normalise_query(query),
+            "k": k,
+            "embedding": encode_embedding(query_embedding),
+            "results": results,
+        }
+        try:
+            await self.backend.set(self.exact_key(query, k), entry, make_filter_key(route_source, filter_metadata))
+        except Exception as e:
+            print(f"Retrieval cache store failed: {e!r}")
+
+    def invalidate(self):
+        """Drops every cached result, called when an index's documents change"""
+        try:
+            self.backend.clear()
+        except Exception as e:
+            print(f"Retrieval cache invalidation failed: {e!r}")
+
+
+def make_retrieval_cache(backend: str = RETRIEVAL_CACHE_BACKEND) -> RetrievalCache:
+    """
+    Create the retrieval cache with the configured backend.
+
+    Args:
+        backend (str): "memory" or "redis"
+    Returns:
+        RetrievalCache: cache using the chosen store
+    Raises:
+        ValueError: If an unknown backend is given
+    """
+    if backend == "memory":
+        return RetrievalCache(InMemoryCacheBackend())
+    if backend == "redis":
+        return RetrievalCache(RedisCacheBackend())
+    raise ValueError(f"Unknown retrieval cache backend: {backend}")
+
+
+RETRIEVAL_CACHE = make_retrieval_cache()
+
+
+def invalidate_retrieval_cache():
+    """Drop all cached retrieval results, e.g. after new chunks are uploaded to an index"""
+    RETRIEVAL_CACHE.invalidate()
@@ -1,8 +1,15 @@
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Literal
 from pydantic import BaseModel, Field
-from src.backend.rag.embedding_utils import generate_embeddings
+from src.backend.rag.async_clients import ASYNC_CLIENTS
+from src.backend.rag.embedding_utils import generate_embeddings, agenerate_embeddings
 from src.backend.rag.env import client, deployment_name
+from src.backend.rag.fusion import fuse_results
+from src.backend.rag.retrieval_cache import RETRIEVAL_CACHE
+from src.backend.rag.routing_cache import ROUTING_CACHE
 from src.backend.rag.index_utils import TRANSCRIPT_SEARCH_CLIENT, MEETING_NOTES_SEARCH_CLIENT
 from azure.search.documents.models import VectorizedQuery
 import textwrap
@@ -11,6 +18,22 @@ from langextract.core.data import AnnotatedDocument
 
 FINAL_K = 6
 
+# how results from separate indexes are merged, see fusion.fuse_results
+FUSION_METHOD = "rrf"
+# optional per-index multiplier applied after fusion e.g. {"meeting_notes": 1.2}
+INDEX_WEIGHTS: dict[str, float] = {}
+
+# per-stage deadlines (seconds) for the pre-search calls made by aretrieve_context
+EMBEDDING_TIMEOUT = 10.0
+ROUTE_TIMEOUT = 5.0
+METADATA_TIMEOUT = 8.0
+# deadline for a single index search, an index that misses it is left out of the results
+INDEX_SEARCH_TIMEOUT = 5.0
+
+# bounded pool shared by all requests for the pre-search calls that are still blocking (langextract metadata)
+PRE_SEARCH_WORKERS = 12
+PRE_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=PRE_SEARCH_WORKERS, thread_name_prefix="pre-search")
+
 class RetrievalRoute(BaseModel):
     source: Literal["transcripts", "meeting_notes", "both"] = Field(
         description="Which index should be searched for this user query."
@@ -75,6 +98,27 @@ def route_query(query: str) -> RetrievalRoute:
 
     return response.output_parsed
 
+async def aroute_query(query: str) -> RetrievalRoute:
+    """
+    Async version of route_query using the shared async LLM client, decisions are cached (see routing_cache)
+
+    Args:
+        query (str): User's query
+
+    Returns:
+        RetrievalRoute: Object which has attribute source which is one of "transcripts", "meeting_notes", "both"
+    """
+    async def classify() -> str:
+        response = await ASYNC_CLIENTS.llm.responses.parse(
+            model=deployment_name, # gpt-5.2-chat
+            input=get_routing_prompt(query),
+            text_format=RetrievalRoute,
+        )
+        return response.output_parsed.source
+
+    source = await ROUTING_CACHE.route("retrieval_route", query, get_routing_prompt, classify)
+    return RetrievalRoute(source=source)
+
 def retrieve_context(query: str, k: int = FINAL_K) -> list:
     """
     Retrieves top K document chunks from the vector database based on a combination of cosine similarity and BM25 score
@@ -95,14 +139,127 @@ def retrieve_context(query: str, k: int = FINAL_K) -> list:
 
     # get values for fields that will be used to build the filter text
     filter_metadata = retrieve_filter_metadata(query)
-    
+
+    return search_indexes(query, query_embedding, route, filter_metadata, k)
+
+async def aretrieve_context(query: str, k: int = FINAL_K) -> list:
+    """
+    Async version of retrieve_context. The three pre-search calls (query embedding, index routing and
+    filter metadata extraction) are independent of each other, so they are sent at the same time and the
+    search starts as soon as the slowest of them returns rather than after all three in series.
+
+    Each stage has its own deadline:
+    - embedding: required, a timeout or error is raised since there is nothing to search with
+    - routing: falls back to searching "both" indexes
+    - metadata: falls back to no filter
+
+    Results are cached (see retrieval_cache.RetrievalCache). A repeat of the same normalised query skips
+    every call, a differently worded query with the same route and filter skips the index searches.
+    Results obtained with a fallback route or filter, or missing an index that timed out, are not cached.
+
+    Args:
+        query (str): User's query
+        k (int): parameter to specify how many closest K documents to retrieve
+
+    Returns:
+        list: list of K closest document chunks
+    """
+    cached = await RETRIEVAL_CACHE.get_exact(query, k)
+    if cached is not None:
+        return cached
+
+    route_fallback = RetrievalRoute(source="both")
+    metadata_fallback = {}
+    query_embedding, route, filter_metadata = await asyncio.gather(
+        run_stage(agenerate_embeddings, [query], timeout=EMBEDDING_TIMEOUT),
+        run_stage(aroute_query, query, timeout=ROUTE_TIMEOUT, fallback=route_fallback),
+        run_stage(retrieve_filter_metadata, query, timeout=METADATA_TIMEOUT, fallback=metadata_fallback),
+    )
+    query_embedding = query_embedding[0]
+    degraded = route is route_fallback or filter_metadata is metadata_fallback
+
+    if not degraded:
+        cached = await RETRIEVAL_CACHE.get_similar(query_embedding, route.source, filter_metadata, k)
+        if cached is not None:
+            return cached
+
+    results, timed_out = await asearch_indexes(query, query_embedding, route, filter_metadata, k)
+    degraded = degraded or bool(timed_out)
+
+    if results and not degraded:
+        await RETRIEVAL_CACHE.set(query, k, query_embedding, route.source, filter_metadata, results)
+    return results
+
+async def run_stage(func, *args, timeout: float, fallback=None):
+    """
+    Runs a pre-search call and waits at most ``timeout`` seconds for it.
+
+    Coroutine functions are awaited directly (and cancelled on timeout). Blocking functions run on the shared
+    worker pool, a timed out blocking call is not cancelled (threads can't be), it finishes in the background
+    and its result is dropped.
+
+    Args:
+        func: coroutine function or blocking function to call
+        *args: positional arguments passed to func
+        timeout (float): seconds to wait before giving up on the call
+        fallback: value returned if the call fails or times out, if None the exception is raised instead
+
+    Returns:
+        Any: result of func(*args) or the fallback
+    """
+    if inspect.iscoroutinefunction(func):
+        call = func(*args)
+    else:
+        call = asyncio.get_running_loop().run_in_executor(PRE_SEARCH_EXECUTOR, func, *args)
+    try:
+        return await asyncio.wait_for(call, timeout=timeout)
+    except Exception as e:
+        if fallback is None:
+            raise
+        stage = getattr(func, "__name__", repr(func))
+        print(f"{stage} failed or timed out after {timeout}s ({e!r}), using fallback: {fallback}")
+        return fallback
+
+def search_indexes(query: str, query_embedding: list[float], route: RetrievalRoute, filter_metadata: dict, k: int = FINAL_K) -> list:
+    """
+    Runs hybrid search against the index(es) chosen by the route and merges the results.
+
+    Args:
+        query (str): User's query, used for the BM25 part of the hybrid search
+        query_embedding (list[float]): embedding of the query, used for the vector part of the search
+        route (RetrievalRoute): which index(es) to search
+        filter_metadata (dict): metadata extracted from the query used to build each index's filter
+        k (int): number of documents to return
+
+    Returns:
+        list: list of K closest document chunks
+    """
+    results_by_index = collect_index_results(query, query_embedding, route, filter_metadata, k)
+
+    # raw scores from separate indexes aren't comparable so they're normalised before merging
+    return fuse_results(results_by_index, method=FUSION_METHOD, weights=INDEX_WEIGHTS, k=k)
+
+def collect_index_results(query: str, query_embedding: list[float], route: RetrievalRoute, filter_metadata: dict, k: int = FINAL_K) -> dict[str, list[dict]]:
+    """
+    Runs hybrid search against the index(es) chosen by the route without merging them.
+
+    Args:
+        query (str): User's query, used for the BM25 part of the hybrid search
+        query_embedding (list[float]): embedding of the query, used for the vector part of the search
+        route (RetrievalRoute): which index(es) to search
+        filter_metadata (dict): metadata extracted from the query used to build each index's filter
+        k (int): number of documents to return from each index
+
+    Returns:
+        dict[str, list[dict]]: key = index kind ("transcripts", "meeting_notes"), value = that index's results best first
+    """
     vector_query = VectorizedQuery(
         vector=query_embedding,
         k_nearest_neighbors=k,
         fields="embedding"
     )
     
-    combined = []
+    results_by_index = {}
     # rather than retrieving context and filters for both types of documents we could route to specific ones based on the query
     if route.source in ("transcripts", "both"):
         transcript_filter = create_safe_filter_for_index(filter_metadata, "transcripts")
@@ -112,11 +269,7 @@ def retrieve_context(query: str, k: int = FINAL_K) -> list:
             filter = transcript_filter,
             top=k
         )
-        for r in transcript_results:
-            r_dict = dict(r)
-            r_dict["_index"] = "transcripts"
-            r_dict["_score"] = r.get("@search.score", 0)
-            combined.append(r_dict)
+        results_by_index["transcripts"] = [format_search_result(r, "transcripts") for r in transcript_results]
 
     if route.source in ("meeting_notes", "both"):
         meeting_filter = create_safe_filter_for_index(filter_metadata, "meeting_notes")
@@ -126,21 +279,111 @@ def retrieve_context(query: str, k: int = FINAL_K) -> list:
             filter=meeting_filter,
             top=k
         )
+        results_by_index["meeting_notes"] = [format_search_result(r, "meeting_notes") for r in meeting_results]
+
+    return results_by_index
 
-        for r in meeting_results:
-            r_dict = dict(r)
-            r_dict["_index"] = "meeting_notes"
-            r_dict["_score"] = r.get("@search.score", 0)
-            combined.append(r_dict)
+async def asearch_indexes(
+        query: str,
+        query_embedding: list[float],
+        route: RetrievalRoute,
+        filter_metadata: dict,
+        k: int = FINAL_K,
+        timeout: float = INDEX_SEARCH_TIMEOUT) -> tuple[list, list[str]]:
+    """
+    Async version of search_indexes. When the route is "both" the transcript and meeting notes indexes
+    are queried at the same time and their results are merged once both have answered.
 
-    combined_sorted = sorted(
-        combined,
-        key=lambda x: x["_score"],
-        reverse=True
+    Each index search has its own deadline, an index that misses it is logged and left out so a slow
+    index can't hold up the answer.
+
+    Args:
+        query (str): User's query, used for the BM25 part of the hybrid search
+        query_embedding (list[float]): embedding of the query, used for the vector part of the search
+        route (RetrievalRoute): which index(es) to search
+        filter_metadata (dict): metadata extracted from the query used to build each index's filter
+        k (int): number of documents to return
+        timeout (float): seconds each index search is allowed to take
+
+    Returns:
+        tuple[list, list[str]]: list of K closest document chunks, and the index kinds that timed out
+        (their results are missing, so the chunks shouldn't be cached)
+    """
+    vector_query = VectorizedQuery(
+        vector=query_embedding,
+        k_nearest_neighbors=k,
+        fields="embedding"
     )
 
-    return combined_sorted[:k]
-    
+    searches = []
+    if route.source in ("transcripts", "both"):
+        searches.append(asearch_index(ASYNC_CLIENTS.search("transcripts"), "transcripts", query, vector_query, filter_metadata, k, timeout))
+    if route.source in ("meeting_notes", "both"):
+        searches.append(asearch_index(ASYNC_CLIENTS.search("meeting_notes"), "meeting_notes", query, vector_query, filter_metadata, k, timeout))
+
+    # kept in route order whichever index answers first, fuse_results breaks score ties by this order
+    # and the fused list is cached, so it mustn't depend on timing
+    searched = await asyncio.gather(*searches)
+    results_by_index = {index_kind: results or [] for index_kind, results in searched}
+    timed_out = [index_kind for index_kind, results in searched if results is None]
+
+    # raw scores from separate indexes aren't comparable so they're normalised before merging
+    return fuse_results(results_by_index, method=FUSION_METHOD, weights=INDEX_WEIGHTS, k=k), timed_out
+
+async def asearch_index(
+        search_client,
+        index_kind: str,
+        query: str,
+        vector_query: VectorizedQuery,
+        filter_metadata: dict,
+        k: int,
+        timeout: float) -> tuple[str, list[dict] | None]:
+    """
+    Runs a hybrid search against a single index with an async SearchClient and reads every result page.
+
+    Args:
+        search_client: async SearchClient for the index
+        index_kind (str): "transcripts" or "meeting_notes"
+        query (str): User's query
+        vector_query (VectorizedQuery): vector part of the hybrid search
+        filter_metadata (dict): metadata used to build the index's filter
+        k (int): number of documents to return
+        timeout (float): seconds the search (including reading results) is allowed to take
+
+    Returns:
+        tuple[str, list[dict] | None]: the index_kind and its formatted search results,
+        the results are None if the index missed its deadline
+    """
+    async def run_search() -> list[dict]:
+        results = await search_client.search(
+            search_text=query, # hybrid retrieval: populating search_text leads to BM25 score search as well as vector comparison
+            vector_queries=[vector_query],
+            filter=create_safe_filter_for_index(filter_metadata, index_kind),
+            top=k
+        )
+        return [format_search_result(r, index_kind) async for r in results]
+
+    try:
+        return index_kind, await asyncio.wait_for(run_search(), timeout=timeout)
+    except TimeoutError:
+        print(f"Search on {index_kind} index timed out after {timeout}s, skipping its results")
+        return index_kind, None
+
+def format_search_result(result: dict, index_kind: str) -> dict:
+    """
+    Converts a raw search result into a dict tagged with the index it came from and its search score.
+
+    Args:
+        result (dict): single result returned by SearchClient.search
+        index_kind (str): "transcripts" or "meeting_notes"
+
+    Returns:
+        dict: copy of the result with "_index" and "_score" keys added
+    """
+    r_dict = dict(result)
+    r_dict["_index"] = index_kind
+    r_dict["_score"] = result.get("@search.score", 0)
+    return r_dict
 
 def create_safe_filter_for_index(metadata: dict, index_kind: str) -> str:
     """
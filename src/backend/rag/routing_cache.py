@@ -0,0 +1,135 @@
+import hashlib
+import os
+from typing import Awaitable, Callable
+from dotenv import load_dotenv
+from src.backend.rag.env import deployment_name
+from src.backend.rag.retrieval_cache import InMemoryCacheBackend, RedisCacheBackend, normalise_query
+
+load_dotenv()
+
+# "memory" keeps decisions in this process, "redis" shares them between workers
+ROUTING_CACHE_BACKEND = os.getenv("ROUTING_CACHE_BACKEND", "memory")
+# decisions don't depend on the indexed documents, only on the prompt and model (which are part of the key)
+ROUTING_CACHE_TTL = int(os.getenv("ROUTING_CACHE_TTL", 24 * 60 * 60))
+ROUTING_CACHE_MAX_ENTRIES = int(os.getenv("ROUTING_CACHE_MAX_ENTRIES", 5000))
+
+
+class RoutingCache:
+    """
+    Cache of the LLM routing decisions made on each turn (adecide_route, adecide_mcp_subroute, aroute_query).
+
+    A decision only depends on the router's prompt, which is built from the query alone, so it is reused
+    whenever the query comes back. Each decision is stored under two keys:
+    - exact: the prompt built from the query as typed
+    - normalised: the prompt built from normalise_query(query), so a repeat that only differs in case,
+      whitespace or surrounding punctuation is a hit too
+    Keys hash the router, model and whole prompt, so a changed prompt or model starts from an empty cache.
+
+    Hits on either key and misses are counted per router, see stats(). Cache failures (e.g. Redis being
+    down) are logged and treated as a miss so they never break routing.
+    """
+
+    def __init__(self, backend, model: str = deployment_name):
+        self.backend = backend
+        self.model = model
+        self.counts: dict[str, dict[str, int]] = {}
+
+    def keys(self, router: str, query: str, build_prompt: Callable[[str], str]) -> tuple[str, str]:
+        """
+        Returns:
+            tuple[str, str]: the exact and normalised keys of a query, equal if the query is already normalised
+        """
+        def key(prompt: str) -> str:
+            return hashlib.sha1(f"{router}\n{self.model}\n{prompt}".encode("utf-8")).hexdigest()
+
+        normalised = normalise_query(query)
+        exact_key = key(build_prompt(query))
+        return exact_key, exact_key if normalised == query else key(build_prompt(normalised))
+
+    async def get(self, router: str, query: str, build_prompt: Callable[[str], str]) -> str | None:
+        """
+        Returns the cached decision of router for query, or None on a miss
+        """
+        counts = self.counts.setdefault(router, {"exact_hits": 0, "normalised_hits": 0, "misses": 0})
+        exact_key, normalised_key = self.keys(router, query, build_prompt)
+        try:
+            entry = await self.backend.get(exact_key)
+            if entry is not None:
+                counts["exact_hits"] += 1
+                return entry["route"]
+            if normalised_key != exact_key:
+                entry = await self.backend.get(normalised_key)
+                if entry is not None:
+                    counts["normalised_hits"] += 1
+                    return entry["route"]
+        except Exception as e:
+            print(f"Routing cache lookup failed: {e!r}")
+        counts["misses"] += 1
+        return None
+
+    async def set(self, router: str, query: str, build_prompt: Callable[[str], str], route: str):
+        """Stores router's decision for query under its exact and normalised keys"""
+        try:
+            for key in set(self.keys(router, query, build_prompt)):
+                await self.backend.set(key, {"route": route})
+        except Exception as e:
+            print(f"Routing cache store failed: {e!r}")
+
+    async def route(self, router: str, query: str, build_prompt: Callable[[str], str], classify: Callable[[], Awaitable[str]]) -> str:
+        """
+        Returns the cached decision of router for query, or awaits classify() and caches what it returns
+
+        Args:
+            router (str): name of the routing step, e.g. "route"
+            query (str): the user's query
+            build_prompt (Callable[[str], str]): the router's prompt builder
+            classify (Callable[[], Awaitable[str]]): makes the LLM call, on a miss
+
+        Returns:
+            str: the route
+        """
+        route = await self.get(router, query, build_prompt)
+        if route is None:
+            route = await classify()
+            await self.set(router, query, build_prompt, route)
+        return route
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: per router, hits on the exact and normalised keys, misses and the hit rate
+        """
+        stats = {}
+        for router, counts in self.counts.items():
+            lookups = sum(counts.values())
+            hits = counts["exact_hits"] + counts["normalised_hits"]
+            stats[router] = {**counts, "hit_rate": hits / lookups if lookups else 0.0}
+        return stats
+
+    def clear(self):
+        """Drops every cached decision"""
+        try:
+            self.backend.clear()
+        except Exception as e:
+            print(f"Routing cache invalidation failed: {e!r}")
+
+
+def make_routing_cache(backend: str = ROUTING_CACHE_BACKEND) -> RoutingCache:
+    """
+    Create the routing cache with the configured backend.
+
+    Args:
+        backend (str): "memory" or "redis"
+    Returns:
+        RoutingCache: cache using the chosen store
+    Raises:
+        ValueError: If an unknown backend is given
+    """
+    if backend == "memory":
+        return RoutingCache(InMemoryCacheBackend(max_entries=ROUTING_CACHE_MAX_ENTRIES, ttl=ROUTING_CACHE_TTL))
+    if backend == "redis":
+        return RoutingCache(RedisCacheBackend(max_entries=ROUTING_CACHE_MAX_ENTRIES, ttl=ROUTING_CACHE_TTL, prefix="routing_cache"))
+    raise ValueError(f"Unknown routing cache backend: {backend}")
+
+
+ROUTING_CACHE = make_routing_cache()
@@ -0,0 +1,101 @@
+import json
+import os
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+load_dotenv()
+
+# "orjson" or "json", both write JSON so either reads messages the other stored
+CHAT_MESSAGE_CODEC = os.getenv("CHAT_MESSAGE_CODEC", "orjson")
+# messages encoded to at least this many bytes are stored zstd compressed, 0 disables compression
+CHAT_COMPRESS_THRESHOLD = int(os.getenv("CHAT_COMPRESS_THRESHOLD", 512))
+CHAT_COMPRESS_LEVEL = int(os.getenv("CHAT_COMPRESS_LEVEL", 3))
+# every zstd frame starts with these bytes, JSON never does, so stored messages describe their own encoding
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class JsonSerializer:
+    """Standard library JSON, used when orjson isn't installed"""
+
+    name = "json"
+
+    @staticmethod
+    def dumps(message: dict) -> bytes:
+        return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data: bytes | str) -> dict:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """orjson, several times faster than the json module at both ends"""
+
+    name = "orjson"
+
+    @staticmethod
+    def dumps(message: dict) -> bytes:
+        return orjson.dumps(message)
+
+    @staticmethod
+    def loads(data: bytes | str) -> dict:
+        return orjson.loads(data)
+
+
+def make_serializer(name: str):
+    """
+    Args:
+        name (str): "orjson" or "json", "orjson" falls back to "json" if orjson isn't installed
+    Returns:
+        JsonSerializer | OrjsonSerializer
+    """
+    if name == "orjson" and orjson is not None:
+        return OrjsonSerializer()
+    if name not in ("orjson", "json"):
+        raise ValueError(f"Unknown chat message codec: {name}")
+    return JsonSerializer()
+
+
+class MessageCodec:
+    """
+    Encodes the messages stored in ``chat:{chat_id}:messages`` lists.
+
+    Messages are JSON, written with the configured serializer. Those at least compress_threshold bytes
+    long (typically answers and retrieved context) are zstd compressed. decode() tells the two apart by
+    the zstd frame header, so lists written as plain JSON before this codec existed are read as they
+    are and a list can mix both encodings. Compression needs the optional zstandard package, without
+    it messages are stored uncompressed.
+
+    Encoded messages are bytes, read them from Redis without decoding (see redis_chat_store).
+    """
+
+    def __init__(self, serializer=None, compress_threshold: int = CHAT_COMPRESS_THRESHOLD, level: int = CHAT_COMPRESS_LEVEL):
+        self.serializer = serializer or make_serializer(CHAT_MESSAGE_CODEC)
+        self.compress_threshold = compress_threshold if zstandard is not None else 0
+        self._compressor = zstandard.ZstdCompressor(level=level) if zstandard is not None else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+    def encode(self, message: dict) -> bytes:
+        data = self.serializer.dumps(message)
+        if self.compress_threshold and len(data) >= self.compress_threshold:
+            return self._compressor.compress(data)
+        return data
+
+    def decode(self, raw: bytes | str) -> dict:
+        if isinstance(raw, bytes) and raw.startswith(ZSTD_MAGIC):
+            if self._decompressor is None:
+                raise RuntimeError("Chat message is zstd compressed but the zstandard package is not installed")
+            raw = self._decompressor.decompress(raw)
+        return self.serializer.loads(raw)
+
+
+MESSAGE_CODEC = MessageCodec()
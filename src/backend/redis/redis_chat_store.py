@@ -1,5 +1,89 @@
-import json
+import hashlib
 from time import time
+from redis.client import NEVER_DECODE
+from redis.exceptions import NoScriptError, WatchError
+from src.backend.redis.message_codec import MESSAGE_CODEC
+
+# sorted set of chat ids scored by creation time, so chats can be listed newest first without scanning keys
+CHATS_BY_CREATED = "chats:by_created"
+# set once chats created before the index existed have been added to it
+CHATS_INDEX_BUILT = "chats:by_created:built"
+DEFAULT_PAGE_SIZE = 50
+# role of the entry start_turn puts before the history when the chat has a summary of its older messages
+SUMMARY_ROLE = "summary"
+
+# KEYS[1] chat hash, KEYS[2] messages list, KEYS[3] summary hash, ARGV[1] user message,
+# ARGV[2] most recent messages to return (0 for all)
+# returns nil if the chat doesn't exist, otherwise the history before the new message and the chat's summary
+START_TURN_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return nil
+end
+local window = tonumber(ARGV[2])
+local history = redis.call("LRANGE", KEYS[2], window > 0 and -window or 0, -1)
+redis.call("RPUSH", KEYS[2], ARGV[1])
+return {history, redis.call("HGET", KEYS[3], "summary")}
+"""
+
+# KEYS[1] chat hash, KEYS[2] summary hash, ARGV[1] messages the stored summary should cover,
+# ARGV[2] messages the new summary covers, ARGV[3] new summary
+# returns 0 without saving if the chat was deleted or its summary was updated in the meantime
+SAVE_SUMMARY_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+if tonumber(redis.call("HGET", KEYS[2], "covered") or 0) ~= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("HSET", KEYS[2], "summary", ARGV[3], "covered", ARGV[2])
+return 1
+"""
+
+# KEYS[1] chat hash, KEYS[2] messages list, ARGV[1] first and ARGV[2] last position to read
+# returns nil if the chat doesn't exist, otherwise the list's length and the messages read
+MESSAGES_PAGE_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return nil
+end
+return {redis.call("LLEN", KEYS[2]), redis.call("LRANGE", KEYS[2], ARGV[1], ARGV[2])}
+"""
+
+# KEYS[1] chat hash, KEYS[2] messages list, ARGV[1] assistant message, ARGV[2] title ("" to keep it)
+# returns 0 if the chat was deleted in the meantime, the title is only ever set once per chat
+FINISH_TURN_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+redis.call("RPUSH", KEYS[2], ARGV[1])
+if ARGV[2] ~= "" and redis.call("HSETNX", KEYS[1], "titled", 1) == 1 then
+    redis.call("HSET", KEYS[1], "title", ARGV[2])
+end
+return 1
+"""
+
+async def run_script(rdb, script: str, keys: list, args: list, raw: bool = False):
+    """
+    Run a Lua script with ``EVALSHA``, loading it into Redis first if it isn't cached there.
+
+    Args:
+        rdb: Async Redis client supporting ``execute_command`` and ``script_load``.
+        script (str): Lua source.
+        keys (list): ``KEYS`` of the script.
+        args (list): ``ARGV`` of the script.
+        raw (bool): Return string replies as bytes even if the client decodes responses,
+            needed for replies containing encoded messages.
+    """
+    sha = hashlib.sha1(script.encode()).hexdigest()
+    options = {NEVER_DECODE: True} if raw else {}
+    try:
+        return await rdb.execute_command("EVALSHA", sha, len(keys), *keys, *args, **options)
+    except NoScriptError:
+        await rdb.script_load(script)
+        return await rdb.execute_command("EVALSHA", sha, len(keys), *keys, *args, **options)
+
+async def read_messages(rdb, chat_id: str, start: int, end: int) -> list[bytes]:
+    """``LRANGE`` of a chat's messages list, as stored (bytes)"""
+    return await rdb.execute_command("LRANGE", f"chat:{chat_id}:messages", start, end, **{NEVER_DECODE: True})
 
 async def create_chat(rdb, chat_id: str, title: str = "New Chat"):
     """
@@ -9,24 +93,29 @@ async def create_chat(rdb, chat_id: str, title: str = "New Chat"):
     - Generates a Unix timestamp for when the chat was created
     - Stores the chat's id, title and created_at in a Redis hash
     - Uses the key pattern ``chat:{chat_id}`` for the metadata
+    - Adds the chat to the ``chats:by_created`` index in the same transaction
 
     Args:
         rdb:
-            Async Redis client/connection supporting ``hset``.
+            Async Redis client/connection supporting ``pipeline``.
         chat_id (str):
             Unique identifier for the chat session.
         title (str, optional):
             Human-friendly chat title shown in the UI. Defaults to "New Chat".
     """
-    created_at = int(time())
-    await rdb.hset(
-        f"chat:{chat_id}",
-        mapping={
-            "id": chat_id,
-            "title": title,
-            "created_at": created_at,
-        }
-    )
+    now = time()
+    async with rdb.pipeline(transaction=True) as pipe:
+        pipe.hset(
+            f"chat:{chat_id}",
+            mapping={
+                "id": chat_id,
+                "title": title,
+                "created_at": int(now),
+            }
+        )
+        # the fractional timestamp keeps chats created in the same second in order
+        pipe.zadd(CHATS_BY_CREATED, {chat_id: now})
+        await pipe.execute()
 
 async def chat_exists(rdb, chat_id: str) -> bool:
     """Check whether a chat with the given id exists.
@@ -74,54 +163,152 @@ async def get_chat_metadata(rdb, chat_id: str) -> dict | None:
         "created_at": int(data.get("created_at", 0)),
     }
 
-async def list_chats(rdb) -> list[dict]:
+def chat_cursor(score: float, chat_id: str) -> str:
+    """Cursor of a chat in ``chats:by_created``, list_chats continues after it when it is passed as ``before``"""
+    return f"{score!r}:{chat_id}"
+
+def parse_chat_cursor(cursor: str) -> tuple[float, str]:
+    """
+    Inverse of chat_cursor
+
+    Raises:
+        ValueError: if the cursor isn't "{score}:{chat id}"
     """
-    Retrieve all chat sessions.
+    score, sep, chat_id = cursor.partition(":")
+    if not sep or not chat_id:
+        raise ValueError(f"Invalid chat cursor: {cursor!r}")
+    return float(score), chat_id
+
+async def list_chats(rdb, limit: int | None = DEFAULT_PAGE_SIZE, before: str | None = None) -> list[dict]:
+    """
+    Retrieve one page of chat sessions, newest first.
 
     This function:
-    - Scans Redis for keys matching ``chat:*``
-    - ignores message lists with the ``:messages`` suffix
-    - loads metadata for each chat hash
-    - normalizes and sorts chats so the newest appear first
+    - Reads chat ids from the ``chats:by_created`` sorted set with ``ZREVRANGEBYSCORE ... LIMIT``,
+      starting after the ``before`` cursor
+    - Loads the metadata of the page's chats in one pipelined round-trip
+    - Builds the index from the existing chats the first time it is used
+
+    The cursor holds the score and id of the previous page's last chat rather than its rank, so the
+    next page is still right if that chat has been deleted or chats have been added since. Chats with
+    the same score are ordered by id, as Redis orders them.
+
+    The cost depends on the page size, not on the number of chats stored.
 
     Args:
         rdb:
-            redis client supporting ``keys`` and ``hgetall``.
+            redis client supporting ``pipeline`` and ``zrevrangebyscore``.
+        limit (int | None):
+            Maximum number of chats to return, ``None`` for every chat.
+        before (str | None):
+            Cursor, the ``cursor`` of the last chat of the previous page. ``None`` for the first page.
 
     Returns:
         list[dict]:
-            List of chat metadata dictionaries with keys ``id``, ``title`` and
-            ``created_at``, ordered by ``created_at`` descending.
-    """
-    keys = await rdb.keys("chat:*")
-    chats = []
+            List of chat metadata dictionaries with keys ``id``, ``title``, ``created_at`` and
+            ``cursor``, ordered by ``created_at`` descending.
 
-    for key in keys:
-        key_str = key.decode() if isinstance(key, bytes) else key
-        # ignore messages lists, because we store:
-        # chat:ID and chat:ID:messages
-        if key_str.endswith(":messages"):
-            continue
+    Raises:
+        ValueError: if ``before`` is not a valid cursor
+    """
+    if before is None:
+        max_score, after_id = "+inf", None
+    else:
+        max_score, after_id = parse_chat_cursor(before)
+
+    page = {} if limit is None else {"start": 0, "num": limit}
+
+    def read_page(pipe):
+        if after_id is None:
+            pipe.zrevrangebyscore(CHATS_BY_CREATED, max_score, "-inf", withscores=True, **page)
+        else:
+            # chats with the cursor's score that sort before its id, then the page of lower scores
+            pipe.zrevrangebyscore(CHATS_BY_CREATED, max_score, max_score, withscores=True)
+            pipe.zrevrangebyscore(CHATS_BY_CREATED, f"({max_score!r}", "-inf", withscores=True, **page)
+
+    async with rdb.pipeline(transaction=False) as pipe:
+        pipe.exists(CHATS_INDEX_BUILT)
+        read_page(pipe)
+        index_built, *pages = await pipe.execute()
+    if not index_built:
+        await rebuild_chat_index(rdb)
+        async with rdb.pipeline(transaction=False) as pipe:
+            read_page(pipe)
+            pages = await pipe.execute()
+
+    if after_id is None:
+        entries = pages[0]
+    else:
+        ties, older = pages
+        entries = [(chat_id, score) for chat_id, score in ties if chat_id < after_id] + older
+    entries = entries[:limit]
+    if not entries:
+        return []
+
+    async with rdb.pipeline(transaction=False) as pipe:
+        for chat_id, _ in entries:
+            pipe.hgetall(f"chat:{chat_id}")
+        rows = await pipe.execute()
 
-        data = await rdb.hgetall(key_str)
+    chats = []
+    for (chat_id, score), data in zip(entries, rows):
         if data:
             chats.append({
                 "id": data.get("id"),
                 "title": data.get("title"),
                 "created_at": int(data.get("created_at", 0)),
+                "cursor": chat_cursor(score, chat_id),
             })
-
-    # sort so newest chats appear first
-    chats.sort(key=lambda c: c["created_at"], reverse=True)
     return chats
 
+async def rebuild_chat_index(rdb, batch_size: int = 500):
+    """
+    Add every stored chat to the ``chats:by_created`` index.
+
+    Chats created before the index existed are only stored as ``chat:{chat_id}`` hashes. This
+    walks them with ``SCAN`` (which, unlike ``KEYS``, doesn't block Redis) and adds them
+    to the index with their ``created_at``. Chats already indexed keep their score, so
+    running it again is harmless.
+
+    Args:
+        rdb:
+            redis client supporting ``scan_iter`` and ``pipeline``.
+        batch_size (int):
+            Keys requested per ``SCAN`` call and chats added per round-trip.
+    """
+    async def add(keys: list[str]):
+        async with rdb.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hget(key, "created_at")
+            created = await pipe.execute()
+        scores = {
+            key.split(":", 1)[1]: int(created_at)
+            for key, created_at in zip(keys, created)
+            if created_at is not None
+        }
+        if scores:
+            await rdb.zadd(CHATS_BY_CREATED, scores, nx=True)
+
+    batch = []
+    async for key in rdb.scan_iter(match="chat:*", count=batch_size, _type="hash"):
+        key_str = key.decode() if isinstance(key, bytes) else key
+        # only chat:ID holds metadata, other chat:ID:... keys belong to a chat
+        if key_str.count(":") != 1:
+            continue
+        batch.append(key_str)
+        if len(batch) >= batch_size:
+            await add(batch)
+            batch = []
+    if batch:
+        await add(batch)
+    await rdb.set(CHATS_INDEX_BUILT, 1)
+
 async def get_messages(rdb, chat_id: str) -> list[dict]:
     """Retrieve all messages for a given chat.
 
     This function:
     - Reads the Redis list at ``chat:{chat_id}:messages``
-    - Decodes any byte strings to text
-    - Parses each list element from JSON into a Python dict
+    - Decodes each list element with ``MESSAGE_CODEC`` into a Python dict
 
     The stored JSON objects typically look like:
 
@@ -131,7 +318,7 @@ async def get_messages(rdb, chat_id: str) -> list[dict]:
 
     Args:
         rdb:
-            redis client/connection supporting ``lrange``.
+            redis client/connection supporting ``execute_command``.
         chat_id (str):
             Chat identifier whose message history should be returned.
 
@@ -139,26 +326,138 @@ async def get_messages(rdb, chat_id: str) -> list[dict]:
         list[dict]:
             Ordered list of message objects for the chat.
     """
-    raw_messages = await rdb.lrange(f"chat:{chat_id}:messages", 0, -1)
-    messages = []
+    raw_messages = await read_messages(rdb, chat_id, 0, -1)
+    return decode_messages(raw_messages)
+
+async def get_recent_messages(rdb, chat_id: str, count: int) -> list[dict]:
+    """Retrieve the last ``count`` messages of a chat.
+
+    Reads ``LRANGE -count -1`` so only the requested messages are sent and decoded,
+    however long the conversation is.
+
+    Args:
+        rdb:
+            redis client/connection supporting ``execute_command``.
+        chat_id (str):
+            Chat identifier whose recent messages should be returned.
+        count (int):
+            Maximum number of messages to return.
+
+    Returns:
+        list[dict]:
+            Ordered list of the most recent message objects, oldest first.
+    """
+    if count <= 0:
+        return []
+    raw_messages = await read_messages(rdb, chat_id, -count, -1)
+    return decode_messages(raw_messages)
 
-    for msg in raw_messages:
-        if isinstance(msg, bytes):
-            msg = msg.decode()
-        # convert json to objects e.g: 
-        # [
-        #    {"role": "user", "content": "Hello"},
-        #    {"role": "assistant", "content": "Hi!"}
-        # ]#
-        messages.append(json.loads(msg))
+async def get_messages_page(rdb, chat_id: str, before: int | None = None, limit: int = DEFAULT_PAGE_SIZE) -> list[dict] | None:
+    """Retrieve one page of a chat's messages, for scrolling back through long chats.
 
+    This function:
+    - Returns up to ``limit`` messages stored before position ``before``, or the
+      latest messages if ``before`` is ``None``
+    - Adds each message's position in the chat as ``index``, the ``index`` of the
+      first message is the ``before`` cursor of the previous page
+    - Checks the chat exists and reads the page in one round-trip
+
+    Args:
+        rdb:
+            redis client/connection supporting ``execute_command``.
+        chat_id (str):
+            Chat identifier whose messages should be returned.
+        before (int | None):
+            Position of the message the page ends before, ``None`` for the latest page.
+        limit (int):
+            Maximum number of messages to return.
+
+    Returns:
+        list[dict] | None:
+            - list[dict]: messages oldest first, each with ``role``, ``content`` and ``index``
+            - None: if the chat does not exist
+    """
+    if before == 0:
+        # nothing is older than the first message, and LRANGE 0 -1 would read the whole list
+        return [] if await chat_exists(rdb, chat_id) else None
+
+    if before is None:
+        start, end = -limit, -1
+    else:
+        start, end = max(before - limit, 0), before - 1
+
+    page = await run_script(rdb, MESSAGES_PAGE_SCRIPT, [f"chat:{chat_id}", f"chat:{chat_id}:messages"], [start, end], raw=True)
+    if page is None:
+        return None
+    length, raw_messages = page
+
+    messages = decode_messages(raw_messages)
+    first_index = length - len(messages) if before is None else start
+    for offset, message in enumerate(messages):
+        message["index"] = first_index + offset
     return messages
 
+def decode_messages(raw_messages: list) -> list[dict]:
+    """Parse messages as stored in a ``chat:{chat_id}:messages`` list"""
+    # messages are JSON objects, zstd compressed when large e.g:
+    # [
+    #    {"role": "user", "content": "Hello"},
+    #    {"role": "assistant", "content": "Hi!"}
+    # ]#
+    return [MESSAGE_CODEC.decode(msg) for msg in raw_messages]
+
+async def migrate_messages(rdb, chat_id: str) -> int:
+    """Re-encode a chat's stored messages with the current ``MESSAGE_CODEC``.
+
+    Reads handle every encoding, so this is never required. It compresses the
+    large messages of lists written as plain JSON, freeing Redis memory. The
+    list is rewritten in a ``WATCH``/``MULTI`` transaction, retried if a
+    message is appended meanwhile.
+
+    Args:
+        rdb:
+            Async Redis client/connection supporting ``pipeline``.
+        chat_id (str):
+            Identifier of the chat to migrate.
+
+    Returns:
+        int: number of messages whose stored encoding changed.
+    """
+    key = f"chat:{chat_id}:messages"
+    async with rdb.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(key)
+                raw_messages = await pipe.execute_command("LRANGE", key, 0, -1, **{NEVER_DECODE: True})
+                encoded = [MESSAGE_CODEC.encode(MESSAGE_CODEC.decode(raw)) for raw in raw_messages]
+                changed = sum(new != old for new, old in zip(encoded, raw_messages))
+                if not changed:
+                    await pipe.unwatch()
+                    return 0
+                pipe.multi()
+                pipe.delete(key)
+                pipe.rpush(key, *encoded)
+                await pipe.execute()
+                return changed
+            except WatchError:
+                continue
+
+async def migrate_all_messages(rdb) -> int:
+    """Run ``migrate_messages`` for every chat in the ``chats:by_created`` index
+
+    Returns:
+        int: number of messages whose stored encoding changed.
+    """
+    changed = 0
+    async for chat_id, _ in rdb.zscan_iter(CHATS_BY_CREATED):
+        changed += await migrate_messages(rdb, chat_id)
+    return changed
+
 async def append_message(rdb, chat_id: str, role: str, content: str):
     """Append a new message to a chat's history.
 
     This function:
-    - Serializes the message (role + content) as JSON
+    - Encodes the message (role + content) with ``MESSAGE_CODEC``
     - Appends it to the Redis list ``chat:{chat_id}:messages``
 
     Args:
@@ -171,9 +470,128 @@ async def append_message(rdb, chat_id: str, role: str, content: str):
         content (str):
             Raw message text content.
     """
-    message = json.dumps({"role": role, "content": content})
+    message = MESSAGE_CODEC.encode({"role": role, "content": content})
     await rdb.rpush(f"chat:{chat_id}:messages", message)
 
+async def start_turn(rdb, chat_id: str, content: str, window: int | None = None) -> list[dict] | None:
+    """Load a chat's history and append the user's new message in one atomic step.
+
+    This function:
+    - Runs a Lua script, so the existence check, the read and the append are
+      one round-trip and no other turn can interleave with them
+    - Only reads the last ``window`` messages, so the cost of a turn doesn't
+      grow with the length of the conversation
+    - Puts the chat's summary of its older messages (see ``save_summary``) first,
+      as a ``{"role": SUMMARY_ROLE, "content": summary}`` entry, if it has one
+    - Returns ``None`` without storing anything if the chat doesn't exist
+
+    Args:
+        rdb:
+            Async Redis client/connection supporting ``execute_command``.
+        chat_id (str):
+            Identifier of the chat the user is sending to.
+        content (str):
+            The user's message.
+        window (int | None):
+            Number of most recent messages to return, ``None`` for the whole history.
+
+    Returns:
+        list[dict] | None:
+            - list[dict]: the summary entry if any, then (the last ``window``) messages
+              stored before the user's message
+            - None: if the chat does not exist
+    """
+    message = MESSAGE_CODEC.encode({"role": "user", "content": content})
+    turn = await run_script(
+        rdb,
+        START_TURN_SCRIPT,
+        [f"chat:{chat_id}", f"chat:{chat_id}:messages", f"chat:{chat_id}:summary"],
+        [message, window or 0],
+        raw=True,
+    )
+    if turn is None:
+        return None
+    raw_messages, summary = turn
+    history = decode_messages(raw_messages)
+    if summary:
+        history.insert(0, {"role": SUMMARY_ROLE, "content": summary.decode("utf-8")})
+    return history
+
+async def finish_turn(rdb, chat_id: str, content: str, title: str | None = None) -> bool:
+    """Append the assistant's answer and name the chat in one atomic step.
+
+    This function:
+    - Appends the assistant message to ``chat:{chat_id}:messages``
+    - Sets ``title`` if given and the chat hasn't been named yet, so of two
+      concurrent first turns only one names the chat
+    - Stores nothing if the chat was deleted while the answer was generated
+
+    Args:
+        rdb:
+            Async Redis client/connection supporting ``execute_command``.
+        chat_id (str):
+            Identifier of the chat.
+        content (str):
+            The assistant's answer.
+        title (str | None):
+            Title for the chat, pass it on the chat's first turn.
+
+    Returns:
+        bool: ``False`` if the chat no longer exists, ``True`` otherwise.
+    """
+    message = MESSAGE_CODEC.encode({"role": "assistant", "content": content})
+    stored = await run_script(rdb, FINISH_TURN_SCRIPT, [f"chat:{chat_id}", f"chat:{chat_id}:messages"], [message, title or ""])
+    return stored == 1
+
+async def get_summary(rdb, chat_id: str) -> tuple[str | None, int, int]:
+    """Read a chat's rolling summary and how far it has got.
+
+    The summary hash ``chat:{chat_id}:summary`` holds the ``summary`` text and
+    ``covered``, the number of messages (from the first one) it summarises.
+
+    Args:
+        rdb:
+            Async Redis client/connection supporting ``pipeline``.
+        chat_id (str):
+            Identifier of the chat.
+
+    Returns:
+        tuple[str | None, int, int]: the summary (``None`` if there isn't one yet),
+        the number of messages it covers and the number of messages in the chat.
+    """
+    async with rdb.pipeline(transaction=False) as pipe:
+        pipe.hmget(f"chat:{chat_id}:summary", "summary", "covered")
+        pipe.llen(f"chat:{chat_id}:messages")
+        (summary, covered), length = await pipe.execute()
+    return summary, int(covered or 0), length
+
+async def save_summary(rdb, chat_id: str, summary: str, covered: int, new_covered: int) -> bool:
+    """Store a chat's updated summary, unless someone else updated it first.
+
+    The summary is only replaced if it still covers ``covered`` messages, so two
+    workers summarising the same chat can't fold the same messages in twice,
+    and nothing is stored for a deleted chat.
+
+    Args:
+        rdb:
+            Async Redis client/connection supporting ``execute_command``.
+        chat_id (str):
+            Identifier of the chat.
+        summary (str):
+            The new summary text.
+        covered (int):
+            Messages covered by the summary the new one was built from.
+        new_covered (int):
+            Messages covered by the new summary.
+
+    Returns:
+        bool: ``True`` if the summary was stored.
+    """
+    stored = await run_script(
+        rdb, SAVE_SUMMARY_SCRIPT, [f"chat:{chat_id}", f"chat:{chat_id}:summary"], [covered, new_covered, summary]
+    )
+    return stored == 1
+
 async def update_chat_title(rdb, chat_id: str, title: str):
     """Update the title of an existing chat.
 
@@ -195,12 +613,16 @@ async def delete_chat(rdb, chat_id: str):
 
     This function:
     - Deletes the chat metadata hash ``chat:{chat_id}``
-    - Deletes the associated messages list ``chat:{chat_id}:messages``
+    - Deletes the associated messages list ``chat:{chat_id}:messages`` and summary ``chat:{chat_id}:summary``
+    - Removes the chat from the ``chats:by_created`` index in the same transaction
 
     Args:
         rdb:
-            Async Redis client/connection supporting ``delete``.
+            Async Redis client/connection supporting ``pipeline``.
         chat_id (str):
             Identifier of the chat to remove.
     """
-    await rdb.delete(f"chat:{chat_id}", f"chat:{chat_id}:messages")
\ No newline at end of file
+    async with rdb.pipeline(transaction=True) as pipe:
+        pipe.delete(f"chat:{chat_id}", f"chat:{chat_id}:messages", f"chat:{chat_id}:summary")
+        pipe.zrem(CHATS_BY_CREATED, chat_id)
+        await pipe.execute()
@@ -1,11 +1,125 @@
+import os
+import time
 import redis.asyncio as redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0") # host is the service name in docker-compose
+# connections shared by every request on a worker, requests wait up to REDIS_POOL_TIMEOUT for a free one
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5.0))
+# idle connections are pinged before reuse once they've been idle this many seconds
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 5.0))
+REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", 5.0))
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    BlockingConnectionPool that counts how often requests had to wait for a connection.
+
+    When every connection is in use a request waits for one to be released (up to timeout) instead
+    of failing, stats() shows how close the pool is to that point and how much waiting it caused.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.waits = 0
+        self.wait_timeouts = 0
+        self.wait_seconds = 0.0
+        self.peak_in_use = 0
+
+    async def get_connection(self, *args, **kwargs):
+        if self.can_get_connection():
+            connection = await super().get_connection(*args, **kwargs)
+        else:
+            self.waiting += 1
+            self.waits += 1
+            started = time.monotonic()
+            try:
+                connection = await super().get_connection(*args, **kwargs)
+            except redis.ConnectionError:
+                self.wait_timeouts += 1
+                raise
+            finally:
+                self.waiting -= 1
+                self.wait_seconds += time.monotonic() - started
+        self.peak_in_use = max(self.peak_in_use, len(self._in_use_connections))
+        return connection
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: current and peak connections in use, saturation (in use / max connections) and
+            the number, total duration and timeouts of waits for a free connection
+        """
+        in_use = len(self._in_use_connections)
+        return {
+            "max_connections": self.max_connections,
+            "in_use": in_use,
+            "idle": len(self._available_connections),
+            "saturation": in_use / self.max_connections,
+            "peak_in_use": self.peak_in_use,
+            "waiting": self.waiting,
+            "waits": self.waits,
+            "wait_timeouts": self.wait_timeouts,
+            "wait_seconds": round(self.wait_seconds, 6),
+        }
+
+
+class RedisPool:
+    """
+    One Redis connection pool and client shared by every request on a worker.
+
+    The API's lifespan opens it on startup and closes it on shutdown. Accessing the client before
+    open() (e.g. from a script or test) opens it on first use.
+    """
+
+    def __init__(self):
+        self.pool: InstrumentedConnectionPool | None = None
+        self._client: redis.Redis | None = None
+
+    def open(self):
+        """Create the pool, connections are made as requests need them"""
+        if self.pool is not None:
+            return
+        self.pool = InstrumentedConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_CONNECT_TIMEOUT,
+            decode_responses=True, # redis returns str instead of bytes
+        )
+        self._client = redis.Redis(connection_pool=self.pool)
+
+    async def close(self):
+        """Close the client and every pooled connection"""
+        if self.pool is None:
+            return
+        await self._client.aclose()
+        await self.pool.disconnect()
+        self.pool = self._client = None
+
+    @property
+    def client(self) -> redis.Redis:
+        self.open()
+        return self._client
+
+    def stats(self) -> dict:
+        """Pool saturation metrics, see InstrumentedConnectionPool.stats"""
+        self.open()
+        return self.pool.stats()
+
+
+REDIS_POOL = RedisPool()
+
 
 def get_redis():
     """
-    Creates a Redis client conntection
+    Returns the worker's shared Redis client, its connections come from REDIS_POOL
     """
-    return redis.Redis(
-        host="redis", # changed to service name in docker-compose
-        port=6379,
-        decode_responses=True, # redis returns str instead of bytes
-    )
\ No newline at end of file
+    return REDIS_POOL.client
@@ -0,0 +1,71 @@
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeContainerClient:
+    """
+    Local stand-in for an Azure ContainerClient holding {name: text} blobs.
+
+    The etag of a blob changes whenever its text does. Records the blobs downloaded, their download_blob
+    kwargs and the peak number of concurrent downloads.
+    """
+
+    def __init__(
+            self,
+            blobs: dict[str, str],
+            delay: float = 0.0,
+            delays: dict[str, float] | None = None,
+            reverse_listing: bool = False):
+        self.blobs = dict(blobs)
+        self.delay = delay
+        self.delays = delays or {}
+        self.reverse_listing = reverse_listing
+        self.downloaded = []
+        self.download_kwargs = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def list_blobs(self):
+        for name in sorted(self.blobs, reverse=self.reverse_listing):
+            yield SimpleNamespace(
+                name=name,
+                size=len(self.blobs[name].encode("utf-8")),
+                etag=f'"{hash(self.blobs[name])}"',
+                last_modified=datetime(2026, 1, 1, tzinfo=timezone.utc),
+            )
+
+    def get_blob_client(self, blob):
+        container = self
+        name = blob.name
+
+        class BlobClient:
+            def download_blob(self, **kwargs):
+                with container.lock:
+                    container.downloaded.append(name)
+                    container.download_kwargs[name] = kwargs
+                    container.active += 1
+                    container.max_active = max(container.max_active, container.active)
+                time.sleep(container.delays.get(name, container.delay))
+                with container.lock:
+                    container.active -= 1
+                data = container.blobs[name].encode("utf-8")
+                return SimpleNamespace(readall=lambda: data)
+
+        return BlobClient()
+
+
+# ==================== FIXTURES ====================
+
+
+@pytest.fixture
+def fake_container_client():
+    """
+    Factory for FakeContainerClient, called with the {name: text} blobs and optionally a download delay
+    (delay, or per blob delays) and reverse_listing to list the blobs out of name order.
+    """
+    return FakeContainerClient
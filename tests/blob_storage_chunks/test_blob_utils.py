@@ -67,15 +67,15 @@ def mock_container_client(mock_txt_blob, mock_non_txt_blob, mock_blob_text):
 class TestContextualChunking:
 	"""Unit tests for contextual_chunking function."""
 
-	@patch("src.rag_chatbot.rag.blob_utils.LLMChunker")
+	@patch("src.backend.rag.blob_utils.LLMChunker")
 	def test_prepends_llm_context_to_each_chunk(self, mock_llm_chunker_cls, sample_text, sample_chunks):
 		"""Each chunk should be prefixed with LLM-generated context."""
 		mock_llm_chunker = Mock()
 
-		def side_effect(document, chunk):
-			return f"context-for-{chunk}"
+		def side_effect(document, chunks):
+			return [f"context-for-{chunk}" for chunk in chunks]
 
-		mock_llm_chunker.return_response.side_effect = side_effect
+		mock_llm_chunker.return_responses.side_effect = side_effect
 		mock_llm_chunker_cls.return_value = mock_llm_chunker
 
 		result = contextual_chunking(sample_text, sample_chunks)
@@ -84,20 +84,17 @@ class TestContextualChunking:
 		assert result[0] == "context-for-chunk one chunk one"
 		assert result[1] == "context-for-chunk two chunk two"
 
-	@patch("src.rag_chatbot.rag.blob_utils.LLMChunker")
-	def test_calls_llm_chunker_with_full_document_and_each_chunk(self, mock_llm_chunker_cls, sample_text, sample_chunks):
-		"""LLMChunker.return_response should receive the full text and each chunk once."""
+	@patch("src.backend.rag.blob_utils.LLMChunker")
+	def test_calls_llm_chunker_once_with_full_document_and_all_chunks(self, mock_llm_chunker_cls, sample_text, sample_chunks):
+		"""LLMChunker.return_responses should receive the full text and every chunk in one call."""
 		mock_llm_chunker = Mock()
-		mock_llm_chunker.return_response.return_value = "ctx"
+		mock_llm_chunker.return_responses.return_value = ["ctx", "ctx"]
 		mock_llm_chunker_cls.return_value = mock_llm_chunker
 
 		contextual_chunking(sample_text, sample_chunks)
 
-		# One call per chunk
-		assert mock_llm_chunker.return_response.call_count == len(sample_chunks)
-		for call in mock_llm_chunker.return_response.call_args_list:
-			assert call.kwargs["document"] == sample_text
-			assert "chunk" in call.kwargs
+		mock_llm_chunker.return_responses.assert_called_once_with(document=sample_text, chunks=sample_chunks)
+		mock_llm_chunker.return_response.assert_not_called()
 
 
 # ==================== TEST CHUNK_EPICS ====================
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+from unittest.mock import patch
+
+from src.backend.rag.blob_utils import chunk_from_blob, download_blobs, download_blob_text
+
+
+class TestDownloadBlobs:
+    """Unit tests for the parallel blob downloads used by chunk_from_blob."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def container(self, fake_container_client):
+        """Container with ten small transcripts."""
+        # listed out of name order, chunk_from_blob sorts by name
+        return fake_container_client(
+            {f"t{i:02}.txt": f"transcript {i}" for i in range(10)}, delay=0.05, reverse_listing=True
+        )
+
+    # ============== TESTS ==============
+
+    def test_downloads_overlap(self, container):
+        """Blobs should be downloaded concurrently, up to the concurrency limit."""
+        blobs = sorted(container.list_blobs(), key=lambda b: b.name)
+
+        start = time.perf_counter()
+        texts = [text for _, text in download_blobs(container, blobs, concurrency=5)]
+        elapsed = time.perf_counter() - start
+
+        assert texts == [f"transcript {i}" for i in range(10)]
+        assert container.max_active == 5
+        assert elapsed < 0.4
+
+    def test_results_keep_input_order(self, fake_container_client):
+        """A slow first blob should not change the order results are yielded in."""
+        container = fake_container_client(
+            {"a.txt": "first", "b.txt": "second", "c.txt": "third"},
+            delays={"a.txt": 0.2, "b.txt": 0.0, "c.txt": 0.0},
+        )
+        blobs = sorted(container.list_blobs(), key=lambda b: b.name)
+
+        result = [(blob.name, text) for blob, text in download_blobs(container, blobs, concurrency=3)]
+
+        assert result == [("a.txt", "first"), ("b.txt", "second"), ("c.txt", "third")]
+
+    def test_concurrency_of_one_downloads_sequentially(self, container):
+        """concurrency=1 should never have more than one download running."""
+        blobs = list(container.list_blobs())
+
+        list(download_blobs(container, blobs, concurrency=1))
+
+        assert container.max_active == 1
+
+    @patch("src.backend.rag.blob_utils.LARGE_BLOB_BYTES", 10)
+    @patch("src.backend.rag.blob_utils.RANGE_CONCURRENCY", 3)
+    def test_large_blobs_use_ranged_download(self, fake_container_client):
+        """Only blobs above LARGE_BLOB_BYTES should be downloaded with parallel ranges."""
+        container = fake_container_client({"small.txt": "tiny", "large.txt": "x" * 100})
+        blobs = {b.name: b for b in container.list_blobs()}
+
+        download_blob_text(container, blobs["small.txt"])
+        download_blob_text(container, blobs["large.txt"])
+
+        assert container.download_kwargs["small.txt"] == {}
+        assert container.download_kwargs["large.txt"] == {"max_concurrency": 3}
+
+    def test_chunk_from_blob_output_is_sorted_by_name(self, container):
+        """chunk_from_blob should still return chunks in blob name order."""
+        chunks = chunk_from_blob(container, doc_type="transcript", download_concurrency=4)
+
+        assert [c["source"] for c in chunks] == [f"t{i:02}.txt" for i in range(10)]
+        assert container.max_active > 1
+
+    def test_chunk_from_blob_chunks_each_document_as_it_is_downloaded(self, container):
+        """Documents should be chunked as they arrive, not after the whole container is downloaded."""
+        downloaded_when_split = []
+
+        class RecordingSplitter:
+            def split_text(self, text):
+                downloaded_when_split.append(len(container.download_kwargs))
+                return [text]
+
+        with patch("src.backend.rag.blob_utils.make_text_splitter", return_value=RecordingSplitter()):
+            chunks = chunk_from_blob(container, doc_type="transcript", download_concurrency=1)
+
+        assert downloaded_when_split == list(range(1, 11))
+        assert [c["content"] for c in chunks] == [f"transcript {i}" for i in range(10)]
+
+    @patch("src.backend.rag.blob_utils.CONTEXT_CONCURRENCY", 2)
+    def test_context_chunking_keeps_document_order(self, container):
+        """Contextualising documents in parallel should still return chunks in blob name order."""
+        with patch("src.backend.rag.blob_utils.contextual_chunking",
+                   side_effect=lambda text, chunks: [f"ctx {c}" for c in chunks]):
+            chunks = chunk_from_blob(container, doc_type="transcript", context_chunking=True,
+                                     download_concurrency=4)
+
+        assert [c["content"] for c in chunks] == [f"ctx transcript {i}" for i in range(10)]
@@ -0,0 +1,159 @@
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.backend.rag.ingestion_manifest import IngestionManifest
+from src.backend.rag.ingestion_pipeline import run_ingestion_pipeline
+
+
+class TestIncrementalIngestion:
+    """Unit tests for the ingestion manifest and incremental pipeline runs."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def manifest(self, tmp_path):
+        """Empty manifest stored in a temporary directory."""
+        return IngestionManifest(str(tmp_path / "manifest.json"))
+
+    @pytest.fixture
+    def search_client(self):
+        """Search client that records uploads and deletes."""
+        client = MagicMock()
+        client._index_name = "transcripts"
+        client.upload_documents.side_effect = lambda documents: [
+            SimpleNamespace(key=d["id"], succeeded=True, error_message=None) for d in documents
+        ]
+        return client
+
+    @pytest.fixture(autouse=True)
+    def patched_backends(self, search_client):
+        """Build one document per chunk with the chunk text as its id."""
+        def fake_build(chunks, doc_type):
+            return [{"id": c["content"], "content": c["content"]} for c in chunks]
+
+        with patch("src.backend.rag.ingestion_pipeline.build_index_documents", side_effect=fake_build), \
+                patch("src.backend.rag.ingestion_pipeline.get_search_client_for_doc_type", return_value=search_client), \
+                patch("src.backend.rag.ingestion_pipeline.ensure_index_exists"), \
+                patch("src.backend.rag.ingestion_pipeline.invalidate_retrieval_cache"):
+            yield
+
+    @staticmethod
+    def deleted_ids(search_client) -> set[str]:
+        return {d["id"] for call in search_client.delete_documents.call_args_list for d in call.kwargs["documents"]}
+
+    # ============== TESTS ==============
+
+    def test_unchanged_blobs_are_skipped(self, manifest, search_client, fake_container_client):
+        """A second run over the same container should download nothing."""
+        container = fake_container_client({"a.txt": "alpha", "b.txt": "bravo"})
+
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+        container.downloaded.clear()
+        search_client.upload_documents.reset_mock()
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert container.downloaded == []
+        search_client.upload_documents.assert_not_called()
+
+    def test_manifest_is_persisted(self, manifest, tmp_path, fake_container_client):
+        """A new manifest loaded from the same file should know about the ingested blobs."""
+        container = fake_container_client({"a.txt": "alpha"})
+
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+        reloaded = IngestionManifest(str(tmp_path / "manifest.json"))
+        entry = reloaded.entries["transcript/a.txt"]
+
+        assert entry["chunk_ids"] == ["alpha"]
+        assert entry["last_modified"] == "2026-01-01T00:00:00+00:00"
+        assert reloaded.blob_names("transcript") == {"a.txt"}
+
+    def test_changed_blob_is_reprocessed_and_stale_chunks_deleted(self, manifest, search_client, fake_container_client):
+        """Only the changed blob is downloaded again, chunks it no longer has are deleted."""
+        container = fake_container_client({"a.txt": "alpha", "b.txt": "bravo"})
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        container.blobs["b.txt"] = "bravo two"
+        container.downloaded.clear()
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert container.downloaded == ["b.txt"]
+        assert self.deleted_ids(search_client) == {"bravo"}
+        assert manifest.entries["transcript/b.txt"]["chunk_ids"] == ["bravo two"]
+
+    def test_deleted_blob_chunks_are_removed(self, manifest, search_client, fake_container_client):
+        """Chunks of a blob that is no longer in the container should be deleted from the index."""
+        container = fake_container_client({"a.txt": "alpha", "b.txt": "bravo"})
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        del container.blobs["a.txt"]
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert self.deleted_ids(search_client) == {"alpha"}
+        assert manifest.blob_names("transcript") == {"b.txt"}
+
+    def test_changed_options_reprocess_everything(self, manifest, fake_container_client):
+        """Different chunking options produce different chunk ids so every blob is processed again."""
+        container = fake_container_client({"a.txt": "alpha"})
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        container.downloaded.clear()
+        run_ingestion_pipeline(container, doc_type="transcript", chunk_size=100, manifest=manifest)
+
+        assert container.downloaded == ["a.txt"]
+
+    def test_failed_upload_is_retried_next_run(self, manifest, search_client, fake_container_client):
+        """A blob with a failed chunk should not be recorded, so the next run processes it again."""
+        container = fake_container_client({"a.txt": "alpha"})
+        search_client.upload_documents.side_effect = lambda documents: [
+            SimpleNamespace(key=d["id"], succeeded=False, error_message="boom") for d in documents
+        ]
+
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert manifest.blob_names("transcript") == set()
+
+    def test_doc_types_do_not_share_entries(self, manifest, search_client, fake_container_client):
+        """A meeting note run must not delete transcript chunks as 'missing' blobs."""
+        run_ingestion_pipeline(fake_container_client({"a.txt": "alpha"}), doc_type="transcript", manifest=manifest)
+        run_ingestion_pipeline(fake_container_client({"n.txt": "note"}), doc_type="meeting_note", manifest=manifest)
+
+        search_client.delete_documents.assert_not_called()
+        assert manifest.blob_names("transcript") == {"a.txt"}
+
+    def test_failed_stale_delete_keeps_old_entry(self, manifest, search_client, fake_container_client):
+        """If stale chunks can't be deleted the old ids stay in the manifest, and are deleted by the next run."""
+        container = fake_container_client({"a.txt": "alpha"})
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        container.blobs["a.txt"] = "alpha two"
+        search_client.delete_documents.side_effect = ConnectionError("search down")
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert manifest.entries["transcript/a.txt"]["chunk_ids"] == ["alpha"]
+
+        search_client.delete_documents.side_effect = None
+        search_client.delete_documents.reset_mock()
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert self.deleted_ids(search_client) == {"alpha"}
+        assert manifest.entries["transcript/a.txt"]["chunk_ids"] == ["alpha two"]
+
+    def test_failed_delete_of_removed_blob_is_retried(self, manifest, search_client, fake_container_client):
+        """A removed blob keeps its entry until its chunks are actually deleted from the index."""
+        container = fake_container_client({"a.txt": "alpha", "b.txt": "bravo"})
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        del container.blobs["a.txt"]
+        search_client.delete_documents.side_effect = ConnectionError("search down")
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert manifest.blob_names("transcript") == {"a.txt", "b.txt"}
+
+        search_client.delete_documents.side_effect = None
+        search_client.delete_documents.reset_mock()
+        run_ingestion_pipeline(container, doc_type="transcript", manifest=manifest)
+
+        assert self.deleted_ids(search_client) == {"alpha"}
+        assert manifest.blob_names("transcript") == {"b.txt"}
@@ -0,0 +1,140 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from src.backend.rag.ingestion_pipeline import run_ingestion_pipeline
+
+
+class TestIngestionPipeline:
+    """Unit tests for the streaming ingestion pipeline."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def search_client(self):
+        """Search client that records the uploaded documents."""
+        client = MagicMock()
+        client._index_name = "transcripts"
+        client.upload_documents.side_effect = lambda documents: [
+            SimpleNamespace(key=d["id"], succeeded=True, error_message=None) for d in documents
+        ]
+        return client
+
+    @pytest.fixture(autouse=True)
+    def patched_backends(self, search_client):
+        """Replace the embedding, index and cache calls with local fakes."""
+        def fake_build(chunks, doc_type):
+            return [{"id": f"{c['source']}-{c['chunk_id']}", "content": c["content"]} for c in chunks]
+
+        with patch("src.backend.rag.ingestion_pipeline.build_index_documents", side_effect=fake_build) as build, \
+                patch("src.backend.rag.ingestion_pipeline.get_search_client_for_doc_type", return_value=search_client), \
+                patch("src.backend.rag.ingestion_pipeline.ensure_index_exists"), \
+                patch("src.backend.rag.ingestion_pipeline.invalidate_retrieval_cache") as invalidate:
+            yield SimpleNamespace(build=build, invalidate=invalidate)
+
+    # ============== TESTS ==============
+
+    def test_every_text_blob_is_uploaded(self, search_client, fake_container_client):
+        """Each .txt blob should be split and uploaded, other files skipped."""
+        container = fake_container_client({
+            "a.txt": "alpha " * 50,
+            "b.txt": "bravo " * 50,
+            "image.png": "not text",
+        })
+
+        results = run_ingestion_pipeline(container, doc_type="transcript", chunk_size=100)
+
+        uploaded = [d["id"] for call in search_client.upload_documents.call_args_list for d in call.kwargs["documents"]]
+        assert {i.split("-")[0] for i in uploaded} == {"a.txt", "b.txt"}
+        assert len(results["transcript"]) == len(uploaded)
+
+    def test_context_stage_runs_when_enabled(self, patched_backends, fake_container_client):
+        """With context_chunking the chunks should be contextualised before embedding."""
+        container = fake_container_client({"a.txt": "alpha beta"})
+
+        with patch("src.backend.rag.ingestion_pipeline.contextual_chunking",
+                   side_effect=lambda text, chunks: [f"ctx {c}" for c in chunks]) as mock_context:
+            run_ingestion_pipeline(container, doc_type="transcript", context_chunking=True)
+
+        mock_context.assert_called_once_with(text="alpha beta", chunks=["alpha beta"])
+        chunks = patched_backends.build.call_args[0][0]
+        assert [c["content"] for c in chunks] == ["ctx alpha beta"]
+
+    def test_epic_chunks_added_for_meeting_notes(self, patched_backends, fake_container_client):
+        """Epic chunks should be appended after the split chunks for meeting notes."""
+        text = "Intro\nEpic 1: Login\nUsers can log in."
+        container = fake_container_client({"notes.txt": text})
+
+        run_ingestion_pipeline(container, doc_type="meeting_note", chunk_size=1000, epic_chunking=True)
+
+        chunks = patched_backends.build.call_args[0][0]
+        assert [c["content"] for c in chunks] == [text, "Epic 1: Login\nUsers can log in."]
+        assert [c["chunk_id"] for c in chunks] == [0, 1]
+
+    def test_failed_document_does_not_stop_the_rest(self, search_client, fake_container_client):
+        """A download error should drop only that document."""
+        container = fake_container_client({"a.txt": "alpha", "b.txt": "bravo"})
+        original = container.get_blob_client
+
+        def get_blob_client(blob):
+            if blob.name == "a.txt":
+                raise Exception("download failure")
+            return original(blob)
+
+        container.get_blob_client = get_blob_client
+
+        results = run_ingestion_pipeline(container, doc_type="transcript")
+
+        assert [r.key for r in results["transcript"]] == ["b.txt-0"]
+
+    def test_documents_in_flight_are_bounded(self, search_client, fake_container_client):
+        """A slow upload stage should hold back downloads instead of buffering the whole container."""
+        container = fake_container_client({f"{i:03}.txt": f"doc {i}" for i in range(60)})
+        downloaded = 0
+        uploaded = 0
+        max_in_flight = 0
+        lock = threading.Lock()
+        original = container.get_blob_client
+
+        def get_blob_client(blob):
+            nonlocal downloaded, max_in_flight
+            with lock:
+                downloaded += 1
+                max_in_flight = max(max_in_flight, downloaded - uploaded)
+            return original(blob)
+
+        def slow_upload(documents):
+            nonlocal uploaded
+            time.sleep(0.01)
+            with lock:
+                uploaded += 1
+            return [SimpleNamespace(key=d["id"], succeeded=True, error_message=None) for d in documents]
+
+        container.get_blob_client = get_blob_client
+        search_client.upload_documents.side_effect = slow_upload
+        workers = {"download": 2, "split": 1, "embed": 1, "upload": 1}
+
+        run_ingestion_pipeline(container, doc_type="transcript", workers=workers, queue_size=2)
+
+        assert uploaded == 60
+        # at most queue_size per queue plus one document per worker
+        assert max_in_flight <= 4 * 2 + sum(workers.values())
+
+    def test_retrieval_cache_invalidated_after_upload(self, patched_backends, fake_container_client):
+        """The retrieval cache should be cleared once new chunks are in the index."""
+        container = fake_container_client({"a.txt": "alpha"})
+
+        run_ingestion_pipeline(container, doc_type="transcript")
+
+        assert patched_backends.invalidate.called
+
+    def test_empty_container_uploads_nothing(self, search_client, patched_backends, fake_container_client):
+        """No text blobs means no uploads and no cache invalidation."""
+        container = fake_container_client({"image.png": "x"})
+
+        assert run_ingestion_pipeline(container, doc_type="transcript") == {}
+        search_client.upload_documents.assert_not_called()
+        patched_backends.invalidate.assert_not_called()
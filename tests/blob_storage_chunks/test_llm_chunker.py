@@ -0,0 +1,96 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import patch, Mock
+
+from src.backend.rag.LLMChunker import LLMChunker, ChunkContext, ChunkContexts
+from src.backend.rag.context_cache import ContextCache, context_key
+from src.backend.rag.env import deployment_name
+
+
+def fake_parse(skip: set[int] | None = None):
+    """responses.parse stand-in that returns "ctx-<index>" for every chunk in the request"""
+    def parse(**kwargs):
+        indexes = [int(i) for i in re.findall(r'<chunk index="(\d+)">', kwargs["input"][-1]["content"])]
+        contexts = [ChunkContext(index=i, context=f"ctx-{i}") for i in indexes if i not in (skip or set())]
+        return SimpleNamespace(output_parsed=ChunkContexts(contexts=contexts))
+    return parse
+
+
+class TestLLMChunker:
+    """Unit tests for batched, cached chunk context generation."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def context_cache(self, tmp_path):
+        """Empty context cache persisted in a temporary file."""
+        cache = ContextCache(str(tmp_path / "contexts.jsonl"))
+        with patch("src.backend.rag.LLMChunker.CONTEXT_CACHE", cache):
+            yield cache
+
+    @pytest.fixture
+    def chunker(self, context_cache):
+        """LLMChunker with a fake client."""
+        chunker = LLMChunker()
+        chunker.client = Mock()
+        chunker.client.responses.parse.side_effect = fake_parse()
+        return chunker
+
+    # ============== TESTS ==============
+
+    @patch("src.backend.rag.LLMChunker.CHUNKS_PER_REQUEST", 4)
+    def test_chunks_are_batched_and_order_kept(self, chunker):
+        """Ten chunks with a batch size of four should take three requests and keep their order."""
+        chunks = [f"chunk {i}" for i in range(10)]
+
+        contexts = chunker.return_responses("the document", chunks)
+
+        assert contexts == [f"ctx-{i}" for i in range(10)]
+        assert chunker.client.responses.parse.call_count == 3
+
+    @patch("src.backend.rag.LLMChunker.CHUNKS_PER_REQUEST", 2)
+    def test_document_is_a_stable_prompt_prefix(self, chunker):
+        """Every request for a document should share the same leading messages and cache key."""
+        chunker.return_responses("the document", ["a", "b", "c", "d"])
+
+        calls = [c.kwargs for c in chunker.client.responses.parse.call_args_list]
+        assert len(calls) == 2
+        assert calls[0]["input"][:2] == calls[1]["input"][:2]
+        assert "the document" in calls[0]["input"][1]["content"]
+        assert calls[0]["input"][2] != calls[1]["input"][2]
+        assert calls[0]["prompt_cache_key"] == calls[1]["prompt_cache_key"]
+
+    def test_cached_contexts_are_not_regenerated(self, chunker, context_cache, tmp_path):
+        """A second run over the same document should make no LLM calls, even from a new process."""
+        chunker.return_responses("the document", ["a", "b"])
+        chunker.client.responses.parse.reset_mock()
+
+        reloaded = ContextCache(str(tmp_path / "contexts.jsonl"))
+        with patch("src.backend.rag.LLMChunker.CONTEXT_CACHE", reloaded):
+            contexts = chunker.return_responses("the document", ["a", "b"])
+
+        assert contexts == ["ctx-0", "ctx-1"]
+        chunker.client.responses.parse.assert_not_called()
+
+    def test_only_new_chunks_are_sent(self, chunker, context_cache):
+        """Chunks already cached shouldn't be sent again."""
+        context_cache.put_many({context_key(deployment_name, "the document", "a"): "cached"})
+
+        contexts = chunker.return_responses("the document", ["a", "b"])
+
+        assert contexts == ["cached", "ctx-1"]
+        prompt = chunker.client.responses.parse.call_args.kwargs["input"][-1]["content"]
+        assert '<chunk index="1">' in prompt
+        assert '<chunk index="0">' not in prompt
+
+    def test_skipped_chunk_falls_back_to_single_request(self, chunker):
+        """A chunk the model left out of the structured output should be generated on its own."""
+        chunker.client.responses.parse.side_effect = fake_parse(skip={1})
+
+        with patch.object(chunker, "return_response", return_value="single") as mock_single:
+            contexts = chunker.return_responses("the document", ["a", "b"])
+
+        assert contexts == ["ctx-0", "single"]
+        mock_single.assert_called_once_with(document="the document", chunk="b")
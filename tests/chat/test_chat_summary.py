@@ -0,0 +1,213 @@
+import asyncio
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.backend.rag import RAG_bot
+from src.backend.rag.chat_summary import ChatSummariser
+from src.backend.rag.RAG_bot import history_messages, HISTORY_LEN
+from src.backend.redis.message_codec import MESSAGE_CODEC
+from src.backend.redis.redis_chat_store import get_summary, save_summary, SUMMARY_ROLE
+
+
+def conversation(count, content="message"):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"{content} {i}"}
+        for i in range(count)
+    ]
+
+
+class TestHistoryMessages:
+    """The history sent to the generators is the summary plus a token-budgeted recent window"""
+
+    # ============== TESTS ==============
+
+    def test_short_history_is_sent_as_is(self):
+        history = conversation(4)
+
+        assert history_messages(history) == history
+
+    def test_summary_comes_first_as_system_message(self):
+        history = [{"role": SUMMARY_ROLE, "content": "Asked about Q1 revenue"}] + conversation(HISTORY_LEN + 2)
+
+        messages = history_messages(history)
+
+        assert messages[0]["role"] == "system"
+        assert "Asked about Q1 revenue" in messages[0]["content"]
+        assert messages[1:] == conversation(HISTORY_LEN + 2)[-HISTORY_LEN:]
+
+    def test_long_messages_are_cut_to_token_budget(self, monkeypatch):
+        monkeypatch.setattr(RAG_bot, "HISTORY_TOKEN_BUDGET", 1000)
+        history = [
+            {"role": "user", "content": "first question"},
+            {"role": "assistant", "content": "a" * 3000 + "END"},
+            {"role": "user", "content": "b" * 2000},
+        ]
+
+        messages = history_messages(history)
+
+        # the newest message fits whole, the one before is cut to its end, the oldest is left out
+        assert [m["role"] for m in messages] == ["assistant", "user"]
+        assert messages[1]["content"] == "b" * 2000
+        assert messages[0]["content"].startswith("...")
+        assert messages[0]["content"].endswith("END")
+        assert sum(RAG_bot.estimate_tokens(m["content"]) for m in messages) <= 1000
+
+    def test_message_not_cut_when_little_budget_left(self, monkeypatch):
+        monkeypatch.setattr(RAG_bot, "HISTORY_TOKEN_BUDGET", 550)
+        history = [{"role": "assistant", "content": "a" * 3000}, {"role": "user", "content": "b" * 2000}]
+
+        assert history_messages(history) == [{"role": "user", "content": "b" * 2000}]
+
+
+class TestSummaryStore:
+    """chat:{id}:summary holds the summary and how many messages it covers"""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def rdb(self):
+        rdb = MagicMock()
+        rdb.pipe = MagicMock()
+        rdb.pipe.execute = AsyncMock()
+        rdb.execute_command = AsyncMock()
+
+        @asynccontextmanager
+        async def pipeline(transaction=True):
+            yield rdb.pipe
+
+        rdb.pipeline = MagicMock(side_effect=pipeline)
+        return rdb
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_get_summary_reads_summary_and_length_in_one_round_trip(self, rdb):
+        rdb.pipe.execute.return_value = [["Asked about Q1", "12"], 20]
+
+        assert await get_summary(rdb, "abc") == ("Asked about Q1", 12, 20)
+        rdb.pipe.hmget.assert_called_once_with("chat:abc:summary", "summary", "covered")
+        rdb.pipe.llen.assert_called_once_with("chat:abc:messages")
+
+    @pytest.mark.asyncio
+    async def test_get_summary_of_unsummarised_chat(self, rdb):
+        rdb.pipe.execute.return_value = [[None, None], 3]
+
+        assert await get_summary(rdb, "abc") == (None, 0, 3)
+
+    @pytest.mark.asyncio
+    async def test_save_summary_is_conditional_on_covered(self, rdb):
+        rdb.execute_command.return_value = 0
+
+        assert await save_summary(rdb, "abc", "new summary", 10, 14) is False
+        command, sha, numkeys, *rest = rdb.execute_command.call_args.args
+        assert rest == ["chat:abc", "chat:abc:summary", 10, 14, "new summary"]
+
+
+class TestChatSummariser:
+    """Background summary updates"""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def store(self):
+        """Patch the store and LLM calls made by the summariser, the chat has 30 messages"""
+        messages = conversation(30)
+
+        async def read_messages(rdb, chat_id, start, end):
+            return [MESSAGE_CODEC.encode(m) for m in messages[start:end + 1]]
+
+        async def summarise(summary, batch):
+            return f"{summary or ''}+{len(batch)}"
+
+        with patch("src.backend.rag.chat_summary.get_summary", new_callable=AsyncMock, return_value=(None, 0, 30)) as get, \
+                patch("src.backend.rag.chat_summary.save_summary", new_callable=AsyncMock, return_value=True) as save, \
+                patch("src.backend.rag.chat_summary.read_messages", side_effect=read_messages) as read, \
+                patch("src.backend.rag.chat_summary.summarise_messages", side_effect=summarise) as summarise_mock:
+            yield get, save, read, summarise_mock
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_folds_messages_older_than_window_in_batches(self, store):
+        get, save, read, summarise = store
+        summariser = ChatSummariser(keep_recent=6, batch_size=20)
+
+        assert await summariser.update(None, "abc") == 24
+
+        assert [call.args[2:] for call in read.call_args_list] == [(0, 19), (20, 23)]
+        assert summarise.call_args_list[1].args[1] == conversation(30)[20:24]
+        assert [call.args[2:] for call in save.call_args_list] == [("+20", 0, 20), ("+20+4", 20, 24)]
+
+    @pytest.mark.asyncio
+    async def test_only_new_messages_are_read(self, store):
+        get, save, read, summarise = store
+        get.return_value = ("earlier", 22, 30)
+
+        assert await ChatSummariser(keep_recent=6).update(None, "abc") == 2
+
+        read.assert_called_once_with(None, "abc", 22, 23)
+        save.assert_awaited_once_with(None, "abc", "earlier+2", 22, 24)
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_do_while_chat_fits_window(self, store):
+        get, save, read, summarise = store
+        get.return_value = (None, 0, 6)
+
+        assert await ChatSummariser(keep_recent=6).update(None, "abc") == 0
+        summarise.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stops_when_summary_was_updated_elsewhere(self, store):
+        get, save, read, summarise = store
+        save.return_value = False
+
+        assert await ChatSummariser(keep_recent=6, batch_size=20).update(None, "abc") == 0
+        assert summarise.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_turns_during_an_update_rerun_it_once(self):
+        summariser = ChatSummariser()
+        release = asyncio.Event()
+
+        async def slow_update(rdb, chat_id):
+            await release.wait()
+
+        with patch.object(summariser, "update", side_effect=slow_update) as update:
+            summariser.schedule(None, "abc")
+            await asyncio.sleep(0)
+            summariser.schedule(None, "abc")
+            summariser.schedule(None, "abc")
+            task = summariser._tasks["abc"]
+            release.set()
+            await task
+
+        assert update.await_count == 2
+        assert summariser._tasks == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_update_is_logged(self, capsys):
+        summariser = ChatSummariser()
+
+        with patch.object(summariser, "update", side_effect=ConnectionError("redis down")):
+            summariser.schedule(None, "abc")
+            await summariser._tasks["abc"]
+
+        assert "Summarising chat abc failed" in capsys.readouterr().out
+        assert summariser._tasks == {}
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_running_updates(self):
+        summariser = ChatSummariser()
+
+        async def hanging_update(rdb, chat_id):
+            await asyncio.sleep(10)
+
+        with patch.object(summariser, "update", side_effect=hanging_update) as update:
+            summariser.schedule(None, "abc")
+            await asyncio.sleep(0)
+            await summariser.close()
+
+        update.assert_awaited_once()
+        assert summariser._tasks == {}
@@ -34,8 +34,8 @@ def mock_decide_route():
 
 @pytest.fixture
 def mock_retrieve_context():
-    """Mock retrieve_context function"""
-    with patch("src.rag_chatbot.rag.RAG_bot.retrieve_context") as mock:
+    """Mock aretrieve_context function"""
+    with patch("src.rag_chatbot.rag.RAG_bot.aretrieve_context", new_callable=AsyncMock) as mock:
         yield mock
 
 
@@ -1,21 +1,43 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+from src.backend.rag.RAG_bot import MCPLLM, HISTORY_LEN
+from src.backend.mcp.servers.clients.session_pool import MCP_SESSION_POOL
+
+
+class FakePool:
+    """Session pool stand-in that hands out one mock client"""
+
+    def __init__(self, client):
+        self.client = client
+        self.acquired = 0
+        self.released = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.acquired += 1
+        try:
+            yield self.client
+        finally:
+            self.released += 1
 
-from src.backend.rag.RAG_bot import MCPLLM, HISTORY_LEN, deployment_name
 
 @pytest.fixture
-def mock_mcp_client():
-    with patch("src.rag_chatbot.rag.RAG_bot.MCPClient") as mock:
-        yield mock
+def mock_client():
+    client = MagicMock()
+    client.process_query = AsyncMock(return_value="response")
+    return client
 
 
-@pytest.mark.asyncio
-async def test_generate_answer_builds_messages(mock_mcp_client):
-    mock_client = mock_mcp_client.return_value # mock_mcp_client.return_value == MCPClient() as 
-    mock_client.connect_to_server = AsyncMock()
-    mock_client.process_query = AsyncMock(return_value="response")
+@pytest.fixture
+def pool(mock_client):
+    return FakePool(mock_client)
 
-    llm = MCPLLM()
+
+@pytest.mark.asyncio
+async def test_generate_answer_builds_messages(pool, mock_client):
+    llm = MCPLLM(pool=pool)
 
     history = [
         {"role": "user", "content": "Hi"},
@@ -32,83 +54,43 @@ async def test_generate_answer_builds_messages(mock_mcp_client):
 
     assert called_args[-1] == {"role": "user", "content": "How are you?"}
 
-def test_mcpllm_initialization():
+def test_mcpllm_uses_shared_pool_by_default():
     llm = MCPLLM()
 
-    assert llm is not None
-    assert llm.connected is False
-    assert llm.client is not None
+    assert llm.pool is MCP_SESSION_POOL
 
 @pytest.mark.asyncio
-async def test_connect_to_server_sets_connected_true():
-    mock_client = MagicMock()
-    mock_client.connect_to_server = AsyncMock()
-
-    llm = MCPLLM()
-    llm.client = mock_client
-
-    await llm.connect_to_MCPserver()
-
-    mock_client.connect_to_server.assert_called_once_with(llm.server_module)
-    assert llm.connected is True
-
-@pytest.mark.asyncio
-async def test_connect_does_not_reconnect_if_already_connected():
-    mock_client = MagicMock()
-    mock_client.connect_to_server = AsyncMock()
-
-    llm = MCPLLM()
-    llm.client = mock_client
-    llm.connected = True
-
-    await llm.connect_to_MCPserver()
-
-    mock_client.connect_to_server.assert_not_called()
-
-@pytest.mark.asyncio
-async def test_connect_raises_on_failure():
-    mock_client = MagicMock()
-    mock_client.connect_to_server = AsyncMock(side_effect=Exception("fail"))
-
-    llm = MCPLLM()
-    llm.client = mock_client
+async def test_generate_answer_borrows_and_returns_session(pool):
+    llm = MCPLLM(pool=pool)
 
-    with pytest.raises(Exception):
-        await llm.connect_to_MCPserver()
+    await llm.generate_answer("Hello", [])
+    await llm.generate_answer("Hello again", [])
 
-    assert llm.connected is False
+    assert pool.acquired == pool.released == 2
 
 @pytest.mark.asyncio
-async def test_generate_answer_calls_connect():
-    llm = MCPLLM()
+async def test_generate_answer_returns_session_on_failure(pool, mock_client):
+    mock_client.process_query.side_effect = Exception("tool failure")
+    llm = MCPLLM(pool=pool)
 
-    llm.connect_to_MCPserver = AsyncMock()
-    llm.client = MagicMock()
-    llm.client.process_query = AsyncMock(return_value="ok")
-
-    await llm.generate_answer("Hello", [])
+    with pytest.raises(Exception, match="tool failure"):
+        await llm.generate_answer("Hello", [])
 
-    llm.connect_to_MCPserver.assert_called_once()
+    assert pool.released == 1
 
 @pytest.mark.asyncio
-async def test_generate_answer_respects_history_limit():
+async def test_generate_answer_respects_history_limit(pool, mock_client):
     """
     Tests that the message list sent to process_query is 1 + HISTORY_LEN,
     the extra 1 coming from the user_query that was just entered.
     """
-    mock_client = MagicMock()
-    mock_client.connect_to_server = AsyncMock()
-    mock_client.process_query = AsyncMock(return_value="response")
-
-    llm = MCPLLM()
-    llm.client = mock_client
+    llm = MCPLLM(pool=pool)
 
     history = [
         {"role": "user", "content": f"msg{i}"}
         for i in range(10)
     ]
 
-    
     await llm.generate_answer("new", history)
 
     called_messages = mock_client.process_query.call_args[1]["query"]
@@ -116,49 +98,17 @@ async def test_generate_answer_respects_history_limit():
     assert len(called_messages) == min(len(history), HISTORY_LEN) + 1
 
 @pytest.mark.asyncio
-async def test_cleanup_calls_client_and_resets_flag():
-    mock_client = MagicMock()
-    mock_client.cleanup = AsyncMock()
-
-    llm = MCPLLM()
-    llm.client = mock_client
-    llm.connected = True
-
-    await llm.cleanup()
-
-    mock_client.cleanup.assert_called_once()
-    assert llm.connected is False
-
-@pytest.mark.asyncio
-async def test_cleanup_does_nothing_if_not_connected():
-    mock_client = MagicMock()
-    mock_client.cleanup = AsyncMock()
-
-    llm = MCPLLM()
-    llm.client = mock_client
-    llm.connected = False
-
-    await llm.cleanup()
-
-    mock_client.cleanup.assert_not_called()
-
-@pytest.mark.asyncio
-async def test_generate_answer_fails_if_connection_fails():
+async def test_generate_answer_fails_if_no_session():
     """
-    If the connection to the MCP server fails when trying to generate an answer,
-    process_query should not be called.
+    If no MCP session can be acquired, process_query should not be called.
     """
-    llm = MCPLLM()
-
-    # Mock connect_to_MCPserver to fail
-    llm.connect_to_MCPserver = AsyncMock(side_effect=Exception("connection failed"))
-
-    # Mock client
-    llm.client = MagicMock()
-    llm.client.process_query = AsyncMock()
+    client = MagicMock()
+    client.process_query = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.side_effect = ConnectionError("no MCP session available")
+    llm = MCPLLM(pool=pool)
 
-    with pytest.raises(Exception, match="connection failed"):
+    with pytest.raises(ConnectionError):
         await llm.generate_answer("Hello", [])
 
-    # Ensure process_query was never called
-    llm.client.process_query.assert_not_called()
\ No newline at end of file
+    client.process_query.assert_not_called()
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+from contextlib import asynccontextmanager
+from redis.exceptions import WatchError
+from unittest.mock import AsyncMock, MagicMock
+
+from src.backend.redis import message_codec
+from src.backend.redis.message_codec import MessageCodec, JsonSerializer, OrjsonSerializer, make_serializer, ZSTD_MAGIC
+from src.backend.redis.redis_chat_store import migrate_messages
+
+
+LONG_ANSWER = "Revenue grew 12% year over year, driven by the analytical instruments segment. " * 20
+
+
+class TestMessageCodec:
+    """Unit tests for the chat message codec"""
+
+    # ============== TESTS ==============
+
+    @pytest.mark.parametrize("serializer", [JsonSerializer(), OrjsonSerializer()])
+    def test_round_trip(self, serializer):
+        codec = MessageCodec(serializer=serializer, compress_threshold=256)
+        for message in ({"role": "user", "content": "Hi é"}, {"role": "assistant", "content": LONG_ANSWER}):
+            assert codec.decode(codec.encode(message)) == message
+
+    def test_only_large_messages_are_compressed(self):
+        codec = MessageCodec(compress_threshold=256)
+
+        short = codec.encode({"role": "user", "content": "Hi"})
+        long = codec.encode({"role": "assistant", "content": LONG_ANSWER})
+
+        assert short.startswith(b"{")
+        assert long.startswith(ZSTD_MAGIC)
+        assert len(long) < len(LONG_ANSWER) / 4
+
+    def test_compression_can_be_disabled(self):
+        codec = MessageCodec(compress_threshold=0)
+
+        assert codec.encode({"role": "assistant", "content": LONG_ANSWER}).startswith(b"{")
+
+    def test_reads_messages_stored_as_json(self):
+        """Lists written before the codec existed hold json.dumps strings, they must still decode"""
+        codec = MessageCodec()
+        legacy = json.dumps({"role": "assistant", "content": "café"})
+
+        assert codec.decode(legacy) == {"role": "assistant", "content": "café"}
+        assert codec.decode(legacy.encode()) == {"role": "assistant", "content": "café"}
+
+    def test_serializers_read_each_others_messages(self):
+        message = {"role": "assistant", "content": LONG_ANSWER}
+        orjson_codec = MessageCodec(serializer=OrjsonSerializer(), compress_threshold=256)
+        json_codec = MessageCodec(serializer=JsonSerializer(), compress_threshold=256)
+
+        assert json_codec.decode(orjson_codec.encode(message)) == message
+        assert orjson_codec.decode(json_codec.encode(message)) == message
+
+    def test_orjson_falls_back_to_json_when_missing(self, monkeypatch):
+        monkeypatch.setattr(message_codec, "orjson", None)
+
+        assert make_serializer("orjson").name == "json"
+        with pytest.raises(ValueError):
+            make_serializer("msgpack")
+
+    def test_without_zstandard_messages_are_not_compressed(self, monkeypatch):
+        compressed = MessageCodec(compress_threshold=256).encode({"role": "assistant", "content": LONG_ANSWER})
+        monkeypatch.setattr(message_codec, "zstandard", None)
+        codec = MessageCodec(compress_threshold=256)
+
+        assert codec.encode({"role": "assistant", "content": LONG_ANSWER}).startswith(b"{")
+        with pytest.raises(RuntimeError):
+            codec.decode(compressed)
+
+
+class TestMigrateMessages:
+    """Rewriting JSON lists with the current codec"""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def rdb(self):
+        rdb = MagicMock()
+        rdb.pipe = MagicMock()
+        rdb.pipe.watch = AsyncMock()
+        rdb.pipe.unwatch = AsyncMock()
+        rdb.pipe.execute = AsyncMock()
+        rdb.pipe.execute_command = AsyncMock()
+
+        @asynccontextmanager
+        async def pipeline(transaction=True):
+            yield rdb.pipe
+
+        rdb.pipeline = MagicMock(side_effect=pipeline)
+        return rdb
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_json_list_is_rewritten(self, rdb, monkeypatch):
+        codec = MessageCodec(compress_threshold=256)
+        monkeypatch.setattr("src.backend.redis.redis_chat_store.MESSAGE_CODEC", codec)
+        short = json.dumps({"role": "user", "content": "Hi"}).encode()
+        long = json.dumps({"role": "assistant", "content": LONG_ANSWER}).encode()
+        rdb.pipe.execute_command.return_value = [short, long]
+
+        changed = await migrate_messages(rdb, "abc")
+
+        rdb.pipe.watch.assert_awaited_once_with("chat:abc:messages")
+        rdb.pipe.delete.assert_called_once_with("chat:abc:messages")
+        stored = rdb.pipe.rpush.call_args.args[1:]
+        assert [codec.decode(raw) for raw in stored] == [json.loads(short), json.loads(long)]
+        assert stored[1].startswith(ZSTD_MAGIC)
+        assert changed == 2
+
+    @pytest.mark.asyncio
+    async def test_migrated_list_is_left_alone(self, rdb):
+        rdb.pipe.execute_command.return_value = [message_codec.MESSAGE_CODEC.encode({"role": "user", "content": "Hi"})]
+
+        assert await migrate_messages(rdb, "abc") == 0
+        rdb.pipe.unwatch.assert_awaited_once()
+        rdb.pipe.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_retries_when_list_changes_meanwhile(self, rdb):
+        rdb.pipe.execute_command.return_value = [json.dumps({"role": "user", "content": "Hi"}).encode()]
+        rdb.pipe.execute.side_effect = [WatchError(), [1, 1]]
+
+        await migrate_messages(rdb, "abc")
+
+        assert rdb.pipe.watch.await_count == 2
+        assert rdb.pipe.execute.await_count == 2
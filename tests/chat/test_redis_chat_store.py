@@ -0,0 +1,471 @@
+import httpx
+import pytest
+from redis.exceptions import NoScriptError
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.backend.main import app
+from src.backend.rag.RAG_bot import HISTORY_LEN
+from src.backend.redis import redis_chat_store
+from src.backend.redis.redis_chat_store import (
+    create_chat,
+    delete_chat,
+    start_turn,
+    finish_turn,
+    get_recent_messages,
+    get_messages_page,
+    list_chats,
+    rebuild_chat_index,
+    CHATS_BY_CREATED,
+    CHATS_INDEX_BUILT,
+    SUMMARY_ROLE,
+    DEFAULT_PAGE_SIZE,
+)
+from src.backend.redis.message_codec import MESSAGE_CODEC
+from src.backend.redis.redis_client import get_redis
+
+
+def make_rdb(*pipeline_results):
+    """
+    Redis client mock, each ``async with rdb.pipeline()`` block gets a new pipeline whose
+    execute() returns the next of pipeline_results
+    """
+    rdb = MagicMock()
+    rdb.pipes = []
+    results = iter(pipeline_results)
+
+    @asynccontextmanager
+    async def pipeline(transaction=True):
+        pipe = MagicMock()
+        pipe.transaction = transaction
+        pipe.execute = AsyncMock(return_value=next(results, []))
+        rdb.pipes.append(pipe)
+        yield pipe
+
+    rdb.pipeline = MagicMock(side_effect=pipeline)
+    rdb.zrevrank = AsyncMock()
+    rdb.zrevrange = AsyncMock(return_value=[])
+    rdb.zadd = AsyncMock()
+    rdb.set = AsyncMock()
+    rdb.keys = AsyncMock()
+    return rdb
+
+
+def chat_hash(chat_id, created_at=100):
+    return {"id": chat_id, "title": f"title {chat_id}", "created_at": str(created_at)}
+
+
+async def aiter_list(items):
+    for item in items:
+        yield item
+
+
+class TestChatIndex:
+    """create_chat/delete_chat keep the chats:by_created index in step with the chat hashes"""
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_create_chat_indexes_chat_in_same_transaction(self):
+        rdb = make_rdb()
+
+        with patch.object(redis_chat_store, "time", return_value=1700000000.25):
+            await create_chat(rdb, "abc", title="New Chat")
+
+        pipe = rdb.pipes[0]
+        assert pipe.transaction is True
+        pipe.hset.assert_called_once_with(
+            "chat:abc", mapping={"id": "abc", "title": "New Chat", "created_at": 1700000000}
+        )
+        pipe.zadd.assert_called_once_with(CHATS_BY_CREATED, {"abc": 1700000000.25})
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_delete_chat_removes_chat_from_index(self):
+        rdb = make_rdb()
+
+        await delete_chat(rdb, "abc")
+
+        pipe = rdb.pipes[0]
+        assert pipe.transaction is True
+        pipe.delete.assert_called_once_with("chat:abc", "chat:abc:messages", "chat:abc:summary")
+        pipe.zrem.assert_called_once_with(CHATS_BY_CREATED, "abc")
+
+
+class TestListChats:
+    """list_chats reads one page from the index and pipelines the metadata reads"""
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_first_page_reads_index_and_pipelines_metadata(self):
+        rdb = make_rdb([1, [("b", 200.5), ("a", 100.0)]], [chat_hash("b", 200), chat_hash("a", 100)])
+
+        chats = await list_chats(rdb, limit=2)
+
+        assert chats == [
+            {"id": "b", "title": "title b", "created_at": 200, "cursor": "200.5:b"},
+            {"id": "a", "title": "title a", "created_at": 100, "cursor": "100.0:a"},
+        ]
+        rdb.pipes[0].zrevrangebyscore.assert_called_once_with(
+            CHATS_BY_CREATED, "+inf", "-inf", start=0, num=2, withscores=True
+        )
+        rdb.pipes[1].hgetall.assert_any_call("chat:a")
+        assert rdb.pipes[1].execute.await_count == 1
+        rdb.keys.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_before_cursor_starts_after_that_chat(self):
+        rdb = make_rdb([1, [], [("x", 90.0)]], [chat_hash("x")])
+
+        chats = await list_chats(rdb, limit=10, before="100.25:c")
+
+        assert [c["id"] for c in chats] == ["x"]
+        rdb.pipes[0].zrevrangebyscore.assert_any_call(CHATS_BY_CREATED, 100.25, 100.25, withscores=True)
+        rdb.pipes[0].zrevrangebyscore.assert_any_call(
+            CHATS_BY_CREATED, "(100.25", "-inf", start=0, num=10, withscores=True
+        )
+
+    @pytest.mark.asyncio
+    async def test_chats_with_the_cursor_score_continue_by_id(self):
+        """Chats backfilled with the same whole-second score are paged by id, as Redis orders them"""
+        ties = [("d", 100.0), ("c", 100.0), ("b", 100.0)]
+        rdb = make_rdb([1, ties, [("a", 50.0)]], [chat_hash("b"), chat_hash("a")])
+
+        chats = await list_chats(rdb, limit=2, before="100.0:c")
+
+        assert [c["id"] for c in chats] == ["b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_cursor_of_deleted_chat_still_pages(self):
+        """The cursor doesn't need its chat to still be in the index"""
+        rdb = make_rdb([1, [], [("older", 80.0)]], [chat_hash("older")])
+
+        chats = await list_chats(rdb, before="100.0:deleted")
+
+        assert [c["id"] for c in chats] == ["older"]
+
+    @pytest.mark.asyncio
+    async def test_without_limit_every_chat_is_read(self):
+        entries = [(f"c{i}", float(100 - i)) for i in range(60)]
+        rdb = make_rdb([1, entries], [chat_hash(chat_id) for chat_id, _ in entries])
+
+        chats = await list_chats(rdb, limit=None)
+
+        assert len(chats) == 60
+        rdb.pipes[0].zrevrangebyscore.assert_called_once_with(CHATS_BY_CREATED, "+inf", "-inf", withscores=True)
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_raises(self):
+        rdb = make_rdb()
+
+        with pytest.raises(ValueError):
+            await list_chats(rdb, before="deleted")
+        rdb.pipeline.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_chats_deleted_since_indexing_are_skipped(self):
+        rdb = make_rdb([1, [("gone", 200.0), ("a", 100.0)]], [{}, chat_hash("a")])
+
+        chats = await list_chats(rdb)
+
+        assert [c["id"] for c in chats] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_index_is_built_on_first_use(self):
+        rdb = make_rdb([0, []], ["100", "200"], [[("old1", 100.0)]], [chat_hash("old1")])
+        rdb.scan_iter = MagicMock(return_value=aiter_list(["chat:old1", "chat:old2"]))
+
+        chats = await list_chats(rdb)
+
+        assert [c["id"] for c in chats] == ["old1"]
+        rdb.zadd.assert_awaited_once_with(CHATS_BY_CREATED, {"old1": 100, "old2": 200}, nx=True)
+        rdb.set.assert_awaited_once_with(CHATS_INDEX_BUILT, 1)
+
+
+class TestRebuildChatIndex:
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_batches_and_skips_non_metadata_keys(self):
+        rdb = make_rdb(["1", "2"], ["3"])
+        keys = ["chat:a", "chat:a:messages", "chat:b", "chat:c"]
+        rdb.scan_iter = MagicMock(return_value=aiter_list(keys))
+
+        await rebuild_chat_index(rdb, batch_size=2)
+
+        assert [c.args[1] for c in rdb.zadd.await_args_list] == [{"a": 1, "b": 2}, {"c": 3}]
+        assert rdb.scan_iter.call_args.kwargs["match"] == "chat:*"
+
+
+def script_call(rdb, call=0):
+    """keys, args and options of the call-th EVALSHA sent through rdb.execute_command"""
+    command, sha, numkeys, *rest = rdb.execute_command.call_args_list[call].args
+    assert command == "EVALSHA"
+    return rest[:numkeys], rest[numkeys:], rdb.execute_command.call_args_list[call].kwargs
+
+
+def encoded(role, content):
+    return MESSAGE_CODEC.encode({"role": role, "content": content})
+
+
+class TestTurnScripts:
+    """A chat turn is two atomic script calls instead of five round-trips"""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def rdb(self):
+        rdb = MagicMock()
+        rdb.execute_command = AsyncMock()
+        rdb.script_load = AsyncMock()
+        return rdb
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_start_turn_returns_history_before_user_message(self, rdb):
+        rdb.execute_command.return_value = [[b'{"role": "user", "content": "Hi"}', encoded("assistant", "Hello")], None]
+
+        history = await start_turn(rdb, "abc", "How are you?")
+
+        assert history == [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+        keys, args, options = script_call(rdb)
+        assert keys == ["chat:abc", "chat:abc:messages", "chat:abc:summary"]
+        assert args == [encoded("user", "How are you?"), 0]
+        # encoded messages are read as bytes even though the client decodes responses
+        assert options == {"NEVER_DECODE": True}
+
+    @pytest.mark.asyncio
+    async def test_start_turn_reads_only_window(self, rdb):
+        rdb.execute_command.return_value = [[], None]
+
+        await start_turn(rdb, "abc", "Hi", window=6)
+
+        assert script_call(rdb)[1][1] == 6
+
+    @pytest.mark.asyncio
+    async def test_start_turn_puts_summary_first(self, rdb):
+        rdb.execute_command.return_value = [[encoded("assistant", "Hello")], "Asked about Q1 revenue, café".encode()]
+
+        history = await start_turn(rdb, "abc", "And Q2?", window=6)
+
+        assert history == [
+            {"role": SUMMARY_ROLE, "content": "Asked about Q1 revenue, café"},
+            {"role": "assistant", "content": "Hello"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_start_turn_on_missing_chat_returns_none(self, rdb):
+        rdb.execute_command.return_value = None
+
+        assert await start_turn(rdb, "missing", "Hi") is None
+
+    @pytest.mark.asyncio
+    async def test_script_is_loaded_when_redis_does_not_have_it(self, rdb):
+        rdb.execute_command.side_effect = [NoScriptError("NOSCRIPT"), [[], None]]
+
+        assert await start_turn(rdb, "abc", "Hi") == []
+        rdb.script_load.assert_awaited_once_with(redis_chat_store.START_TURN_SCRIPT)
+        assert rdb.execute_command.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_finish_turn_passes_title(self, rdb):
+        rdb.execute_command.return_value = 1
+
+        assert await finish_turn(rdb, "abc", "Hello", title="Hi") is True
+        keys, args, _ = script_call(rdb)
+        assert keys == ["chat:abc", "chat:abc:messages"]
+        assert args == [encoded("assistant", "Hello"), "Hi"]
+
+    @pytest.mark.asyncio
+    async def test_finish_turn_without_title_keeps_it(self, rdb):
+        rdb.execute_command.return_value = 0
+
+        assert await finish_turn(rdb, "deleted", "Hello") is False
+        assert script_call(rdb)[1][1] == ""
+
+
+class TestWindowedHistory:
+    """History reads only fetch the messages that are needed"""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def rdb(self):
+        rdb = MagicMock()
+        rdb.execute_command = AsyncMock()
+        return rdb
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_recent_messages_use_negative_range(self, rdb):
+        rdb.execute_command.return_value = [b'{"role": "assistant", "content": "Hello"}']
+
+        messages = await get_recent_messages(rdb, "abc", 6)
+
+        assert messages == [{"role": "assistant", "content": "Hello"}]
+        rdb.execute_command.assert_awaited_once_with("LRANGE", "chat:abc:messages", -6, -1, NEVER_DECODE=True)
+
+    @pytest.mark.asyncio
+    async def test_latest_page_is_indexed_from_list_length(self, rdb):
+        rdb.execute_command.return_value = [10, [encoded("user", "u"), encoded("assistant", "a")]]
+
+        messages = await get_messages_page(rdb, "abc", limit=2)
+
+        assert messages == [
+            {"role": "user", "content": "u", "index": 8},
+            {"role": "assistant", "content": "a", "index": 9},
+        ]
+        keys, args, _ = script_call(rdb)
+        assert keys == ["chat:abc", "chat:abc:messages"]
+        assert args == [-2, -1]
+
+    @pytest.mark.asyncio
+    async def test_before_cursor_reads_older_messages(self, rdb):
+        rdb.execute_command.return_value = [10, [encoded("user", "u")]]
+
+        messages = await get_messages_page(rdb, "abc", before=3, limit=5)
+
+        assert script_call(rdb)[1] == [0, 2]
+        assert messages[0]["index"] == 0
+
+    @pytest.mark.asyncio
+    async def test_first_message_cursor_returns_empty_page(self, rdb):
+        rdb.exists = AsyncMock(return_value=1)
+
+        assert await get_messages_page(rdb, "abc", before=0) == []
+        rdb.execute_command.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_chat_returns_none(self, rdb):
+        rdb.execute_command.return_value = None
+
+        assert await get_messages_page(rdb, "missing") is None
+
+    @pytest.mark.asyncio
+    async def test_messages_endpoint_pages_when_limit_given(self):
+        app.dependency_overrides[get_redis] = lambda: None
+        try:
+            with patch("src.backend.backend_api.get_messages_page", new_callable=AsyncMock, return_value=[]) as page:
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    res = await client.get("/chats/abc/messages", params={"limit": 20, "before": 40})
+                    page.return_value = None
+                    missing = await client.get("/chats/abc/messages", params={"limit": 20})
+        finally:
+            app.dependency_overrides.clear()
+
+        assert res.status_code == 200
+        page.assert_any_await(None, "abc", before=40, limit=20)
+        assert missing.status_code == 404
+
+
+class TestChatEndpoint:
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def store(self):
+        with patch("src.backend.backend_api.start_turn", new_callable=AsyncMock, return_value=[]) as start, \
+                patch("src.backend.backend_api.finish_turn", new_callable=AsyncMock) as finish, \
+                patch("src.backend.backend_api.CHAT_SUMMARISER"), \
+                patch("src.backend.backend_api.chat_loop", new_callable=AsyncMock, return_value={"answer": "Hello", "mode": "general"}):
+            app.dependency_overrides[get_redis] = lambda: None
+            yield start, finish
+            app.dependency_overrides.clear()
+
+    async def post(self, chat_id="abc"):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(f"/chats/{chat_id}", json={"message": "hi there", "mode": "llm"})
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_first_turn_stores_answer_and_title(self, store):
+        start, finish = store
+
+        res = await self.post()
+
+        assert res.json()["answer"] == "Hello"
+        start.assert_awaited_once_with(None, "abc", "hi there", window=HISTORY_LEN)
+        finish.assert_awaited_once_with(None, "abc", "Hello", title="hi there")
+
+    @pytest.mark.asyncio
+    async def test_later_turn_keeps_title(self, store):
+        start, finish = store
+        start.return_value = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+
+        await self.post()
+
+        assert finish.call_args.kwargs["title"] is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_chat_returns_404(self, store):
+        start, finish = store
+        start.return_value = None
+
+        res = await self.post("missing")
+
+        assert res.status_code == 404
+        finish.assert_not_called()
+
+
+class TestGetChatsEndpoint:
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def rdb(self):
+        app.dependency_overrides[get_redis] = lambda: None
+        yield
+        app.dependency_overrides.clear()
+
+    async def get(self, params):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/chats", params=params)
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_passes_page_parameters(self, rdb):
+        with patch("src.backend.backend_api.list_chats", new_callable=AsyncMock, return_value=[]) as mock_list:
+            res = await self.get({"limit": 20, "before": "100.5:abc"})
+
+        assert res.status_code == 200
+        mock_list.assert_awaited_once_with(None, limit=20, before="100.5:abc")
+
+    @pytest.mark.asyncio
+    async def test_no_parameters_lists_every_chat(self, rdb):
+        """The sidebar asks for the chats without paging, so none may be cut off"""
+        with patch("src.backend.backend_api.list_chats", new_callable=AsyncMock, return_value=[]) as mock_list:
+            res = await self.get({})
+
+        assert res.status_code == 200
+        mock_list.assert_awaited_once_with(None, limit=None, before=None)
+
+    @pytest.mark.asyncio
+    async def test_cursor_without_limit_uses_page_size(self, rdb):
+        with patch("src.backend.backend_api.list_chats", new_callable=AsyncMock, return_value=[]) as mock_list:
+            await self.get({"before": "100.5:abc"})
+
+        mock_list.assert_awaited_once_with(None, limit=DEFAULT_PAGE_SIZE, before="100.5:abc")
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_cursor(self, rdb):
+        with patch("src.backend.backend_api.list_chats", new_callable=AsyncMock, side_effect=ValueError("bad")):
+            res = await self.get({"before": "abc"})
+
+        assert res.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_page(self, rdb):
+        with patch("src.backend.backend_api.list_chats", new_callable=AsyncMock) as mock_list:
+            res = await self.get({"limit": 10000})
+
+        assert res.status_code == 422
+        mock_list.assert_not_called()
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+import redis.asyncio as redis
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+
+from src.backend.main import app
+from src.backend.redis import redis_client
+from src.backend.redis.redis_client import InstrumentedConnectionPool, RedisPool, get_redis
+
+
+class FakeConnection(redis.Connection):
+    """Connection that never touches the network"""
+
+    async def connect(self):
+        pass
+
+    async def can_read_destructive(self):
+        return False
+
+    async def disconnect(self, nowait: bool = False, error=None, failure_count=None, health_check_failed=False):
+        pass
+
+    def should_reconnect(self):
+        return False
+
+
+class TestInstrumentedConnectionPool:
+    """Pool saturation metrics"""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def pool(self):
+        return InstrumentedConnectionPool(connection_class=FakeConnection, max_connections=2, timeout=0.05)
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_stats_report_connections_in_use(self, pool):
+        first = await pool.get_connection()
+        second = await pool.get_connection()
+        await pool.release(second)
+
+        stats = pool.stats()
+
+        assert stats["in_use"] == 1
+        assert stats["idle"] == 1
+        assert stats["saturation"] == 0.5
+        assert stats["peak_in_use"] == 2
+        assert stats["waits"] == 0
+        await pool.release(first)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_released_connection_are_counted(self, pool):
+        held = [await pool.get_connection(), await pool.get_connection()]
+
+        async def release_later():
+            await asyncio.sleep(0.01)
+            await pool.release(held[0])
+
+        release = asyncio.create_task(release_later())
+        connection = await pool.get_connection()
+        await release
+
+        stats = pool.stats()
+        assert connection is held[0]
+        assert stats["saturation"] == 1.0
+        assert stats["waits"] == 1
+        assert stats["wait_timeouts"] == 0
+        assert stats["wait_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_wait_timeouts_are_counted(self, pool):
+        await pool.get_connection()
+        await pool.get_connection()
+
+        with pytest.raises(redis.ConnectionError):
+            await pool.get_connection()
+
+        stats = pool.stats()
+        assert stats["wait_timeouts"] == 1
+        assert stats["waiting"] == 0
+
+
+class TestRedisPool:
+    """One pool and client per worker"""
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_requests_share_one_client_and_pool(self):
+        redis_pool = RedisPool()
+        with patch.object(redis_client, "REDIS_POOL", redis_pool):
+            first = get_redis()
+            second = get_redis()
+
+        assert first is second
+        assert first.connection_pool is redis_pool.pool
+        await redis_pool.close()
+        assert redis_pool.pool is None
+
+    def test_pool_uses_configured_limits(self):
+        redis_pool = RedisPool()
+        with patch.object(redis_client, "REDIS_MAX_CONNECTIONS", 7), \
+                patch.object(redis_client, "REDIS_HEALTH_CHECK_INTERVAL", 11), \
+                patch.object(redis_client, "REDIS_SOCKET_TIMEOUT", 3.0):
+            redis_pool.open()
+
+        assert redis_pool.pool.max_connections == 7
+        assert redis_pool.pool.connection_kwargs["health_check_interval"] == 11
+        assert redis_pool.pool.connection_kwargs["socket_timeout"] == 3.0
+        assert redis_pool.pool.connection_kwargs["decode_responses"] is True
+
+    def test_lifespan_closes_pool_and_metrics_endpoint(self):
+        with patch("src.backend.main.MCP_SESSION_POOL", AsyncMock()):
+            with TestClient(app) as client:
+                assert redis_client.REDIS_POOL.pool is not None
+                metrics = client.get("/metrics/redis").json()
+
+        assert metrics["max_connections"] == redis_client.REDIS_MAX_CONNECTIONS
+        assert metrics["in_use"] == 0
+        assert redis_client.REDIS_POOL.pool is None
@@ -0,0 +1,187 @@
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from unittest.mock import patch, AsyncMock
+from src.backend.rag.RAG_bot import stream_chat, aiter_stream_text, HISTORY_LEN
+from src.backend.main import app
+from src.backend.redis.redis_client import get_redis
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def sample_context():
+    """Sample retrieved documents"""
+    return [{"content": "Q1 earnings were strong at $100M"}]
+
+
+@pytest.fixture
+def mock_decide_route():
+    """Mock adecide_route function"""
+    with patch("src.backend.rag.RAG_bot.adecide_route", new_callable=AsyncMock) as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_retrieve_context():
+    """Mock aretrieve_context function"""
+    with patch("src.backend.rag.RAG_bot.aretrieve_context", new_callable=AsyncMock) as mock:
+        yield mock
+
+
+def make_chunk(content):
+    """A streamed chat completion chunk"""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+def fake_stream_answer(tokens):
+    """stream_answer stand-in, an async generator yielding the given tokens"""
+    async def stream_answer(**kwargs):
+        for token in tokens:
+            yield token
+    return stream_answer
+
+
+async def aiter_list(items):
+    for item in items:
+        yield item
+
+
+# ============================================================================
+# TESTS FOR stream_chat
+# ============================================================================
+
+class TestStreamChat:
+    """Test the events produced by stream_chat for each route"""
+
+    @pytest.mark.asyncio
+    async def test_general_route_streams_tokens(self, mock_decide_route):
+        mock_decide_route.return_value = "general"
+
+        with patch("src.backend.rag.RAG_bot.GeneralLLM.stream_answer", side_effect=fake_stream_answer(["Hel", "lo"])):
+            events = await collect(stream_chat("hi", [], mode="llm"))
+
+        assert events == [
+            {"type": "route", "mode": "general"},
+            {"type": "token", "content": "Hel"},
+            {"type": "token", "content": "lo"},
+            {"type": "done", "answer": "Hello", "mode": "general"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_rag_route_sends_sources_before_tokens(self, mock_decide_route, mock_retrieve_context, sample_context):
+        mock_decide_route.return_value = "rag"
+        mock_retrieve_context.return_value = sample_context
+
+        with patch("src.backend.rag.RAG_bot.RAGLLM.stream_answer", side_effect=fake_stream_answer(["$100M"])) as mock_stream:
+            events = await collect(stream_chat("Q1 earnings?", [], mode="rag"))
+
+        assert [e["type"] for e in events] == ["route", "sources", "token", "done"]
+        assert events[1]["retrieved"] == sample_context
+        assert events[-1] == {"type": "done", "answer": "$100M", "mode": "rag", "retrieved": sample_context}
+        assert mock_stream.call_args.kwargs["context"] == sample_context
+
+    @pytest.mark.asyncio
+    async def test_rag_route_without_context_returns_fallback(self, mock_decide_route, mock_retrieve_context):
+        mock_decide_route.return_value = "rag"
+        mock_retrieve_context.return_value = []
+
+        events = await collect(stream_chat("Q1 earnings?", [], mode="rag"))
+
+        assert events[-1]["retrieved"] == []
+        assert "couldn't find relevant information" in events[-1]["answer"]
+
+    @pytest.mark.asyncio
+    async def test_mcp_route_sends_whole_answer_once(self, mock_decide_route):
+        mock_decide_route.return_value = "mcp"
+
+        with patch("src.backend.rag.RAG_bot.answer_route", new_callable=AsyncMock) as mock_answer:
+            mock_answer.return_value = {"answer": "Created PROJ-1", "mode": "mcp"}
+            events = await collect(stream_chat("create a ticket", [], mode="mcp"))
+
+        assert events == [
+            {"type": "route", "mode": "mcp"},
+            {"type": "token", "content": "Created PROJ-1"},
+            {"type": "done", "answer": "Created PROJ-1", "mode": "mcp"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_aiter_stream_text_skips_empty_chunks(self):
+        stream = aiter_list([make_chunk(None), make_chunk("a"), SimpleNamespace(choices=[]), make_chunk("b")])
+
+        assert await collect(aiter_stream_text(stream)) == ["a", "b"]
+
+
+# ============================================================================
+# TESTS FOR POST /chats/{chat_id}/stream
+# ============================================================================
+
+class TestChatStreamEndpoint:
+    """Test the SSE endpoint stores the conversation and emits the events in order"""
+
+    @pytest.fixture
+    def store(self):
+        """Patch the redis chat store functions used by the endpoint"""
+        with patch("src.backend.backend_api.start_turn", new_callable=AsyncMock, return_value=[]) as start, \
+                patch("src.backend.backend_api.finish_turn", new_callable=AsyncMock, return_value=True) as finish, \
+                patch("src.backend.backend_api.CHAT_SUMMARISER") as summariser:
+            app.dependency_overrides[get_redis] = lambda: None
+            yield SimpleNamespace(start=start, finish=finish, summariser=summariser)
+            app.dependency_overrides.clear()
+
+    async def post(self, chat_id="abc"):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(f"/chats/{chat_id}/stream", json={"message": "hi there", "mode": "llm"})
+
+    @staticmethod
+    def parse_events(body: str) -> list[dict]:
+        return [json.loads(part[len("data: "):]) for part in body.split("\n\n") if part]
+
+    @pytest.mark.asyncio
+    async def test_streams_events_and_stores_answer(self, store):
+        async def fake_stream(**kwargs):
+            yield {"type": "route", "mode": "general"}
+            yield {"type": "token", "content": "Hello"}
+            yield {"type": "done", "answer": "Hello", "mode": "general"}
+
+        with patch("src.backend.backend_api.stream_chat", side_effect=fake_stream):
+            res = await self.post()
+
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        assert [e["type"] for e in self.parse_events(res.text)] == ["route", "token", "done"]
+        store.start.assert_awaited_once_with(None, "abc", "hi there", window=HISTORY_LEN)
+        store.finish.assert_awaited_once_with(None, "abc", "Hello", title="hi there")
+        store.summariser.schedule.assert_called_once_with(None, "abc")
+
+    @pytest.mark.asyncio
+    async def test_failure_sends_error_event_without_storing_answer(self, store):
+        async def failing_stream(**kwargs):
+            yield {"type": "route", "mode": "general"}
+            raise Exception("LLM failure")
+
+        with patch("src.backend.backend_api.stream_chat", side_effect=failing_stream):
+            res = await self.post()
+
+        events = self.parse_events(res.text)
+        assert events[-1]["type"] == "error"
+        store.start.assert_awaited_once()
+        store.finish.assert_not_called()
+        store.summariser.schedule.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_chat_returns_404(self, store):
+        store.start.return_value = None
+
+        res = await self.post("missing")
+
+        assert res.status_code == 404
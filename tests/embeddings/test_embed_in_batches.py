@@ -0,0 +1,174 @@
+import threading
+import time
+
+import httpx
+import pytest
+from openai import RateLimitError, BadRequestError
+from unittest.mock import Mock, patch
+
+from src.backend.rag.async_clients import ASYNC_CLIENTS
+from src.backend.rag.env import EMBEDDING_CLIENT
+from src.backend.rag.embedding_utils import (
+    make_batches,
+    embed_batch,
+    aembed_batch,
+    embed_in_batches,
+    estimate_tokens,
+)
+
+
+def make_response(vectors):
+    response = Mock()
+    response.data = [Mock(embedding=v, index=i) for i, v in enumerate(vectors)]
+    return response
+
+
+def echo_create(input, model):
+    """Fake embeddings.create that embeds each text as [len(text)]"""
+    return make_response([[float(len(text))] for text in input])
+
+
+def make_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://example.com/embeddings")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+# ==================== TEST make_batches ====================
+
+class TestMakeBatches:
+    def test_splits_by_item_count(self):
+        batches = make_batches(["a"] * 5, max_items=2, max_tokens=1000)
+        assert batches == [[0, 1], [2, 3], [4]]
+
+    def test_splits_by_estimated_tokens(self):
+        texts = ["x" * 400, "x" * 400, "x" * 400]  # ~101 tokens each
+        batches = make_batches(texts, max_items=100, max_tokens=250)
+        assert batches == [[0, 1], [2]]
+
+    def test_oversized_text_gets_its_own_batch(self):
+        texts = ["small", "x" * 10_000, "small"]
+        batches = make_batches(texts, max_items=100, max_tokens=100)
+        assert batches == [[0], [1], [2]]
+
+    def test_empty_input(self):
+        assert make_batches([]) == []
+
+    def test_estimate_tokens_is_positive(self):
+        assert estimate_tokens("") >= 1
+        assert estimate_tokens("x" * 400) >= 100
+
+
+# ==================== TEST embed_batch ====================
+
+class TestEmbedBatch:
+    @patch("src.backend.rag.embedding_utils.time.sleep")
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_retries_throttled_batch_honouring_retry_after(self, mock_embedding_client, mock_sleep):
+        mock_embedding_client.embeddings.create.side_effect = [
+            make_error(RateLimitError, 429, {"retry-after": "7"}),
+            make_response([[1.0]]),
+        ]
+
+        result = embed_batch(["text"])
+
+        assert result == [[1.0]]
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch("src.backend.rag.embedding_utils.time.sleep")
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_raises_after_max_retries(self, mock_embedding_client, mock_sleep):
+        mock_embedding_client.embeddings.create.side_effect = make_error(RateLimitError, 429)
+
+        with pytest.raises(RateLimitError):
+            embed_batch(["text"], max_retries=2)
+
+        assert mock_embedding_client.embeddings.create.call_count == 3
+
+    @patch("src.backend.rag.embedding_utils.time.sleep")
+    def test_total_requests_are_capped_by_max_retries(self, mock_sleep):
+        """The SDK doesn't retry on top of embed_batch, so a failing batch sends max_retries + 1 requests."""
+        requests = []
+
+        def throttled(request):
+            requests.append(request)
+            return httpx.Response(429, json={"error": {"message": "slow down"}})
+
+        client = EMBEDDING_CLIENT.with_options(http_client=httpx.Client(transport=httpx.MockTransport(throttled)))
+        with patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT", client):
+            with pytest.raises(RateLimitError):
+                embed_batch(["text"], max_retries=2)
+
+        assert len(requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_async_total_requests_are_capped_by_max_retries(self):
+        requests = []
+
+        def throttled(request):
+            requests.append(request)
+            return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {"message": "slow down"}})
+
+        transport = httpx.MockTransport(throttled)
+        client = ASYNC_CLIENTS.embeddings.with_options(http_client=httpx.AsyncClient(transport=transport))
+        with patch("src.backend.rag.embedding_utils.ASYNC_CLIENTS", Mock(embeddings=client)):
+            with pytest.raises(RateLimitError):
+                await aembed_batch(["text"], max_retries=2)
+
+        assert len(requests) == 3
+        await ASYNC_CLIENTS.close()
+
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_does_not_retry_bad_requests(self, mock_embedding_client):
+        mock_embedding_client.embeddings.create.side_effect = make_error(BadRequestError, 400)
+
+        with pytest.raises(BadRequestError):
+            embed_batch(["text"])
+
+        mock_embedding_client.embeddings.create.assert_called_once()
+
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_reorders_by_response_index(self, mock_embedding_client):
+        response = Mock()
+        response.data = [Mock(embedding=[2.0], index=1), Mock(embedding=[1.0], index=0)]
+        mock_embedding_client.embeddings.create.return_value = response
+
+        assert embed_batch(["a", "b"]) == [[1.0], [2.0]]
+
+
+# ==================== TEST embed_in_batches ====================
+
+class TestEmbedInBatches:
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_results_are_reassembled_in_order(self, mock_embedding_client):
+        mock_embedding_client.embeddings.create.side_effect = echo_create
+        texts = ["x" * n for n in range(1, 11)]
+
+        with patch("src.backend.rag.embedding_utils.make_batches", side_effect=lambda t: [[i] for i in range(len(t))]):
+            result = embed_in_batches(texts, concurrency=4)
+
+        assert result == [[float(n)] for n in range(1, 11)]
+        assert mock_embedding_client.embeddings.create.call_count == 10
+
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_concurrency_is_capped(self, mock_embedding_client):
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_create(input, model):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return echo_create(input, model)
+
+        mock_embedding_client.embeddings.create.side_effect = slow_create
+
+        with patch("src.backend.rag.embedding_utils.make_batches", side_effect=lambda t: [[i] for i in range(len(t))]):
+            embed_in_batches(["a"] * 12, concurrency=3)
+
+        assert 1 < peak <= 3
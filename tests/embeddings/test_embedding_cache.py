@@ -0,0 +1,175 @@
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, MagicMock, AsyncMock, patch
+
+from src.backend.rag.embedding_cache import (
+    EmbeddingCache,
+    LocalEmbeddingStore,
+    embedding_key,
+)
+from src.backend.rag.embedding_utils import generate_embeddings, agenerate_embeddings
+
+
+DIMS = 4
+
+
+# ==================== FIXTURES ====================
+
+@pytest.fixture
+def local_store(tmp_path):
+    return LocalEmbeddingStore(str(tmp_path), "text-embedding-3-large", DIMS)
+
+
+@pytest.fixture
+def vectors():
+    return {
+        embedding_key("model", "a"): np.array([0.1, 0.2, 0.3, 0.4]),
+        embedding_key("model", "b"): np.array([0.5, 0.6, 0.7, 0.8]),
+    }
+
+
+def make_response(vectors):
+    response = Mock()
+    response.data = [Mock(embedding=v) for v in vectors]
+    return response
+
+
+# ==================== TEST embedding_key ====================
+
+class TestEmbeddingKey:
+    def test_same_model_and_text_give_same_key(self):
+        assert embedding_key("m", "text") == embedding_key("m", "text")
+
+    def test_model_is_part_of_key(self):
+        assert embedding_key("m1", "text") != embedding_key("m2", "text")
+
+
+# ==================== TEST LocalEmbeddingStore ====================
+
+class TestLocalEmbeddingStore:
+    def test_round_trip(self, local_store, vectors):
+        local_store.put_many(vectors)
+        result = local_store.get_many(list(vectors))
+        for key, vector in vectors.items():
+            np.testing.assert_allclose(result[key], vector, rtol=1e-6)
+
+    def test_persists_between_instances(self, tmp_path, local_store, vectors):
+        local_store.put_many(vectors)
+        reopened = LocalEmbeddingStore(str(tmp_path), "text-embedding-3-large", DIMS)
+        assert set(reopened.get_many(list(vectors))) == set(vectors)
+
+    def test_sees_rows_written_by_another_instance(self, tmp_path, local_store, vectors):
+        """Two processes sharing a directory shouldn't overwrite each other's rows."""
+        other = LocalEmbeddingStore(str(tmp_path), "text-embedding-3-large", DIMS)
+        first, second = list(vectors.items())
+        local_store.put_many(dict([first]))
+        other.put_many(dict([second]))
+        local_store.put_many({embedding_key("model", "c"): np.ones(DIMS)})
+
+        reopened = LocalEmbeddingStore(str(tmp_path), "text-embedding-3-large", DIMS)
+        assert len(reopened.rows) == 3
+        np.testing.assert_allclose(reopened.get_many([second[0]])[second[0]], second[1], rtol=1e-6)
+
+    def test_ignores_partially_written_row(self, tmp_path, local_store, vectors):
+        local_store.put_many(vectors)
+        # simulate a writer crashing half way through a row
+        with open(local_store.data_path, "ab") as f:
+            f.write(b"\x00" * 3)
+        reopened = LocalEmbeddingStore(str(tmp_path), "text-embedding-3-large", DIMS)
+        reopened.put_many({embedding_key("model", "c"): np.ones(DIMS)})
+        result = reopened.get_many([embedding_key("model", "c")])
+        np.testing.assert_allclose(result[embedding_key("model", "c")], np.ones(DIMS))
+
+    def test_float16_storage(self, tmp_path, vectors):
+        store = LocalEmbeddingStore(str(tmp_path), "model", DIMS, dtype="float16")
+        store.put_many(vectors)
+        result = store.get_many(list(vectors))
+        for key, vector in vectors.items():
+            np.testing.assert_allclose(result[key], vector, atol=1e-3)
+
+
+# ==================== TEST EmbeddingCache ====================
+
+class TestEmbeddingCache:
+    def test_later_store_hits_are_copied_to_earlier_stores(self, vectors):
+        first = MagicMock()
+        first.get_many.return_value = {}
+        second = MagicMock()
+        second.get_many.return_value = vectors
+
+        cache = EmbeddingCache([first, second])
+        result = cache.get_many(list(vectors))
+
+        assert set(result) == set(vectors)
+        first.put_many.assert_called_once_with(vectors)
+
+    def test_store_errors_are_misses(self):
+        store = MagicMock()
+        store.get_many.side_effect = ConnectionError("redis down")
+        assert EmbeddingCache([store]).get_many(["key"]) == {}
+
+    def test_no_stores_never_hits(self):
+        assert EmbeddingCache().get_many(["key"]) == {}
+
+
+# ==================== TEST generate_embeddings with cache ====================
+
+class TestGenerateEmbeddingsCache:
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_only_misses_reach_the_api(self, mock_embedding_client, local_store):
+        with patch("src.backend.rag.embedding_utils.EMBEDDING_CACHE", EmbeddingCache([local_store])):
+            mock_embedding_client.embeddings.create.return_value = make_response([[1.0] * DIMS, [2.0] * DIMS])
+            first = generate_embeddings(["a", "b"])
+
+            mock_embedding_client.embeddings.create.return_value = make_response([[3.0] * DIMS])
+            second = generate_embeddings(["b", "c", "a"])
+
+        assert first == [[1.0] * DIMS, [2.0] * DIMS]
+        assert second == [[2.0] * DIMS, [3.0] * DIMS, [1.0] * DIMS]
+        assert mock_embedding_client.embeddings.create.call_count == 2
+        assert mock_embedding_client.embeddings.create.call_args.kwargs["input"] == ["c"]
+
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_unchanged_corpus_makes_no_calls(self, mock_embedding_client, local_store):
+        with patch("src.backend.rag.embedding_utils.EMBEDDING_CACHE", EmbeddingCache([local_store])):
+            mock_embedding_client.embeddings.create.return_value = make_response([[1.0] * DIMS, [2.0] * DIMS])
+            generate_embeddings(["a", "b"])
+            generate_embeddings(["a", "b"])
+
+        mock_embedding_client.embeddings.create.assert_called_once()
+
+    @patch("src.backend.rag.embedding_utils.EMBEDDING_CLIENT")
+    def test_duplicate_texts_are_embedded_once(self, mock_embedding_client):
+        with patch("src.backend.rag.embedding_utils.EMBEDDING_CACHE", EmbeddingCache()):
+            mock_embedding_client.embeddings.create.return_value = make_response([[1.0] * DIMS])
+            result = generate_embeddings(["same", "same"])
+
+        assert result == [[1.0] * DIMS, [1.0] * DIMS]
+        assert mock_embedding_client.embeddings.create.call_args.kwargs["input"] == ["same"]
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.embedding_utils.ASYNC_CLIENTS")
+    async def test_async_cache_calls_run_off_the_event_loop(self, mock_clients, local_store):
+        """The blocking cache reads and writes of agenerate_embeddings shouldn't run on the loop's thread"""
+        threads = []
+
+        class RecordingStore:
+            def get_many(self, keys):
+                threads.append(threading.get_ident())
+                return local_store.get_many(keys)
+
+            def put_many(self, items):
+                threads.append(threading.get_ident())
+                local_store.put_many(items)
+
+        mock_clients.embeddings.embeddings.create = AsyncMock(return_value=make_response([[1.0] * DIMS]))
+        with patch("src.backend.rag.embedding_utils.EMBEDDING_CACHE", EmbeddingCache([RecordingStore()])):
+            first = await agenerate_embeddings(["a"])
+            second = await agenerate_embeddings(["a"])
+
+        assert first == second == [[1.0] * DIMS]
+        mock_clients.embeddings.embeddings.create.assert_awaited_once()
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
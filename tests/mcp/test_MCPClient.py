@@ -41,8 +41,8 @@ class TestInit:
 
 class TestConnectToServer:
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.clients.MCPClient.ClientSession")
-	@patch("src.rag_chatbot.mcp.servers.clients.MCPClient.stdio_client")
+	@patch("src.backend.mcp.servers.clients.MCPClient.ClientSession")
+	@patch("src.backend.mcp.servers.clients.MCPClient.stdio_client")
 	async def test_connect_to_server_initializes_session_and_lists_tools(
 		self,
 		mock_stdio_client,
@@ -67,7 +67,7 @@ class TestConnectToServer:
 		session_cm.__aenter__.return_value = session_instance
 		mock_client_session.return_value = session_cm
 
-		await mcp_client.connect_to_server("rag_chatbot.mcp.servers.jira_server")
+		await mcp_client.connect_to_server("src.backend.mcp.servers.jira_server")
 
 		# stdio_client should be called with StdioServerParameters
 		mock_stdio_client.assert_called_once()
@@ -108,7 +108,7 @@ class TestProcessQuery:
 		response.output = [message_item]
 		response.id = "resp-1"
 
-		client_mock = MagicMock()
+		client_mock = AsyncMock()
 		client_mock.responses.create.return_value = response
 		mcp_client.client = client_mock
 
@@ -166,7 +166,7 @@ class TestProcessQuery:
 		second_response.output = [message_item]
 		second_response.id = "resp-2"
 
-		client_mock = MagicMock()
+		client_mock = AsyncMock()
 		# First call -> tool call, second call -> final message
 		client_mock.responses.create.side_effect = [first_response, second_response]
 		mcp_client.client = client_mock
@@ -195,6 +195,113 @@ class TestProcessQuery:
 		assert result == "Final answer after tool call."
 
 
+# ==================== TEST parallel tool calls ====================
+
+
+def make_tool_call(call_id, name="slow_tool", arguments=None):
+	item = MagicMock()
+	item.type = "function_call"
+	item.name = name
+	item.arguments = json.dumps(arguments or {})
+	item.call_id = call_id
+	return item
+
+
+def make_message_response(text):
+	part = MagicMock()
+	part.type = "output_text"
+	part.text = text
+	item = MagicMock()
+	item.type = "message"
+	item.content = [part]
+	response = MagicMock()
+	response.output = [item]
+	response.id = "resp-final"
+	return response
+
+
+class TestParallelToolCalls:
+	@pytest.fixture
+	def client_with_calls(self, mcp_client):
+		"""Client whose model asks for five tool calls in one turn, then answers."""
+		tool = MagicMock()
+		tool.name = "slow_tool"
+		tool.description = "desc"
+		tool.inputSchema = {"type": "object", "properties": {}}
+		session = AsyncMock()
+		session.list_tools.return_value = MagicMock(tools=[tool])
+		mcp_client.session = session
+
+		first_response = MagicMock()
+		first_response.output = [make_tool_call(f"call-{i}", arguments={"i": i}) for i in range(5)]
+		first_response.id = "resp-1"
+		mcp_client.client = AsyncMock()
+		mcp_client.client.responses.create.side_effect = [first_response, make_message_response("done")]
+		return mcp_client
+
+	@staticmethod
+	def outputs(mcp_client):
+		return mcp_client.client.responses.create.call_args_list[1].kwargs["input"]
+
+	@pytest.mark.asyncio
+	async def test_calls_of_one_turn_run_concurrently_in_order(self, client_with_calls):
+		"""Five calls should take about one call's time and their outputs keep the call order."""
+		async def call_tool(name, args):
+			# later calls finish first
+			await asyncio.sleep(0.2 - args["i"] * 0.03)
+			return MagicMock(content=f"result-{args['i']}")
+		client_with_calls.session.call_tool.side_effect = call_tool
+
+		start = asyncio.get_running_loop().time()
+		await client_with_calls.process_query("create five tickets")
+		elapsed = asyncio.get_running_loop().time() - start
+
+		assert elapsed < 0.5
+		outputs = self.outputs(client_with_calls)
+		assert [o["call_id"] for o in outputs] == [f"call-{i}" for i in range(5)]
+		assert [o["output"] for o in outputs] == [f"result-{i}" for i in range(5)]
+
+	@pytest.mark.asyncio
+	async def test_concurrency_is_limited(self, client_with_calls):
+		"""No more than tool_slots calls should be in flight at once."""
+		client_with_calls.tool_slots = asyncio.Semaphore(2)
+		in_flight = []
+		peak = []
+
+		async def call_tool(name, args):
+			in_flight.append(args["i"])
+			peak.append(len(in_flight))
+			await asyncio.sleep(0.02)
+			in_flight.remove(args["i"])
+			return MagicMock(content="ok")
+		client_with_calls.session.call_tool.side_effect = call_tool
+
+		await client_with_calls.process_query("create five tickets")
+
+		assert max(peak) == 2
+
+	@pytest.mark.asyncio
+	@patch("src.backend.mcp.servers.clients.MCPClient.MCP_TOOL_TIMEOUT", 0.1)
+	async def test_slow_or_failing_call_does_not_affect_others(self, client_with_calls):
+		"""A timed out call and a failed call become error outputs, the other calls still succeed."""
+		async def call_tool(name, args):
+			if args["i"] == 1:
+				await asyncio.sleep(1)
+			if args["i"] == 3:
+				raise RuntimeError("jira down")
+			return MagicMock(content=f"result-{args['i']}")
+		client_with_calls.session.call_tool.side_effect = call_tool
+
+		result = await client_with_calls.process_query("create five tickets")
+
+		outputs = [o["output"] for o in self.outputs(client_with_calls)]
+		assert outputs[0] == "result-0"
+		assert "timed out" in outputs[1]
+		assert "jira down" in outputs[3]
+		assert outputs[4] == "result-4"
+		assert result == "done"
+
+
 # ==================== TEST cleanup ====================
 
 
@@ -1,6 +1,9 @@
 import asyncio
+from contextlib import asynccontextmanager
 
+import httpx
 import pytest
+from aiohttp import web
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.backend.mcp.servers import jira_server
@@ -10,7 +13,8 @@ from src.backend.mcp.servers.jira_server import (
 	get_all_projects,
 	list_jira_projects,
 	create_jira_issue,
-	JIRA_API_BASE,
+	create_jira_issues_bulk,
+	JiraIssue,
 )
 
 
@@ -59,117 +63,318 @@ class TestJiraDescription:
 		assert inner["text"] == text
 
 
+# ==================== FAKE JIRA ====================
+
+
+class FakeJira:
+	"""Local stand-in for the Jira REST API that records requests and the connections they came on."""
+
+	def __init__(self):
+		self.requests = []
+		self.connections = set()
+		self.rate_limited = 0
+		self.next_id = 1
+		self.fail_summary = None
+		self.projects = [{"key": "KAN", "name": "Kanban", "id": "1"}]
+		self.page_size = 50
+		self.etag = '"v1"'
+		# number of requests answered only after the client has timed out
+		self.slow = 0
+
+	def record(self, request, body=None):
+		self.requests.append((request.method, request.path, body))
+		self.connections.add(request.transport.get_extra_info("peername"))
+
+	def rate_limit(self):
+		self.rate_limited -= 1
+		return web.json_response({"errorMessages": ["Rate limit exceeded"]}, status=429, headers={"Retry-After": "0"})
+
+	def create(self, fields):
+		key = f"{fields['project']['key']}-{self.next_id}"
+		self.next_id += 1
+		return {"id": str(self.next_id), "key": key, "self": f"/rest/api/3/issue/{key}"}
+
+	async def respond_late(self):
+		if self.slow:
+			self.slow -= 1
+			await asyncio.sleep(1)
+
+	async def issue(self, request):
+		body = await request.json()
+		self.record(request, body)
+		if request.headers.get("Authorization") is None:
+			return web.json_response({"errorMessages": ["Unauthorized"]}, status=401)
+		issue = self.create(body["fields"])
+		await self.respond_late()
+		return web.json_response(issue, status=201)
+
+	async def bulk(self, request):
+		body = await request.json()
+		self.record(request, body)
+		if self.rate_limited:
+			return self.rate_limit()
+		issues, errors = [], []
+		for i, update in enumerate(body["issueUpdates"]):
+			if update["fields"]["summary"] == self.fail_summary:
+				errors.append({
+					"status": 400,
+					"failedElementNumber": i,
+					"elementErrors": {"errorMessages": [], "errors": {"summary": "Summary is invalid"}},
+				})
+			else:
+				issues.append(self.create(update["fields"]))
+		return web.json_response({"issues": issues, "errors": errors}, status=201)
+
+	async def project_search(self, request):
+		"""Pages of page_size projects, linked through nextPage like Jira's /project/search"""
+		self.record(request)
+		await self.respond_late()
+		if self.rate_limited:
+			return self.rate_limit()
+		if request.headers.get("If-None-Match") == self.etag:
+			return web.Response(status=304, headers={"ETag": self.etag})
+		start = int(request.query.get("startAt", 0))
+		end = start + self.page_size
+		page = {"startAt": start, "values": self.projects[start:end], "isLast": end >= len(self.projects)}
+		if not page["isLast"]:
+			page["nextPage"] = str(request.url.with_query({"startAt": end}))
+		return web.json_response(page, headers={"ETag": self.etag})
+
+
+@asynccontextmanager
+async def fake_jira(monkeypatch):
+	"""Run a FakeJira on a local port and point jira_server's shared client at it"""
+	jira = FakeJira()
+	server = web.Application()
+	server.router.add_post("/rest/api/3/issue", jira.issue)
+	server.router.add_post("/rest/api/3/issue/bulk", jira.bulk)
+	server.router.add_get("/rest/api/3/project/search", jira.project_search)
+	runner = web.AppRunner(server)
+	await runner.setup()
+	site = web.TCPSite(runner, "127.0.0.1", 0)
+	await site.start()
+	port = site._server.sockets[0].getsockname()[1]
+	monkeypatch.setattr(jira_server, "JIRA_API_BASE", f"http://127.0.0.1:{port}/rest/api/3")
+	monkeypatch.setattr(jira_server, "JIRA_RETRY_BASE_DELAY", 0.0)
+	monkeypatch.setattr(jira_server, "_jira_client", None)
+	monkeypatch.setattr(jira_server, "PROJECT_CACHE", jira_server.ProjectCache())
+	try:
+		yield jira
+	finally:
+		await jira_server.close_jira_client()
+		await runner.cleanup()
+
+
 # ==================== TEST make_jira_issue_request ====================
 
 
 class TestMakeJiraIssueRequest:
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.httpx.AsyncClient")
 	async def test_success_returns_json_response(
 		self,
-		mock_async_client_cls,
+		monkeypatch,
 		sample_proj_key,
 		sample_summary,
 		sample_description,
 	):
-		"""On success, make_jira_issue_request should return response.json() and call Jira with expected payload."""
-		# Setup AsyncClient context manager
-		client = AsyncMock()
-		response = MagicMock()
-		response.json.return_value = {"key": "KAN-123"}
-		response.raise_for_status.return_value = None
-		client.post = AsyncMock(return_value=response)
-
-		cm = AsyncMock()
-		cm.__aenter__.return_value = client
-		cm.__aexit__.return_value = None
-		mock_async_client_cls.return_value = cm
-
-		with patch(
-			"src.rag_chatbot.mcp.servers.jira_server.jira_description",
-			return_value={"formatted": True},
-		) as mock_jira_desc:
+		"""On success, make_jira_issue_request should return the created issue and send the expected payload."""
+		async with fake_jira(monkeypatch) as jira:
 			result = await make_jira_issue_request(
 				proj_key=sample_proj_key,
 				summary=sample_summary,
 				description=sample_description,
 			)
 
-		# Returned JSON
-		assert result == {"key": "KAN-123"}
+		assert result["key"] == "KAN-1"
 
-		# Correct URL and payload
-		client.post.assert_awaited_once()
-		call_kwargs = client.post.call_args.kwargs
-		assert call_kwargs["url"] == f"{JIRA_API_BASE}/issue"
-		assert call_kwargs["headers"]["Accept"] == "application/json"
-		assert call_kwargs["headers"]["Content-Type"] == "application/json"
-
-		payload = call_kwargs["json"]
+		method, path, payload = jira.requests[0]
+		assert (method, path) == ("POST", "/rest/api/3/issue")
 		assert payload["fields"]["project"]["key"] == sample_proj_key
 		assert payload["fields"]["summary"] == sample_summary
 		assert payload["fields"]["issuetype"]["name"] == "Task"
-		mock_jira_desc.assert_called_once_with(sample_description)
-		assert payload["fields"]["description"] == {"formatted": True}
+		assert payload["fields"]["description"] == jira_description(sample_description)
 
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.httpx.AsyncClient")
-	async def test_error_returns_string_message(self, mock_async_client_cls):
-		"""If the HTTP call raises, make_jira_issue_request should return the exception string."""
-		client = AsyncMock()
-		client.post = AsyncMock(side_effect=Exception("boom"))
-
-		cm = AsyncMock()
-		cm.__aenter__.return_value = client
-		cm.__aexit__.return_value = None
-		mock_async_client_cls.return_value = cm
-
-		result = await make_jira_issue_request(
-			proj_key="KAN",
-			summary="S",
-			description="D",
-		)
+	async def test_requests_share_one_connection(self, monkeypatch):
+		"""Consecutive requests should reuse the pooled keep-alive connection instead of reconnecting."""
+		async with fake_jira(monkeypatch) as jira:
+			for i in range(5):
+				await make_jira_issue_request(proj_key="KAN", summary=f"S{i}", description="D")
+			await get_all_projects()
+
+		assert len(jira.requests) == 6
+		assert len(jira.connections) == 1
+
+	@pytest.mark.asyncio
+	async def test_error_returns_string_message(self, monkeypatch):
+		"""If the HTTP call fails, make_jira_issue_request should return the exception string."""
+		with patch.object(jira_server, "get_jira_client", side_effect=httpx.ConnectError("boom")):
+			result = await make_jira_issue_request(
+				proj_key="KAN",
+				summary="S",
+				description="D",
+			)
 
 		assert "boom" in result
 
 
-# ==================== TEST get_all_projects ====================
+# ==================== TEST jira_request retries ====================
 
 
-class TestGetAllProjects:
+class TestJiraRequestRetries:
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.httpx.AsyncClient")
-	async def test_success_returns_json(self, mock_async_client_cls):
-		"""On success, get_all_projects should return the JSON body."""
-		client = AsyncMock()
-		response = MagicMock()
-		response.json.return_value = {"values": []}
-		response.raise_for_status.return_value = None
-		client.get = AsyncMock(return_value=response)
+	async def test_rate_limited_request_is_retried(self, monkeypatch):
+		"""A 429 should be retried after Retry-After instead of failing the tool call."""
+		async with fake_jira(monkeypatch) as jira:
+			jira.rate_limited = 2
+			with patch.object(jira_server.asyncio, "sleep", new_callable=AsyncMock) as sleep:
+				result = await get_all_projects()
 
-		cm = AsyncMock()
-		cm.__aenter__.return_value = client
-		cm.__aexit__.return_value = None
-		mock_async_client_cls.return_value = cm
+		assert result["values"][0]["key"] == "KAN"
+		assert len(jira.requests) == 3
+		assert [call.args[0] for call in sleep.await_args_list] == [0.0, 0.0]
 
-		result = await get_all_projects()
+	@pytest.mark.asyncio
+	async def test_retries_are_logged_to_stderr(self, monkeypatch, capsys):
+		"""stdout carries the MCP JSON-RPC messages, so retry logs must not be written to it."""
+		async with fake_jira(monkeypatch) as jira:
+			jira.rate_limited = 1
+			await get_all_projects()
 
-		assert result == {"values": []}
-		client.get.assert_awaited_once()
+		captured = capsys.readouterr()
+		assert captured.out == ""
+		assert "retrying" in captured.err
 
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.httpx.AsyncClient")
-	async def test_error_returns_string(self, mock_async_client_cls):
-		"""If the HTTP call fails, get_all_projects should return the exception string."""
-		client = AsyncMock()
-		client.get = AsyncMock(side_effect=Exception("nope"))
+	async def test_gives_up_after_max_retries(self, monkeypatch):
+		"""Once retries run out the 429 should be returned as an error."""
+		monkeypatch.setattr(jira_server, "JIRA_MAX_RETRIES", 1)
+		async with fake_jira(monkeypatch) as jira:
+			jira.rate_limited = 5
+			result = await get_all_projects()
+
+		assert "429" in result
+		assert len(jira.requests) == 2
+
+	@pytest.mark.asyncio
+	async def test_timed_out_post_is_not_retried(self, monkeypatch):
+		"""A POST that times out after Jira created the issue must not be sent again and create a duplicate."""
+		monkeypatch.setattr(jira_server, "JIRA_TIMEOUT", 0.2)
+		async with fake_jira(monkeypatch) as jira:
+			jira.slow = 1
+			result = await make_jira_issue_request(proj_key="KAN", summary="Once", description="D")
+
+		assert isinstance(result, str)
+		assert len(jira.requests) == 1
+		assert jira.next_id == 2
+
+	@pytest.mark.asyncio
+	async def test_timed_out_get_is_retried(self, monkeypatch):
+		"""Reading the project list again is harmless, so a timed out GET is retried."""
+		monkeypatch.setattr(jira_server, "JIRA_TIMEOUT", 0.2)
+		async with fake_jira(monkeypatch) as jira:
+			jira.slow = 1
+			result = await get_all_projects()
+
+		assert result["values"][0]["key"] == "KAN"
+		assert len(jira.requests) == 2
+
+	@pytest.mark.asyncio
+	async def test_post_is_retried_when_connection_fails(self, monkeypatch):
+		"""A POST that never reached Jira is safe to send again."""
+		created = httpx.Response(201, json={"key": "KAN-1"}, request=httpx.Request("POST", "http://jira/issue"))
+		client = MagicMock()
+		client.request = AsyncMock(side_effect=[httpx.ConnectError("refused"), created])
+		monkeypatch.setattr(jira_server, "JIRA_RETRY_BASE_DELAY", 0.0)
+		with patch.object(jira_server, "get_jira_client", return_value=client):
+			result = await make_jira_issue_request(proj_key="KAN", summary="S", description="D")
+
+		assert result == {"key": "KAN-1"}
+		assert client.request.await_count == 2
+
+	def test_retry_after_formats(self):
+		"""Retry-After may be a number of seconds or an HTTP date."""
+		def response(value):
+			return httpx.Response(429, headers={"Retry-After": value} if value else {})
+
+		assert jira_server.retry_after_seconds(response("7")) == 7.0
+		assert jira_server.retry_after_seconds(response("Wed, 21 Oct 2015 07:28:00 GMT")) == 0.0
+		assert jira_server.retry_after_seconds(response("soon")) is None
+		assert jira_server.retry_after_seconds(response(None)) is None
+
+
+# ==================== TEST create_jira_issues_bulk (MCP tool) ====================
+
+
+class TestCreateJiraIssuesBulk:
+	@pytest.mark.asyncio
+	async def test_issues_are_created_in_batches(self, monkeypatch):
+		"""More issues than the bulk limit should be split into several /issue/bulk requests."""
+		monkeypatch.setattr(jira_server, "JIRA_BULK_LIMIT", 2)
+		monkeypatch.setattr(jira_server, "JIRA_DOMAIN", "example-domain")
+		issues = [JiraIssue(summary=f"S{i}", description="D", proj_key="KAN") for i in range(5)]
+
+		async with fake_jira(monkeypatch) as jira:
+			result = await create_jira_issues_bulk(issues)
+
+		batches = [len(body["issueUpdates"]) for _, path, body in jira.requests]
+		assert sorted(batches) == [1, 2, 2]
+		assert all(path == "/rest/api/3/issue/bulk" for _, path, _ in jira.requests)
+		lines = result.splitlines()
+		assert [line.split('"')[1] for line in lines[:5]] == ["S0", "S1", "S2", "S3", "S4"]
+		assert "https://example-domain.atlassian.net//browse/KAN-" in lines[0]
+		assert lines[-1] == "5 of 5 Jira issues created"
+
+	@pytest.mark.asyncio
+	async def test_failed_issues_are_reported(self, monkeypatch):
+		"""Issues Jira rejects should be reported next to the ones it created."""
+		issues = [JiraIssue(summary=s, description="D", proj_key="KAN") for s in ("ok", "bad", "also ok")]
+
+		async with fake_jira(monkeypatch) as jira:
+			jira.fail_summary = "bad"
+			result = await create_jira_issues_bulk(issues)
+
+		lines = result.splitlines()
+		assert "KAN-1" in lines[0]
+		assert lines[1] == '"bad": failed, Summary is invalid'
+		assert "KAN-2" in lines[2]
+		assert lines[-1] == "2 of 3 Jira issues created"
+
+	@pytest.mark.asyncio
+	async def test_rate_limited_bulk_request_is_retried(self, monkeypatch):
+		"""A rate limited bulk request should be sent again rather than losing the batch."""
+		issues = [JiraIssue(summary="S", description="D", proj_key="KAN")]
+
+		async with fake_jira(monkeypatch) as jira:
+			jira.rate_limited = 1
+			result = await create_jira_issues_bulk(issues)
+
+		assert len(jira.requests) == 2
+		assert result.splitlines()[-1] == "1 of 1 Jira issues created"
+
+	@pytest.mark.asyncio
+	async def test_no_issues(self):
+		assert await create_jira_issues_bulk([]) == "No issues to create"
+
+
+# ==================== TEST get_all_projects ====================
+
+
+class TestGetAllProjects:
+	@pytest.mark.asyncio
+	async def test_success_returns_json(self, monkeypatch):
+		"""On success, get_all_projects should return the JSON body."""
+		async with fake_jira(monkeypatch) as jira:
+			result = await get_all_projects()
 
-		cm = AsyncMock()
-		cm.__aenter__.return_value = client
-		cm.__aexit__.return_value = None
-		mock_async_client_cls.return_value = cm
+		assert result["values"] == [{"key": "KAN", "name": "Kanban", "id": "1"}]
+		assert jira.requests[0][:2] == ("GET", "/rest/api/3/project/search")
 
-		result = await get_all_projects()
+	@pytest.mark.asyncio
+	async def test_error_returns_string(self):
+		"""If the HTTP call fails, get_all_projects should return the exception string."""
+		with patch.object(jira_server, "jira_request", new_callable=AsyncMock, side_effect=Exception("nope")):
+			result = await get_all_projects()
 
 		assert "nope" in result
 
@@ -179,34 +384,122 @@ class TestGetAllProjects:
 
 class TestListJiraProjects:
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.get_all_projects", new_callable=AsyncMock)
-	async def test_returns_simplified_project_list(self, mock_get_all_projects):
+	async def test_returns_simplified_project_list(self, monkeypatch):
 		"""list_jira_projects should transform raw project JSON into a simplified list."""
-		mock_get_all_projects.return_value = {
-			"values": [
+		async with fake_jira(monkeypatch) as jira:
+			jira.projects = [
 				{"key": "KAN", "name": "Kanban", "id": "1", "other": "x"},
 				{"key": "ENG", "name": "Engineering", "id": "2", "foo": "bar"},
 			]
-		}
-
-		result = await list_jira_projects()
+			result = await list_jira_projects()
 
 		assert isinstance(result, list)
 		assert result == [
 			{"key": "KAN", "name": "Kanban", "id": "1"},
 			{"key": "ENG", "name": "Engineering", "id": "2"},
 		]
-		mock_get_all_projects.assert_awaited_once()
 
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.get_all_projects", new_callable=AsyncMock)
-	async def test_handles_falsy_response(self, mock_get_all_projects):
-		"""If Jira returns no data, list_jira_projects should return an error string."""
-		mock_get_all_projects.return_value = None
-
-		result = await list_jira_projects()
+	async def test_handles_failed_request(self, monkeypatch, capsys):
+		"""If Jira can't be reached, list_jira_projects should return an error string and log off stdout."""
+		monkeypatch.setattr(jira_server, "PROJECT_CACHE", jira_server.ProjectCache())
+		with patch.object(jira_server, "jira_request", new_callable=AsyncMock, side_effect=httpx.ConnectError("down")):
+			result = await list_jira_projects()
 
 		assert result == "Unable to make Jira Request"
+		captured = capsys.readouterr()
+		assert captured.out == ""
+		assert "Unable to list Jira projects" in captured.err
+
+	@pytest.mark.asyncio
+	async def test_follows_every_page(self, monkeypatch):
+		"""Sites with more projects than a page should be listed in full."""
+		async with fake_jira(monkeypatch) as jira:
+			jira.projects = [{"key": f"P{i}", "name": f"Project {i}", "id": str(i)} for i in range(230)]
+			result = await list_jira_projects()
+
+		assert [p["key"] for p in result] == [f"P{i}" for i in range(230)]
+		assert len(jira.requests) == 5
+
+	@pytest.mark.asyncio
+	async def test_later_calls_answer_from_memory(self, monkeypatch):
+		"""Within the TTL, list_jira_projects shouldn't call Jira again."""
+		async with fake_jira(monkeypatch) as jira:
+			first = await list_jira_projects()
+			for _ in range(10):
+				assert await list_jira_projects() is first
+
+		assert len(jira.requests) == 1
+
+	@pytest.mark.asyncio
+	async def test_concurrent_first_calls_fetch_once(self, monkeypatch):
+		"""Calls made while the first fetch is running should wait for it instead of fetching again."""
+		async with fake_jira(monkeypatch) as jira:
+			results = await asyncio.gather(*(list_jira_projects() for _ in range(5)))
+
+		assert all(result == results[0] for result in results)
+		assert len(jira.requests) == 1
+
+
+# ==================== TEST ProjectCache ====================
+
+
+class TestProjectCache:
+	@pytest.mark.asyncio
+	async def test_expired_list_is_served_while_refreshing(self, monkeypatch):
+		"""After the TTL the cached list is returned at once and refreshed in the background."""
+		async with fake_jira(monkeypatch) as jira:
+			cache = jira_server.ProjectCache(ttl=0)
+			first = await cache.get()
+			jira.projects = [{"key": "ENG", "name": "Engineering", "id": "2"}]
+			jira.etag = '"v2"'
+
+			assert await cache.get() is first
+			await cache._refresh_task
+
+			assert await cache.get() == [{"key": "ENG", "name": "Engineering", "id": "2"}]
+			await cache.close()
+
+	@pytest.mark.asyncio
+	async def test_unchanged_list_is_revalidated_with_etag(self, monkeypatch):
+		"""A refresh sends the cached ETag and keeps the list when Jira answers 304."""
+		async with fake_jira(monkeypatch) as jira:
+			cache = jira_server.ProjectCache()
+			first = await cache.get()
+			fetched_at = cache.fetched_at
+			await cache.refresh()
+
+		assert cache.projects is first
+		assert cache.fetched_at > fetched_at
+		assert len(jira.requests) == 2
+
+	@pytest.mark.asyncio
+	async def test_failed_refresh_keeps_cached_list(self, monkeypatch, capsys):
+		"""If Jira is unavailable during a refresh, the old list should still be served."""
+		monkeypatch.setattr(jira_server, "JIRA_MAX_RETRIES", 0)
+		async with fake_jira(monkeypatch) as jira:
+			cache = jira_server.ProjectCache(ttl=0)
+			first = await cache.get()
+			jira.rate_limited = 1
+			await cache.get()
+			await cache._refresh_task
+
+			assert await cache.get() == first
+			await cache.close()
+
+		captured = capsys.readouterr()
+		assert captured.out == ""
+		assert "refresh failed" in captured.err
+
+	@pytest.mark.asyncio
+	async def test_invalidate_fetches_again(self, monkeypatch):
+		async with fake_jira(monkeypatch) as jira:
+			cache = jira_server.ProjectCache()
+			await cache.get()
+			cache.invalidate()
+			jira.projects = []
+
+			assert await cache.get() == []
 
 
 # ==================== TEST create_jira_issue (MCP tool) ====================
@@ -214,7 +507,7 @@ class TestListJiraProjects:
 
 class TestCreateJiraIssue:
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.make_jira_issue_request", new_callable=AsyncMock)
+	@patch("src.backend.mcp.servers.jira_server.make_jira_issue_request", new_callable=AsyncMock)
 	async def test_success_formats_issue_message(
 		self,
 		mock_make_request,
@@ -246,7 +539,7 @@ class TestCreateJiraIssue:
 		assert "/browse/KAN-999" in result
 
 	@pytest.mark.asyncio
-	@patch("src.rag_chatbot.mcp.servers.jira_server.make_jira_issue_request", new_callable=AsyncMock)
+	@patch("src.backend.mcp.servers.jira_server.make_jira_issue_request", new_callable=AsyncMock)
 	async def test_handles_falsy_response(self, mock_make_request, sample_summary, sample_description, sample_proj_key):
 		"""If Jira request fails, create_jira_issue should return an error string."""
 		mock_make_request.return_value = None
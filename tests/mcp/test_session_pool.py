@@ -0,0 +1,194 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.backend.mcp.servers.clients.session_pool import MCPSessionPool
+from src.backend.mcp.servers.clients.tool_registry import ToolRegistry
+
+
+class FakeMCPClient:
+    """Stand-in for MCPClient that records which task connected and cleaned up."""
+
+    instances = []
+    fail_connect = False
+
+    def __init__(self):
+        self.session = None
+        self.registry = ToolRegistry()
+        self.connect_task = None
+        self.cleanup_task = None
+        FakeMCPClient.instances.append(self)
+
+    async def connect_to_server(self, server_module):
+        if FakeMCPClient.fail_connect:
+            raise ConnectionError("server failed to start")
+        self.connect_task = asyncio.current_task()
+        self.session = AsyncMock()
+        self.session.list_tools.return_value = SimpleNamespace(tools=[SimpleNamespace(name=f"{server_module}_tool")])
+        await self.registry.add_server(server_module, self.session)
+
+    async def process_query(self, query):
+        return f"answer to {query}"
+
+    async def cleanup(self):
+        self.cleanup_task = asyncio.current_task()
+
+
+class TestMCPSessionPool:
+    """Unit tests for the pool of long lived MCP sessions."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture(autouse=True)
+    def reset_fake_clients(self):
+        FakeMCPClient.instances = []
+        FakeMCPClient.fail_connect = False
+
+    def make_pool(self, **kwargs):
+        kwargs = {"server_modules": ["fake_server"], "size": 2, "max_concurrency": 2, "health_check_interval": 60, **kwargs}
+        return MCPSessionPool(client_factory=FakeMCPClient, **kwargs)
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_reused_across_requests(self):
+        """Many requests should only ever spawn the pool's sessions."""
+        pool = self.make_pool()
+        await pool.start()
+        try:
+            for i in range(10):
+                async with pool.acquire() as client:
+                    assert await client.process_query(i) == f"answer to {i}"
+            assert [tool.name for tool in pool.tools] == ["fake_server_tool"]
+        finally:
+            await pool.close()
+
+        assert len(FakeMCPClient.instances) == 2
+
+    @pytest.mark.asyncio
+    async def test_session_connects_to_every_server(self):
+        """Each pooled session connects to all servers, a server that stops answering fails the ping."""
+        pool = self.make_pool(size=1, server_modules=["jira", "calendar"])
+        await pool.start()
+        try:
+            assert [tool.name for tool in pool.tools] == ["jira_tool", "calendar_tool"]
+            session = pool.sessions[0]
+            assert await session.ping()
+
+            session.client.registry.servers["calendar"].session.send_ping.side_effect = ConnectionError("closed")
+            assert not await session.ping()
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_cleanup_runs_in_the_connecting_task(self):
+        """The stdio transport must be closed by the task that opened it, even when another task stops it."""
+        pool = self.make_pool(size=1)
+        await pool.start()
+        await pool.close()
+
+        client = FakeMCPClient.instances[0]
+        assert client.cleanup_task is client.connect_task
+        assert client.connect_task is not asyncio.current_task()
+
+    @pytest.mark.asyncio
+    async def test_requests_spread_over_sessions_and_wait_for_a_slot(self):
+        """Concurrent requests go to the least loaded session, past the limit they wait."""
+        pool = self.make_pool(size=2, max_concurrency=1)
+        await pool.start()
+        release = asyncio.Event()
+        used = []
+
+        async def request():
+            async with pool.acquire() as client:
+                used.append(client)
+                await release.wait()
+
+        try:
+            tasks = [asyncio.create_task(request()) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            assert len(used) == 2
+            assert used[0] is not used[1]
+
+            release.set()
+            await asyncio.gather(*tasks)
+            assert len(used) == 3
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_unresponsive_session_is_respawned(self):
+        """A session that doesn't answer a ping should be replaced by a new one."""
+        pool = self.make_pool(size=1)
+        await pool.start()
+        try:
+            dead = pool.sessions[0]
+            dead.client.session.send_ping.side_effect = ConnectionError("closed")
+
+            await pool.check(dead)
+
+            assert len(pool.sessions) == 1
+            assert pool.sessions[0] is not dead
+            assert dead.client.cleanup_task is not None
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_health_check_loop_respawns_sessions(self):
+        """The background health check should replace a dead session without any request."""
+        pool = self.make_pool(size=1, health_check_interval=0.01)
+        await pool.start()
+        try:
+            dead = pool.sessions[0]
+            dead.client.session.send_ping.side_effect = ConnectionError("closed")
+            await asyncio.sleep(0.1)
+
+            assert pool.sessions and pool.sessions[0] is not dead
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_request_keeps_healthy_session(self):
+        """A request error with a server that still answers pings shouldn't respawn the session."""
+        pool = self.make_pool(size=1)
+        await pool.start()
+        try:
+            session = pool.sessions[0]
+            with pytest.raises(ValueError):
+                async with pool.acquire():
+                    raise ValueError("tool failed")
+            await asyncio.sleep(0)
+            await asyncio.gather(*pool._checks)
+
+            assert pool.sessions == [session]
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_pool_recovers_when_server_fails_to_start(self):
+        """If every spawn fails at startup, the next request should try again."""
+        FakeMCPClient.fail_connect = True
+        pool = self.make_pool(size=1)
+        await pool.start()
+        assert pool.sessions == []
+
+        FakeMCPClient.fail_connect = False
+        try:
+            async with pool.acquire() as client:
+                assert await client.process_query("q") == "answer to q"
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_no_session_raises(self):
+        """A request with no server available should fail instead of hanging."""
+        FakeMCPClient.fail_connect = True
+        pool = self.make_pool(size=1)
+        try:
+            with pytest.raises(ConnectionError):
+                async with pool.acquire():
+                    pass
+        finally:
+            await pool.close()
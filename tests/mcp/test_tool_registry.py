@@ -0,0 +1,173 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from mcp import types
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.backend.mcp.servers.clients.MCPClient import MCPClient
+from src.backend.mcp.servers.clients.tool_registry import ToolRegistry
+
+
+def make_tool(name: str) -> types.Tool:
+    return types.Tool(name=name, description=f"{name} tool", inputSchema={"type": "object", "properties": {}})
+
+
+def make_session(*tool_names: str) -> AsyncMock:
+    """MCP session mock listing the given tools"""
+    session = AsyncMock()
+    session.list_tools.return_value = SimpleNamespace(tools=[make_tool(name) for name in tool_names])
+    return session
+
+
+def tool_list_changed() -> types.ServerNotification:
+    return types.ServerNotification(types.ToolListChangedNotification(method="notifications/tools/list_changed"))
+
+
+class TestToolRegistry:
+    """Unit tests for the cached, merged MCP tool registry."""
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_tools_listed_and_converted_once(self):
+        """Repeated queries should reuse the same converted tool list without listing again."""
+        session = make_session("create_jira_issue")
+        registry = ToolRegistry()
+        await registry.add_server("jira", session)
+
+        first = await registry.openai_tools()
+        second = await registry.openai_tools()
+
+        assert first is second
+        assert first == [{
+            "type": "function",
+            "name": "create_jira_issue",
+            "description": "create_jira_issue tool",
+            "parameters": {"type": "object", "properties": {}},
+        }]
+        session.list_tools.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_list_changed_notification_refreshes_that_server(self):
+        """tools/list_changed should re-list only the server that sent it."""
+        jira = make_session("create_jira_issue")
+        calendar = make_session("create_event")
+        registry = ToolRegistry()
+        await registry.add_server("jira", jira)
+        await registry.add_server("calendar", calendar)
+
+        jira.list_tools.return_value = SimpleNamespace(tools=[make_tool("create_jira_issue"), make_tool("list_jira_projects")])
+        await registry.message_handler("jira")(tool_list_changed())
+        tools = await registry.openai_tools()
+
+        assert [t["name"] for t in tools] == ["create_jira_issue", "list_jira_projects", "create_event"]
+        assert jira.list_tools.await_count == 2
+        calendar.list_tools.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_other_messages_are_ignored(self):
+        """Notifications other than tools/list_changed shouldn't cause a refresh."""
+        session = make_session("create_jira_issue")
+        registry = ToolRegistry()
+        await registry.add_server("jira", session)
+
+        await registry.message_handler("jira")(Exception("transport error"))
+        await registry.openai_tools()
+
+        session.list_tools.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_tools_expire_after_ttl(self):
+        """Tools older than the TTL should be listed again."""
+        session = make_session("create_jira_issue")
+        registry = ToolRegistry(ttl=60)
+
+        with patch("src.backend.mcp.servers.clients.tool_registry.time.monotonic", return_value=1000.0):
+            await registry.add_server("jira", session)
+            await registry.openai_tools()
+        with patch("src.backend.mcp.servers.clients.tool_registry.time.monotonic", return_value=1061.0):
+            await registry.openai_tools()
+
+        assert session.list_tools.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_colliding_names_are_namespaced(self):
+        """Only tools exposed by several servers get the server name as a prefix."""
+        jira = make_session("search", "create_jira_issue")
+        wiki = make_session("search")
+        registry = ToolRegistry()
+        await registry.add_server("jira", jira)
+        await registry.add_server("wiki", wiki)
+
+        names = [t["name"] for t in await registry.openai_tools()]
+
+        assert names == ["jira__search", "create_jira_issue", "wiki__search"]
+        assert registry.resolve("wiki__search") == (wiki, "search")
+        assert registry.resolve("create_jira_issue") == (jira, "create_jira_issue")
+        with pytest.raises(KeyError):
+            registry.resolve("search")
+
+
+class TestMCPClientToolRegistry:
+    """process_query should use the registry instead of listing tools per query."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def mcp_client(self):
+        client = MCPClient()
+        client.client = AsyncMock()
+        return client
+
+    @staticmethod
+    def message_response(text: str):
+        part = SimpleNamespace(type="output_text", text=text)
+        return SimpleNamespace(id="resp", output=[SimpleNamespace(type="message", content=[part])])
+
+    @staticmethod
+    def tool_call_response(name: str):
+        call = SimpleNamespace(type="function_call", name=name, arguments=json.dumps({}), call_id="call-1")
+        return SimpleNamespace(id="resp-tool", output=[call])
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_queries_do_not_list_tools(self, mcp_client):
+        """Tools are listed when the server is added, never again per query."""
+        session = make_session("create_jira_issue")
+        await mcp_client.registry.add_server("jira", session)
+        mcp_client.client.responses.create.side_effect = lambda **kwargs: self.message_response("done")
+
+        await mcp_client.process_query("first")
+        await mcp_client.process_query("second")
+
+        session.list_tools.assert_awaited_once()
+        assert mcp_client.client.responses.create.call_args.kwargs["tools"][0]["name"] == "create_jira_issue"
+
+    @pytest.mark.asyncio
+    async def test_tool_call_goes_to_owning_server(self, mcp_client):
+        """A namespaced tool call should reach the right server under its own name."""
+        jira = make_session("search")
+        wiki = make_session("search")
+        wiki.call_tool.return_value = MagicMock(content="wiki result")
+        await mcp_client.registry.add_server("jira", jira)
+        await mcp_client.registry.add_server("wiki", wiki)
+        mcp_client.client.responses.create.side_effect = [self.tool_call_response("wiki__search"), self.message_response("done")]
+
+        await mcp_client.process_query("search the wiki")
+
+        wiki.call_tool.assert_awaited_once_with("search", {})
+        jira.call_tool.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_tool_is_reported_to_the_model(self, mcp_client):
+        """A tool name the registry doesn't know should become an error output, not an exception."""
+        await mcp_client.registry.add_server("jira", make_session("create_jira_issue"))
+        mcp_client.client.responses.create.side_effect = [self.tool_call_response("delete_everything"), self.message_response("sorry")]
+
+        result = await mcp_client.process_query("delete everything")
+
+        followup = mcp_client.client.responses.create.call_args.kwargs["input"]
+        assert result == "sorry"
+        assert "Unknown tool" in followup[0]["output"]
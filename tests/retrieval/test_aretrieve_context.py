@@ -0,0 +1,276 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import patch, Mock, AsyncMock
+from src.backend.rag.retrieval_utils import aretrieve_context, run_stage
+from src.backend.rag.retrieval_cache import RetrievalCache, InMemoryCacheBackend
+
+
+class TestARetrieveContext:
+    """Unit tests for aretrieve_context and run_stage."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture(autouse=True)
+    def empty_retrieval_cache(self):
+        """Give every test its own empty cache so results don't leak between tests."""
+        cache = RetrievalCache(InMemoryCacheBackend())
+        with patch("src.backend.rag.retrieval_utils.RETRIEVAL_CACHE", cache):
+            yield cache
+
+    @pytest.fixture
+    def mock_vector_embedding(self):
+        """Fixture for mock vector embedding."""
+        return [0.1, 0.2, 0.3]
+
+    @pytest.fixture
+    def mock_filter_metadata(self):
+        """Fixture for mock filter metadata."""
+        return {"docType": ["earnings_call"], "company": ["Apple"]}
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_pre_search_calls_run_concurrently(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+        mock_vector_embedding,
+        mock_filter_metadata,
+    ):
+        """The three pre-search calls should overlap, so total time is close to the slowest call."""
+        def slow(value):
+            def inner(*args):
+                time.sleep(0.3)
+                return value
+            return inner
+
+        def aslow(value):
+            async def inner(*args):
+                await asyncio.sleep(0.3)
+                return value
+            return inner
+
+        route = Mock(source="transcripts")
+        mock_generate_embeddings.side_effect = aslow([mock_vector_embedding])
+        mock_route_query.side_effect = aslow(route)
+        mock_retrieve_filter_metadata.side_effect = slow(mock_filter_metadata)
+        mock_search_indexes.return_value = ([{"content": "doc"}], [])
+
+        start = time.perf_counter()
+        result = await aretrieve_context("test query", k=3)
+        elapsed = time.perf_counter() - start
+
+        assert result == [{"content": "doc"}]
+        assert elapsed < 0.8
+        mock_search_indexes.assert_called_once_with(
+            "test query", mock_vector_embedding, route, mock_filter_metadata, 3
+        )
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.ROUTE_TIMEOUT", 0.1)
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_slow_route_falls_back_to_both(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+        mock_vector_embedding,
+        mock_filter_metadata,
+    ):
+        """If routing misses its deadline both indexes should be searched."""
+        mock_generate_embeddings.return_value = [mock_vector_embedding]
+        async def slow_route(query):
+            await asyncio.sleep(0.5)
+
+        mock_route_query.side_effect = slow_route
+        mock_retrieve_filter_metadata.return_value = mock_filter_metadata
+        mock_search_indexes.return_value = ([], [])
+
+        await aretrieve_context("test query")
+
+        route = mock_search_indexes.call_args[0][2]
+        assert route.source == "both"
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_failed_metadata_falls_back_to_no_filter(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+        mock_vector_embedding,
+    ):
+        """If metadata extraction raises, the search should run without metadata."""
+        mock_generate_embeddings.return_value = [mock_vector_embedding]
+        mock_route_query.return_value = Mock(source="meeting_notes")
+        mock_retrieve_filter_metadata.side_effect = Exception("langextract failure")
+        mock_search_indexes.return_value = ([], [])
+
+        await aretrieve_context("test query")
+
+        assert mock_search_indexes.call_args[0][3] == {}
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_embedding_failure_is_raised(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+    ):
+        """Embedding has no fallback, so its error should propagate."""
+        mock_generate_embeddings.side_effect = Exception("embedding failure")
+        mock_route_query.return_value = Mock(source="both")
+        mock_retrieve_filter_metadata.return_value = {}
+
+        with pytest.raises(Exception, match="embedding failure"):
+            await aretrieve_context("test query")
+
+        mock_search_indexes.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_run_stage_returns_result(self):
+        """run_stage should return the function result when it finishes in time."""
+        result = await run_stage(lambda x: x * 2, 21, timeout=1.0)
+        assert result == 42
+
+    @pytest.mark.asyncio
+    async def test_run_stage_awaits_coroutine_functions(self):
+        """Coroutine functions should be awaited on the event loop and cancelled on timeout."""
+        async def double(x):
+            return x * 2
+
+        assert await run_stage(double, 21, timeout=1.0) == 42
+        assert await run_stage(asyncio.sleep, 0.5, timeout=0.05, fallback="fallback") == "fallback"
+
+    @pytest.mark.asyncio
+    async def test_run_stage_timeout_without_fallback_raises(self):
+        """run_stage without a fallback should raise on timeout."""
+        with pytest.raises(TimeoutError):
+            await run_stage(time.sleep, 0.5, timeout=0.05)
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_repeated_query_is_served_from_cache(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+        mock_vector_embedding,
+        mock_filter_metadata,
+    ):
+        """A repeat of the same query (different case/whitespace) should make no calls at all."""
+        mock_generate_embeddings.return_value = [mock_vector_embedding]
+        mock_route_query.return_value = Mock(source="transcripts")
+        mock_retrieve_filter_metadata.return_value = mock_filter_metadata
+        mock_search_indexes.return_value = ([{"content": "doc"}], [])
+
+        first = await aretrieve_context("Agilent Q2 2024 guidance")
+        second = await aretrieve_context("  agilent q2 2024   guidance? ")
+
+        assert first == second == [{"content": "doc"}]
+        mock_generate_embeddings.assert_called_once()
+        mock_route_query.assert_called_once()
+        mock_search_indexes.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_similar_query_with_same_filter_skips_search(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+        mock_vector_embedding,
+        mock_filter_metadata,
+    ):
+        """A reworded query with the same route/filter and a near identical embedding reuses the results."""
+        mock_generate_embeddings.return_value = [mock_vector_embedding]
+        mock_route_query.return_value = Mock(source="transcripts")
+        mock_retrieve_filter_metadata.return_value = mock_filter_metadata
+        mock_search_indexes.return_value = ([{"content": "doc"}], [])
+
+        await aretrieve_context("What was Apple's guidance?")
+        result = await aretrieve_context("Tell me Apple's guidance")
+
+        assert result == [{"content": "doc"}]
+        mock_search_indexes.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.METADATA_TIMEOUT", 0.1)
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_fallback_results_are_not_cached(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+        mock_vector_embedding,
+    ):
+        """Results found without a filter because metadata timed out shouldn't be reused."""
+        mock_generate_embeddings.return_value = [mock_vector_embedding]
+        mock_route_query.return_value = Mock(source="transcripts")
+        mock_retrieve_filter_metadata.side_effect = lambda q: time.sleep(0.5)
+        mock_search_indexes.return_value = ([{"content": "doc"}], [])
+
+        await aretrieve_context("test query")
+        await aretrieve_context("test query")
+
+        assert mock_search_indexes.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch("src.backend.rag.retrieval_utils.asearch_indexes", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.retrieve_filter_metadata")
+    @patch("src.backend.rag.retrieval_utils.aroute_query", new_callable=AsyncMock)
+    @patch("src.backend.rag.retrieval_utils.agenerate_embeddings", new_callable=AsyncMock)
+    async def test_results_missing_a_timed_out_index_are_not_cached(
+        self,
+        mock_generate_embeddings,
+        mock_route_query,
+        mock_retrieve_filter_metadata,
+        mock_search_indexes,
+        mock_vector_embedding,
+        mock_filter_metadata,
+        empty_retrieval_cache,
+    ):
+        """One slow index search shouldn't leave later queries answered without that index."""
+        mock_generate_embeddings.return_value = [mock_vector_embedding]
+        mock_route_query.return_value = Mock(source="both")
+        mock_retrieve_filter_metadata.return_value = mock_filter_metadata
+        mock_search_indexes.return_value = ([{"content": "meeting doc"}], ["transcripts"])
+
+        result = await aretrieve_context("test query")
+
+        assert result == [{"content": "meeting doc"}]
+        assert empty_retrieval_cache.backend.entries == {}
+
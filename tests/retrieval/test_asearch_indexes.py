@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch, Mock
+from src.backend.rag.retrieval_utils import asearch_indexes
+
+
+class FakeAsyncPager:
+    """Async iterator standing in for the AsyncSearchItemPaged returned by the aio SearchClient."""
+
+    def __init__(self, results):
+        self._results = iter(results)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeAsyncSearchClient:
+    """Local stand-in for azure.search.documents.aio.SearchClient."""
+
+    def __init__(self, results, delay=0.0):
+        self.results = results
+        self.delay = delay
+        self.calls = []
+
+    async def search(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return FakeAsyncPager(self.results)
+
+
+def patch_search_clients(transcripts, meetings):
+    """Patch the shared async clients so search(index_kind) returns the fake clients"""
+    clients = {"transcripts": transcripts, "meeting_notes": meetings}
+    return patch("src.backend.rag.retrieval_utils.ASYNC_CLIENTS", Mock(search=clients.__getitem__))
+
+
+class TestASearchIndexes:
+    """Unit tests for asearch_indexes function."""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def transcript_results(self):
+        return [{"id": "t1", "content": "transcript", "@search.score": 0.9}]
+
+    @pytest.fixture
+    def meeting_results(self):
+        return [{"id": "m1", "content": "meeting", "@search.score": 0.5}]
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_both_route_queries_indexes_concurrently(self, transcript_results, meeting_results):
+        """Both indexes should be searched at once, total time close to one search."""
+        transcripts = FakeAsyncSearchClient(transcript_results, delay=0.3)
+        meetings = FakeAsyncSearchClient(meeting_results, delay=0.3)
+
+        with patch_search_clients(transcripts, meetings):
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            result, timed_out = await asearch_indexes("query", [0.1, 0.2], Mock(source="both"), {}, k=6)
+            elapsed = loop.time() - start
+
+        assert elapsed < 0.55
+        assert timed_out == []
+        by_id = {r["id"]: r for r in result}
+        assert set(by_id) == {"t1", "m1"}
+        assert by_id["t1"]["_index"] == "transcripts"
+        assert by_id["m1"]["_index"] == "meeting_notes"
+
+    @pytest.mark.asyncio
+    async def test_results_are_fused_in_route_order(self, transcript_results, meeting_results):
+        """Fusion should see the indexes in route order even when the meeting notes answer first."""
+        transcripts = FakeAsyncSearchClient(transcript_results, delay=0.2)
+        meetings = FakeAsyncSearchClient(meeting_results, delay=0.0)
+
+        with patch_search_clients(transcripts, meetings), \
+                patch("src.backend.rag.retrieval_utils.fuse_results", return_value=[]) as fuse:
+            await asearch_indexes("query", [0.1, 0.2], Mock(source="both"), {}, k=6)
+
+        assert list(fuse.call_args.args[0]) == ["transcripts", "meeting_notes"]
+
+    @pytest.mark.asyncio
+    async def test_slow_index_is_skipped_after_deadline(self, transcript_results, meeting_results):
+        """An index that misses its deadline should not hold up the other index's results."""
+        transcripts = FakeAsyncSearchClient(transcript_results, delay=1.0)
+        meetings = FakeAsyncSearchClient(meeting_results)
+
+        with patch_search_clients(transcripts, meetings):
+            result, timed_out = await asearch_indexes("query", [0.1], Mock(source="both"), {}, k=6, timeout=0.1)
+
+        assert [r["id"] for r in result] == ["m1"]
+        assert timed_out == ["transcripts"]
+
+    @pytest.mark.asyncio
+    async def test_single_route_only_searches_that_index(self, transcript_results, meeting_results):
+        """A transcripts route should never touch the meeting notes index."""
+        transcripts = FakeAsyncSearchClient(transcript_results)
+        meetings = FakeAsyncSearchClient(meeting_results)
+
+        with patch_search_clients(transcripts, meetings):
+            result, _ = await asearch_indexes(
+                "query", [0.1], Mock(source="transcripts"), {"company": ["Apple"], "author": ["John"]}, k=6
+            )
+
+        assert len(transcripts.calls) == 1
+        assert meetings.calls == []
+        # author isn't a transcript field so only company should be in the filter
+        assert transcripts.calls[0]["filter"] == "company eq 'Apple'"
+        assert transcripts.calls[0]["top"] == 6
+        assert [r["id"] for r in result] == ["t1"]
@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from aiohttp import web
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+
+from src.backend.rag import async_clients
+from src.backend.rag.async_clients import AsyncClients, make_llm_http_client
+from src.backend.main import app
+
+
+async def compressed(request):
+    return web.Response(
+        body=gzip.compress(b'{"ok": true}'),
+        headers={"Content-Encoding": "gzip", "Content-Type": "application/json"},
+    )
+
+
+async def streamed(request):
+    response = web.StreamResponse()
+    await response.prepare(request)
+    for part in (b"data: a\n\n", b"data: b\n\n"):
+        await response.write(part)
+        await asyncio.sleep(0.05)
+    await response.write_eof()
+    return response
+
+
+async def slow(request):
+    await asyncio.sleep(1)
+    return web.Response(text="late")
+
+
+class InFlight:
+    """Handler counting the most requests the server was answering at once"""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+
+    async def handle(self, request):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        await asyncio.sleep(0.1)
+        self.current -= 1
+        return web.Response(text="ok")
+
+
+@asynccontextmanager
+async def local_server(in_flight: InFlight | None = None):
+    """Local server with a gzip encoded JSON response, a streamed response, a slow response and a counted one"""
+    server = web.Application()
+    server.router.add_get("/compressed", compressed)
+    server.router.add_get("/streamed", streamed)
+    server.router.add_get("/slow", slow)
+    server.router.add_get("/counted", (in_flight or InFlight()).handle)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+class TestAsyncClients:
+    """Unit tests for the shared async OpenAI/Azure Search clients."""
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_open_shares_one_session_between_search_clients(self):
+        """Both search clients should send requests through the same aiohttp session."""
+        clients = AsyncClients()
+        with patch("src.backend.rag.async_clients.make_async_search_client") as make_client:
+            make_client.return_value.close = AsyncMock()
+            clients.open()
+        try:
+            session = clients._search_session
+            transports = [call.kwargs["transport"] for call in make_client.call_args_list]
+            assert len(transports) == 2
+            assert all(transport.session is session for transport in transports)
+        finally:
+            await clients.close()
+
+        assert session.closed
+        assert clients._search is None and clients._llm is None
+
+    @pytest.mark.asyncio
+    async def test_clients_are_reused(self):
+        """Repeated access should return the same clients rather than new pools."""
+        clients = AsyncClients()
+        try:
+            assert clients.llm is clients.llm
+            assert clients.search("transcripts") is clients.search("transcripts")
+            assert clients.embeddings is not clients.llm
+        finally:
+            await clients.close()
+
+    @pytest.mark.asyncio
+    async def test_close_without_open_is_a_no_op(self):
+        """Closing clients that were never opened shouldn't raise."""
+        await AsyncClients().close()
+
+    def test_lifespan_opens_and_closes_clients(self):
+        """The app should open the clients on startup and close them on shutdown."""
+        clients = AsyncClients()
+        with patch("src.backend.main.ASYNC_CLIENTS", clients), \
+                patch("src.backend.main.MCP_SESSION_POOL", AsyncMock()):
+            with TestClient(app):
+                assert clients._llm is not None
+                assert clients._search is not None
+        assert clients._llm is None
+        assert clients._search is None
+
+
+class TestLlmHttpClient:
+    """Unit tests for the pooled httpx client used by the AsyncOpenAI clients."""
+
+    # ============== TESTS ==============
+
+    @pytest.mark.asyncio
+    async def test_response_is_decoded(self):
+        async with local_server() as server, make_llm_http_client() as client:
+            response = await client.get(f"{server}/compressed")
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_streamed_body_arrives_in_chunks(self):
+        """Chunks should be yielded as the server writes them rather than after the whole body."""
+        async with local_server() as server, make_llm_http_client() as client:
+            async with client.stream("GET", f"{server}/streamed") as response:
+                chunks = [chunk async for chunk in response.aiter_bytes()]
+
+        assert chunks == [b"data: a\n\n", b"data: b\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_connections_are_capped(self, monkeypatch):
+        """Requests beyond LLM_MAX_CONNECTIONS wait for a pooled connection."""
+        monkeypatch.setattr(async_clients, "LLM_MAX_CONNECTIONS", 2)
+        in_flight = InFlight()
+        async with local_server(in_flight) as server, make_llm_http_client() as client:
+            await asyncio.gather(*(client.get(f"{server}/counted") for _ in range(6)))
+
+        assert in_flight.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_read_timeout_is_an_httpx_read_timeout(self, monkeypatch):
+        """A slow response should be a read timeout, which the OpenAI client retries as such."""
+        monkeypatch.setattr(async_clients, "LLM_TIMEOUT", 0.1)
+        async with local_server() as server, make_llm_http_client() as client:
+            with pytest.raises(httpx.ReadTimeout):
+                await client.get(f"{server}/slow")
@@ -0,0 +1,143 @@
+import pytest
+from unittest.mock import MagicMock
+
+from src.backend.rag import context_packer
+from src.backend.rag.context_packer import Tokenizer, dedupe_chunks, pack_context, GAP_MARKER
+from src.backend.rag.RAG_bot import RAGLLM
+
+
+def words(start, count):
+    """Distinct words, so only the text tests share on purpose overlaps"""
+    return " ".join(f"word{i}" for i in range(start, start + count))
+
+
+class TestDedupeChunks:
+    """Text repeated across retrieved chunks is only kept once"""
+
+    # ============== TESTS ==============
+
+    def test_overlap_with_neighbouring_chunk_is_removed(self):
+        first = words(0, 100)
+        # the next chunk of the document starts with the last 10 words of the first
+        second = words(90, 100)
+
+        deduped = dedupe_chunks([{"content": first}, {"content": second}])
+
+        assert deduped[0]["content"] == first
+        assert deduped[1]["content"] == words(100, 90)
+
+    def test_overlap_is_found_after_chunk_context(self):
+        """contextual chunking puts a generated context in front of each chunk"""
+        first = "Context of the first chunk. " + words(0, 100)
+        second = "Context of the second chunk. " + words(90, 100)
+
+        deduped = dedupe_chunks([{"content": first}, {"content": second}])
+
+        assert deduped[1]["content"] == "Context of the second chunk." + GAP_MARKER + words(100, 90)
+
+    def test_duplicate_and_contained_chunks_are_dropped(self):
+        best = {"content": words(0, 100), "chunk_id": 1}
+
+        deduped = dedupe_chunks([best, {"content": words(0, 100)}, {"content": words(20, 30)}])
+
+        assert deduped == [best]
+
+    def test_chunk_is_cut_out_of_epic_chunk(self):
+        body = words(100, 50)
+        epic = "Epic 1: Billing\n" + words(0, 50) + " " + body + " " + words(200, 50)
+
+        deduped = dedupe_chunks([{"content": body}, {"content": epic, "source": "notes.txt"}])
+
+        assert deduped[1] == {
+            "content": "Epic 1: Billing\n" + words(0, 50) + GAP_MARKER + words(200, 50),
+            "source": "notes.txt",
+        }
+
+    def test_short_shared_phrases_are_kept(self):
+        chunks = [{"content": words(0, 50) + " the company"}, {"content": "the company " + words(100, 50)}]
+
+        assert dedupe_chunks(chunks) == chunks
+
+
+class TestPackContext:
+    """Retrieved context is cut to a token budget in rank order"""
+
+    # ============== FIXTURES ==============
+
+    @pytest.fixture
+    def tokenizer(self, monkeypatch):
+        """Token estimates, whether or not tiktoken is installed"""
+        monkeypatch.setattr(context_packer, "tiktoken", None)
+        return Tokenizer()
+
+    # ============== TESTS ==============
+
+    def test_everything_fits(self, tokenizer):
+        context = [{"content": words(0, 20)}, {"content": words(100, 20)}]
+
+        assert pack_context(context, budget=1000, tokenizer=tokenizer) == context
+
+    def test_first_chunk_over_budget_is_cut_and_rest_left_out(self, tokenizer):
+        context = [{"content": words(0, 100)}, {"content": words(200, 100)}, {"content": words(400, 10)}]
+
+        packed = pack_context(context, budget=300, tokenizer=tokenizer)
+
+        assert len(packed) == 2
+        assert packed[0] == context[0]
+        assert context[1]["content"].startswith(packed[1]["content"])
+        total = sum(tokenizer.count(c["content"]) for c in packed) + tokenizer.count(context_packer.CONTEXT_SEPARATOR)
+        assert total <= 300
+
+    def test_chunk_is_left_out_when_little_budget_is_left(self, tokenizer):
+        context = [{"content": words(0, 100)}, {"content": words(200, 100)}]
+        budget = tokenizer.count(context[0]["content"]) + 50
+
+        assert pack_context(context, budget=budget, tokenizer=tokenizer) == context[:1]
+
+    def test_duplicates_do_not_use_budget(self, tokenizer):
+        context = [{"content": words(0, 100)}, {"content": words(0, 100)}, {"content": words(200, 20)}]
+        budget = tokenizer.count(context[0]["content"]) + tokenizer.count(context[2]["content"]) + 10
+
+        assert pack_context(context, budget=budget, tokenizer=tokenizer) == [context[0], context[2]]
+
+    def test_rag_prompt_uses_packed_context(self, monkeypatch):
+        monkeypatch.setattr(context_packer, "CONTEXT_TOKEN_BUDGET", 200)
+        context = [{"content": words(0, 100)}, {"content": words(0, 100)}, {"content": words(200, 100)}]
+
+        prompt = RAGLLM.build_messages("What was said?", context, [])[-1]["content"]
+
+        assert prompt.count("word0 ") == 1
+        assert "word299" not in prompt
+
+
+class TestTokenizer:
+    """Token counting with or without tiktoken"""
+
+    # ============== TESTS ==============
+
+    def test_estimates_without_tiktoken(self, monkeypatch):
+        monkeypatch.setattr(context_packer, "tiktoken", None)
+        tokenizer = Tokenizer()
+
+        assert tokenizer.count("a" * 40) == 11
+        assert tokenizer.count(tokenizer.truncate("a" * 400, 20)) <= 20
+
+    def test_estimates_when_encoding_cannot_be_loaded(self, monkeypatch):
+        fake_tiktoken = MagicMock()
+        fake_tiktoken.get_encoding.side_effect = ConnectionError("offline")
+        monkeypatch.setattr(context_packer, "tiktoken", fake_tiktoken)
+
+        assert Tokenizer().count("a" * 40) == 11
+
+    def test_counts_with_encoding(self, monkeypatch):
+        encoding = MagicMock()
+        encoding.encode.side_effect = lambda text, disallowed_special: text.split()
+        encoding.decode.side_effect = " ".join
+        fake_tiktoken = MagicMock()
+        fake_tiktoken.get_encoding.return_value = encoding
+        monkeypatch.setattr(context_packer, "tiktoken", fake_tiktoken)
+        tokenizer = Tokenizer("o200k_base")
+
+        assert tokenizer.count("one two three") == 3
+        assert tokenizer.truncate("one two three", 2) == "one two"
+        fake_tiktoken.get_encoding.assert_called_once_with("o200k_base")
@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+
+from src.backend.rag.fusion import fuse_results, normalise_scores
+
+
+# ==================== FIXTURES ====================
+
+@pytest.fixture
+def results_by_index():
+    """Transcript scores are on a much larger scale than meeting note scores."""
+    return {
+        "transcripts": [
+            {"id": "t1", "_score": 12.0},
+            {"id": "t2", "_score": 11.5},
+            {"id": "t3", "_score": 11.0},
+        ],
+        "meeting_notes": [
+            {"id": "m1", "_score": 0.9},
+            {"id": "m2", "_score": 0.4},
+        ],
+    }
+
+
+# ==================== TEST fuse_results ====================
+
+class TestFuseResults:
+    def test_raw_lets_larger_scale_index_win_every_slot(self, results_by_index):
+        """raw keeps the old behaviour of sorting on the raw scores."""
+        result = fuse_results(results_by_index, method="raw", k=3)
+        assert [r["id"] for r in result] == ["t1", "t2", "t3"]
+
+    def test_rrf_interleaves_indexes(self, results_by_index):
+        """rrf only uses rank so the top result of each index ties for first."""
+        result = fuse_results(results_by_index, method="rrf", k=4)
+        assert [r["id"] for r in result] == ["t1", "m1", "t2", "m2"]
+        assert result[0]["_score"] == pytest.approx(1 / 61)
+
+    def test_minmax_scales_each_index_to_unit_range(self, results_by_index):
+        result = fuse_results(results_by_index, method="minmax")
+        scores = {r["id"]: r["_score"] for r in result}
+        assert scores["t1"] == pytest.approx(1.0)
+        assert scores["t3"] == pytest.approx(0.0)
+        assert scores["m1"] == pytest.approx(1.0)
+        assert scores["m2"] == pytest.approx(0.0)
+
+    def test_zscore_centres_each_index(self, results_by_index):
+        result = fuse_results(results_by_index, method="zscore")
+        scores = {r["id"]: r["_score"] for r in result}
+        assert scores["t1"] + scores["t2"] + scores["t3"] == pytest.approx(0.0)
+        assert scores["m1"] == pytest.approx(1.0)
+        assert scores["m2"] == pytest.approx(-1.0)
+
+    def test_weights_favour_an_index(self, results_by_index):
+        result = fuse_results(results_by_index, method="rrf", weights={"meeting_notes": 2.0}, k=2)
+        assert [r["id"] for r in result] == ["m1", "m2"]
+
+    def test_keeps_raw_search_score_and_does_not_mutate_input(self):
+        results = {"transcripts": [{"id": "t1", "_score": 3.0, "@search.score": 3.0}]}
+        result = fuse_results(results, method="minmax")
+        assert result[0]["@search.score"] == 3.0
+        assert results["transcripts"][0]["_score"] == 3.0
+
+    def test_empty_results(self):
+        assert fuse_results({}, method="rrf") == []
+        assert fuse_results({"transcripts": []}, method="zscore") == []
+
+    def test_unknown_method_raises(self, results_by_index):
+        with pytest.raises(ValueError):
+            fuse_results(results_by_index, method="borda")
+
+
+# ==================== TEST normalise_scores ====================
+
+class TestNormaliseScores:
+    def test_rrf_ranks_within_each_group(self):
+        """rank is computed within a group even when the groups are interleaved."""
+        scores = np.array([0.2, 5.0, 0.9, 4.0])
+        groups = np.array([1, 0, 1, 0])
+        result = normalise_scores(scores, groups, "rrf", rrf_k=0)
+        np.testing.assert_allclose(result, [1 / 2, 1 / 1, 1 / 1, 1 / 2])
+
+    def test_minmax_single_result_group_is_one(self):
+        result = normalise_scores(np.array([7.0]), np.array([0]), "minmax")
+        np.testing.assert_allclose(result, [1.0])
+
+    def test_zscore_constant_group_is_zero(self):
+        result = normalise_scores(np.array([2.0, 2.0]), np.array([0, 0]), "zscore")
+        np.testing.assert_allclose(result, [0.0, 0.0])
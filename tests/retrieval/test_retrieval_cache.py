@@ -0,0 +1,182 @@
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from src.backend.rag.retrieval_cache import (
+    RetrievalCache,
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    normalise_query,
+    make_filter_key,
+    encode_embedding,
+    decode_embedding,
+)
+
+
+# ==================== FIXTURES ====================
+
+@pytest.fixture
+def cache():
+    return RetrievalCache(InMemoryCacheBackend(max_entries=10, ttl=60), threshold=0.95)
+
+
+@pytest.fixture
+def filter_metadata():
+    return {"docType": ["earnings_call"], "company": ["Agilent"], "year": [2024], "quarter": [2]}
+
+
+@pytest.fixture
+def results():
+    return [{"id": "doc-1", "content": "Agilent raised guidance"}]
+
+
+# ==================== TEST helpers ====================
+
+class TestHelpers:
+    def test_normalise_query(self):
+        assert normalise_query("  Agilent  Q2\n2024 guidance? ") == "agilent q2 2024 guidance"
+
+    def test_filter_key_ignores_value_order_and_empty_fields(self):
+        a = make_filter_key("transcripts", {"company": ["Apple", "Agilent"], "author": []})
+        b = make_filter_key("transcripts", {"company": ["Agilent", "Apple"]})
+        assert a == b
+
+    def test_filter_key_differs_by_route_and_values(self, filter_metadata):
+        base = make_filter_key("transcripts", filter_metadata)
+        assert base != make_filter_key("both", filter_metadata)
+        assert base != make_filter_key("transcripts", {**filter_metadata, "quarter": [3]})
+
+    def test_embedding_round_trip(self):
+        decoded = decode_embedding(encode_embedding([0.5, -1.0, 2.0]))
+        assert decoded.tolist() == [0.5, -1.0, 2.0]
+
+
+# ==================== TEST RetrievalCache ====================
+
+class TestRetrievalCache:
+    @pytest.mark.asyncio
+    async def test_exact_hit_after_set(self, cache, filter_metadata, results):
+        await cache.set("Agilent Q2 2024 guidance", 6, [1.0, 0.0], "transcripts", filter_metadata, results)
+        assert await cache.get_exact("agilent q2 2024 guidance?", 6) == results
+
+    @pytest.mark.asyncio
+    async def test_exact_miss_for_different_k(self, cache, filter_metadata, results):
+        await cache.set("query", 6, [1.0, 0.0], "transcripts", filter_metadata, results)
+        assert await cache.get_exact("query", 3) is None
+
+    @pytest.mark.asyncio
+    async def test_similar_hit_above_threshold(self, cache, filter_metadata, results):
+        await cache.set("query one", 6, [1.0, 0.0], "transcripts", filter_metadata, results)
+        assert await cache.get_similar([0.99, 0.05], "transcripts", filter_metadata, 6) == results
+
+    @pytest.mark.asyncio
+    async def test_similar_miss_below_threshold(self, cache, filter_metadata, results):
+        await cache.set("query one", 6, [1.0, 0.0], "transcripts", filter_metadata, results)
+        assert await cache.get_similar([0.5, 0.5], "transcripts", filter_metadata, 6) is None
+
+    @pytest.mark.asyncio
+    async def test_similar_miss_for_different_filter(self, cache, filter_metadata, results):
+        """Identical embeddings must not be reused across different filters (e.g. a different quarter)."""
+        await cache.set("query one", 6, [1.0, 0.0], "transcripts", filter_metadata, results)
+        other = {**filter_metadata, "quarter": [3]}
+        assert await cache.get_similar([1.0, 0.0], "transcripts", other, 6) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_clears_everything(self, cache, filter_metadata, results):
+        await cache.set("query", 6, [1.0, 0.0], "transcripts", filter_metadata, results)
+        cache.invalidate()
+        assert await cache.get_exact("query", 6) is None
+        assert await cache.get_similar([1.0, 0.0], "transcripts", filter_metadata, 6) is None
+
+    @pytest.mark.asyncio
+    async def test_backend_errors_are_treated_as_miss(self):
+        backend = MagicMock()
+        backend.get.side_effect = ConnectionError("redis down")
+        cache = RetrievalCache(backend)
+        assert await cache.get_exact("query", 6) is None
+
+
+# ==================== TEST InMemoryCacheBackend ====================
+
+class TestInMemoryCacheBackend:
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        backend = InMemoryCacheBackend(max_entries=2, ttl=60)
+        await backend.set("a", {"v": 1}, "g")
+        await backend.set("b", {"v": 2}, "g")
+        # touch "a" so "b" becomes least recently used
+        await backend.get("a")
+        await backend.set("c", {"v": 3}, "g")
+
+        assert await backend.get("b") is None
+        assert await backend.get("a") == {"v": 1}
+        assert await backend.get("c") == {"v": 3}
+        assert len(await backend.group_values("g")) == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        backend = InMemoryCacheBackend(max_entries=10, ttl=60)
+        await backend.set("a", {"v": 1}, "g")
+
+        with patch("src.backend.rag.retrieval_cache.time.monotonic", return_value=time.monotonic() + 61):
+            assert await backend.get("a") is None
+            assert await backend.group_values("g") == []
+
+
+# ==================== TEST RedisCacheBackend ====================
+
+def make_rdb(size):
+    """Redis client mock whose pipeline reports an LRU set of size entries after the store"""
+    rdb = MagicMock()
+    rdb.pipe = MagicMock()
+    rdb.pipe.execute = AsyncMock(return_value=[True, 0, 1, size])
+
+    @asynccontextmanager
+    async def pipeline(transaction=True):
+        yield rdb.pipe
+
+    rdb.pipeline = MagicMock(side_effect=pipeline)
+    rdb.zpopmin = AsyncMock(return_value=[("old", 1.0)])
+    rdb.delete = AsyncMock()
+    rdb.get = AsyncMock(return_value=None)
+    return rdb
+
+
+class TestRedisCacheBackend:
+    @pytest.mark.asyncio
+    async def test_uses_shared_redis_client(self):
+        rdb = make_rdb(1)
+        backend = RedisCacheBackend(max_entries=10, ttl=60, prefix="test_cache")
+
+        with patch("src.backend.rag.retrieval_cache.get_redis", return_value=rdb):
+            assert await backend.get("a") is None
+
+        rdb.get.assert_awaited_once_with("test_cache:entry:a")
+
+    @pytest.mark.asyncio
+    async def test_expired_keys_are_pruned_before_trimming(self):
+        rdb = make_rdb(2)
+        backend = RedisCacheBackend(max_entries=2, ttl=60, prefix="test_cache")
+
+        with patch("src.backend.rag.retrieval_cache.get_redis", return_value=rdb), \
+                patch("src.backend.rag.retrieval_cache.time.time", return_value=1000.0):
+            await backend.set("a", {"v": 1})
+
+        calls = [call[0] for call in rdb.pipe.method_calls if call[0] != "execute"]
+        assert calls == ["set", "zremrangebyscore", "zadd", "zcard"]
+        rdb.pipe.zremrangebyscore.assert_called_once_with("test_cache:lru", "-inf", 940.0)
+        rdb.zpopmin.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_key_is_evicted_over_max_entries(self):
+        rdb = make_rdb(3)
+        backend = RedisCacheBackend(max_entries=2, ttl=60, prefix="test_cache")
+
+        with patch("src.backend.rag.retrieval_cache.get_redis", return_value=rdb):
+            await backend.set("a", {"v": 1})
+
+        rdb.zpopmin.assert_awaited_once_with("test_cache:lru", 1)
+        rdb.delete.assert_awaited_once_with("test_cache:entry:old")
+
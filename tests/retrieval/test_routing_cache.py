@@ -0,0 +1,133 @@
+import time
+
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src.backend.rag.retrieval_cache import InMemoryCacheBackend
+from src.backend.rag.routing_cache import RoutingCache, make_routing_cache
+from src.backend.rag import RAG_bot, retrieval_utils
+
+
+def prompt(query):
+    return f"Classify this request: {query}"
+
+
+def parsed(source):
+    response = MagicMock()
+    response.output_parsed.source = source
+    return response
+
+
+# ==================== FIXTURES ====================
+
+@pytest.fixture
+def cache():
+    return RoutingCache(InMemoryCacheBackend(max_entries=10, ttl=60), model="test-model")
+
+
+@pytest.fixture
+def classify():
+    return AsyncMock(return_value="rag")
+
+
+@pytest.fixture
+def llm(cache):
+    """Routing calls go to a mock LLM and a fresh routing cache"""
+    with patch("src.backend.rag.RAG_bot.ROUTING_CACHE", cache), \
+            patch("src.backend.rag.retrieval_utils.ROUTING_CACHE", cache), \
+            patch("src.backend.rag.RAG_bot.ASYNC_CLIENTS") as rag_clients, \
+            patch("src.backend.rag.retrieval_utils.ASYNC_CLIENTS", rag_clients):
+        rag_clients.llm.responses.parse = AsyncMock()
+        yield rag_clients.llm.responses.parse
+
+
+# ==================== TEST RoutingCache ====================
+
+class TestRoutingCache:
+    @pytest.mark.asyncio
+    async def test_repeated_query_skips_classifier(self, cache, classify):
+        assert await cache.route("route", "Find the Q2 notes", prompt, classify) == "rag"
+        assert await cache.route("route", "Find the Q2 notes", prompt, classify) == "rag"
+
+        classify.assert_awaited_once()
+        assert cache.stats()["route"] == {"exact_hits": 1, "normalised_hits": 0, "misses": 1, "hit_rate": 0.5}
+
+    @pytest.mark.asyncio
+    async def test_differently_typed_query_hits_normalised_key(self, cache, classify):
+        await cache.route("route", "Find the Q2 notes", prompt, classify)
+
+        assert await cache.route("route", "  find the q2   NOTES? ", prompt, classify) == "rag"
+        classify.assert_awaited_once()
+        assert cache.stats()["route"]["normalised_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_routers_and_models_do_not_share_decisions(self, cache, classify):
+        await cache.route("route", "Create a ticket", prompt, classify)
+        other_model = RoutingCache(cache.backend, model="other-model")
+
+        assert await cache.get("mcp_subroute", "Create a ticket", prompt) is None
+        assert await other_model.get("route", "Create a ticket", prompt) is None
+
+    @pytest.mark.asyncio
+    async def test_changed_prompt_misses(self, cache, classify):
+        await cache.route("route", "Create a ticket", prompt, classify)
+
+        assert await cache.get("route", "Create a ticket", lambda query: f"New prompt: {query}") is None
+
+    @pytest.mark.asyncio
+    async def test_decisions_expire(self, cache, classify):
+        await cache.route("route", "Create a ticket", prompt, classify)
+
+        with patch("src.backend.rag.retrieval_cache.time.monotonic", return_value=time.monotonic() + 61):
+            assert await cache.get("route", "Create a ticket", prompt) is None
+
+    @pytest.mark.asyncio
+    async def test_backend_failure_is_a_miss(self, classify):
+        backend = MagicMock()
+        backend.get = AsyncMock(side_effect=ConnectionError("redis down"))
+        backend.set = AsyncMock(side_effect=ConnectionError("redis down"))
+        cache = RoutingCache(backend)
+
+        assert await cache.route("route", "Create a ticket", prompt, classify) == "rag"
+        assert cache.stats()["route"]["misses"] == 1
+
+    def test_stats_are_empty_before_any_lookup(self, cache):
+        assert cache.stats() == {}
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            make_routing_cache("memcached")
+
+
+# ==================== TEST routers use the cache ====================
+
+class TestCachedRouters:
+    @pytest.mark.asyncio
+    async def test_adecide_route_cached(self, llm, cache):
+        llm.return_value = parsed("mcp")
+
+        assert await RAG_bot.adecide_route("Create a Jira ticket", "auto") == "mcp"
+        assert await RAG_bot.adecide_route("create a JIRA ticket?", "auto") == "mcp"
+
+        llm.assert_awaited_once()
+        assert cache.stats()["route"]["normalised_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_adecide_mcp_subroute_cached(self, llm, cache):
+        llm.return_value = parsed("rag_then_mcp")
+
+        for _ in range(3):
+            assert await RAG_bot.adecide_route("Tickets from today's notes", "mcp") == "rag_then_mcp"
+
+        llm.assert_awaited_once()
+        assert cache.stats()["mcp_subroute"]["exact_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_aroute_query_cached(self, llm, cache):
+        llm.return_value = parsed("transcripts")
+
+        first = await retrieval_utils.aroute_query("Agilent Q2 guidance")
+        second = await retrieval_utils.aroute_query("Agilent Q2 guidance")
+
+        assert first == second == retrieval_utils.RetrievalRoute(source="transcripts")
+        llm.assert_awaited_once()